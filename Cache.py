@@ -0,0 +1,190 @@
+import os
+import shutil
+import hashlib
+import tempfile
+import argparse
+import contextlib
+import numpy as np
+
+# Hash of the simulation's source files, calculated once per process
+_code_version = {}
+
+# Modules whose code changes the results of a run, rather than only how they are plotted, rendered or organised
+result_modules = ['System', 'EventQueue', 'CellGrid', 'kernels', 'Parallel', 'Tracker', 'Vector', 'Particle', 
+                  'Position', 'Velocity', 'Histogram', 'states']
+
+def code_version():
+    """
+    Return a hash of the source files of the modules that change the results of a run, so that any change to them 
+    gives new cache keys
+    """
+    if 'hash' not in _code_version:
+        directory = os.path.dirname(os.path.abspath(__file__))
+        digest = hashlib.sha256()
+        for name in sorted(module + '.py' for module in result_modules):
+            digest.update(name.encode())
+            with open(os.path.join(directory, name), 'rb') as file:
+                # Line endings depend on the checkout rather than the code
+                digest.update(file.read().replace(b'\r\n', b'\n'))
+        _code_version['hash'] = digest.hexdigest()
+    return _code_version['hash']
+
+def hash_values(values):
+    """
+    Return a hash of a dictionary of numbers, strings and arrays, independent of the order of its keys
+
+    values - dictionary mapping str keys to the values to hash
+    """
+    digest = hashlib.sha256()
+    for key in sorted(values):
+        value = np.asarray(values[key])
+        digest.update(key.encode())
+        digest.update(str(value.dtype).encode() + str(value.shape).encode())
+        digest.update(value.tobytes() if value.dtype != object else repr(value.tolist()).encode())
+    return digest.hexdigest()
+
+class ResultCache:
+    """
+    Class storing the files of finished simulation runs in a folder, with one subfolder per run named by a hash of
+    everything that determines its results, so that an identical run can reuse them rather than simulate again
+
+    The least recently used runs are removed once the files take up more than max_size bytes
+    Each run's subfolder is written under a temporary name and renamed once complete, so that processes sharing the
+    cache never see a partial run
+
+    Has the following attributes:
+    self.folder_name -> The folder holding the cached runs (str)
+    self.max_size -> The most bytes the cached files may take up before the least recently used are removed (int)
+    """
+
+    # Random number generator states only affect the initialisation, which the particle state already records
+    ignored = ['rng_keys', 'rng_position', 'rng_has_gauss', 'rng_cached_gaussian', 'rng_state']
+
+    def __init__(self, folder_name, max_size=10**9):
+        """
+        Initialisation arguments:
+
+        folder_name - str type value of the folder holding the cached runs, created if it does not exist
+        max_size - int type value of the most bytes the cached files may take up
+        """
+        self.folder_name = folder_name
+        self.max_size = max_size
+        os.makedirs(folder_name, exist_ok=True)
+
+    def __len__(self):
+        return len(self.entries())
+
+    def __contains__(self, key):
+        return os.path.isdir(os.path.join(self.folder_name, key))
+
+    def key(self, system, settings):
+        """
+        Return the key of a run of the System, hashing its complete state and seed, the code version and the
+        settings of the run
+        As the state is only determined by the System's parameters and seed, a run of a System initialised with the
+        same parameters and seed has the same key
+
+        system - System type object about to be simulated
+        settings - dictionary mapping the name of each setting of the run that changes its results to its value
+        """
+        values = {'State ' + key: value for key, value in system.checkpoint_data().items() 
+                  if key not in self.ignored}
+        values.update({'Setting ' + key: 'None' if value is None else value for key, value in settings.items()})
+        values['Code version'] = code_version()
+        return hash_values(values)
+
+    def entries(self):
+        """
+        Return the keys of every cached run, from the least to the most recently used
+        """
+        keys = [entry.name for entry in os.scandir(self.folder_name) if entry.is_dir() and '.' not in entry.name]
+        return sorted(keys, key=lambda key: os.path.getmtime(os.path.join(self.folder_name, key)))
+
+    def size(self, key=None):
+        """
+        Return the number of bytes taken up by a cached run's files, or by every cached run
+
+        key - Optional str type value of the run's key
+        """
+        keys = self.entries() if key is None else [key]
+        return sum(entry.stat().st_size for key in keys for entry in os.scandir(os.path.join(self.folder_name, key)))
+
+    def get(self, key):
+        """
+        Return the folder of a cached run's files, marking it as the most recently used, or None if it is not cached
+
+        key - str type value of the run's key
+        """
+        folder = os.path.join(self.folder_name, key)
+        try:
+            os.utime(folder)
+        except FileNotFoundError:
+            return None
+        return folder
+
+    @contextlib.contextmanager
+    def entry(self, key):
+        """
+        Return a context manager giving an empty temporary folder to write a run's files to, which is added to the
+        cache as the run's folder on leaving unless an exception was raised, removing the least recently used runs
+        if the cache is then too large
+
+        key - str type value of the run's key
+        """
+        folder = tempfile.mkdtemp(dir=self.folder_name, suffix='.tmp')
+        try:
+            yield folder
+            try:
+                os.rename(folder, os.path.join(self.folder_name, key))
+            except OSError:
+                # Another process has cached the same run already
+                pass
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used runs until the cached files take up no more than max_size bytes, returning
+        the number of runs removed
+        """
+        keys = self.entries()
+        sizes = [self.size(key) for key in keys]
+        total = sum(sizes)
+        removed = 0
+        for key, size in zip(keys, sizes):
+            if total <= self.max_size:
+                break
+            shutil.rmtree(os.path.join(self.folder_name, key), ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def invalidate(self, key=None):
+        """
+        Remove a cached run, or every cached run, returning the number of runs removed
+
+        key - Optional str type value of the run's key
+        """
+        keys = self.entries() if key is None else [key] if key in self else []
+        for key in keys:
+            shutil.rmtree(os.path.join(self.folder_name, key), ignore_errors=True)
+        return len(keys)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Inspect or clear a cache of simulation runs')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    info_parser = subparsers.add_parser('info', help='list the cached runs from the least to the most recently used')
+    info_parser.add_argument('folder')
+    invalidate_parser = subparsers.add_parser('invalidate', help='remove cached runs')
+    invalidate_parser.add_argument('folder')
+    invalidate_parser.add_argument('--key', default=None, help='only remove the run with this key')
+    arguments = parser.parse_args()
+
+    cache = ResultCache(arguments.folder)
+    if arguments.command == 'info':
+        for key in cache.entries():
+            print(key + ' ' + str(cache.size(key)) + ' bytes')
+        print(str(len(cache)) + ' runs, ' + str(cache.size()) + ' bytes')
+    else:
+        print(str(cache.invalidate(arguments.key)) + ' runs removed')
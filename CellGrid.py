@@ -0,0 +1,148 @@
+import numpy as np
+import itertools
+
+class CellGrid:
+    """
+    Class dividing the box into a regular grid of cells so that only particles in neighbouring cells need to be
+    checked for collisions
+
+    Has the following attributes:
+    self.shape -> Contains the number of cells along each spatial dimension (np.array)
+    self.cell_size -> Contains the length of a cell along each spatial dimension (np.array)
+    self.offsets -> Contains the index offset of every cell neighbouring a cell, including itself (np.array)
+    self.cells -> Maps the index tuple of each occupied cell to the set of particle indices inside it (dict)
+    self.particle_cells -> Contains the cell index of every particle, one row per particle (np.array)
+    """
+
+    def __init__(self, box, cell_length):
+        """
+        Initialisation arguments:
+
+        box - array-like object containing the length of the container in each spatial dimension
+        cell_length - float type value for the smallest allowed length of a cell, which must be at least the
+                      largest particle diameter
+        """
+        box = np.array(box, dtype=float)
+        self.shape = np.maximum(np.floor(box / cell_length), 1).astype(int)
+        self.cell_size = box / self.shape
+        self.offsets = np.array(list(itertools.product([-1, 0, 1], repeat=len(box))), dtype=int)
+        self.cells = {}
+        self.particle_cells = np.empty((0, len(box)), dtype=int)
+
+    def assign(self, positions):
+        """
+        Place every particle in the cell containing its position
+
+        positions - np.array containing the position of every particle, one row per particle
+        """
+        self.place(np.clip(np.floor(positions / self.cell_size).astype(int), 0, self.shape - 1))
+
+    def place(self, particle_cells):
+        """
+        Place every particle in the given cell
+
+        particle_cells - np.array containing the cell index of every particle, one row per particle
+        """
+        self.particle_cells = np.array(particle_cells, dtype=int)
+        self.cells = {}
+        for index, cell in enumerate(map(tuple, self.particle_cells.tolist())):
+            self.cells.setdefault(cell, set()).add(index)
+
+    def neighbours(self, index):
+        """
+        Return the indices of all other particles in the cells neighbouring the particle's cell
+
+        index - int type value of the particle's index
+        """
+        neighbours = self.nearby(self.particle_cells[index])
+        neighbours.remove(index)
+        return neighbours
+
+    def nearby(self, cell):
+        """
+        Return the indices of all particles in the given cell and the cells neighbouring it
+
+        cell - array-like object containing the cell's index along each spatial dimension
+        """
+        candidates = np.array(cell) + self.offsets
+        valid = np.all((candidates >= 0) & (candidates < self.shape), axis=1)
+        particles = []
+        for candidate in map(tuple, candidates[valid]):
+            particles.extend(self.cells.get(candidate, ()))
+        return particles
+
+    def cell_of(self, position):
+        """
+        Return the index tuple of the cell containing the given position
+
+        position - np.array containing the position to locate
+        """
+        return tuple(np.clip(np.floor(position / self.cell_size).astype(int), 0, self.shape - 1).tolist())
+
+    def face_times(self, index, position, velocity):
+        """
+        Return the time after which the particle reaches the face of its cell in each spatial dimension, with
+        np.infty for faces on the container walls which are never crossed
+
+        index - int type value of the particle's index
+        position - np.array containing the particle's position
+        velocity - np.array containing the particle's velocity
+        """
+        cell = self.particle_cells[index]
+        times = np.full(len(cell), np.infty)
+        upper = (velocity > 0) & (cell < self.shape - 1)
+        lower = (velocity < 0) & (cell > 0)
+        times[upper] = ((cell[upper] + 1)*self.cell_size[upper] - position[upper]) / velocity[upper]
+        times[lower] = (cell[lower]*self.cell_size[lower] - position[lower]) / velocity[lower]
+        return times
+
+    def exit_time(self, index, position, velocity):
+        """
+        Return the time after which the particle will leave its current cell, returning np.infty if it will only
+        reach the container walls
+
+        index - int type value of the particle's index
+        position - np.array containing the particle's position
+        velocity - np.array containing the particle's velocity
+        """
+        # Machine precision may leave the particle fractionally beyond the face it is about to cross
+        return max(self.face_times(index, position, velocity).min(), 0)
+
+    def crossed_cell(self, index, position, velocity):
+        """
+        Return the index of the neighbouring cell the particle is crossing into, without moving it
+
+        index - int type value of the particle's index
+        position - np.array containing the particle's position on the face of its current cell
+        velocity - np.array containing the particle's velocity
+        """
+        cell = self.particle_cells[index].copy()
+        # The face being crossed is the one the particle is closest to reaching
+        dimension = np.argmin(np.abs(self.face_times(index, position, velocity)))
+        cell[dimension] += int(np.sign(velocity[dimension]))
+        return cell
+
+    def move(self, index, position, velocity):
+        """
+        Move the particle into the neighbouring cell it is crossing into
+
+        index - int type value of the particle's index
+        position - np.array containing the particle's position on the face of its current cell
+        velocity - np.array containing the particle's velocity
+        """
+        self.relocate(index, self.crossed_cell(index, position, velocity))
+
+    def relocate(self, index, cell):
+        """
+        Move the particle into the given cell
+
+        index - int type value of the particle's index
+        cell - array-like object containing the new cell's index along each spatial dimension
+        """
+        old_cell = tuple(self.particle_cells[index].tolist())
+        self.particle_cells[index] = cell
+
+        self.cells[old_cell].discard(index)
+        if not self.cells[old_cell]:
+            del self.cells[old_cell]
+        self.cells.setdefault(tuple(self.particle_cells[index].tolist()), set()).add(index)
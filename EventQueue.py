@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+
+class EventQueue:
+    """
+    Indexed binary heap holding the absolute time of every predicted event in a System, so that the next event can
+    be found and individual events updated or removed in O(log n) time
+
+    Has the following attributes:
+    self.heap -> Binary heap of [time, event] entries ordered by time, where event is the tuple of the 2 colliding
+                 objects (list)
+    self.index -> Contains the position of each event's entry in self.heap (dict)
+    """
+
+    def __init__(self, events=None):
+        """
+        Initialisation arguments:
+
+        events - Optional iterable of (event, time) pairs to build the heap from, where events with infinite times are
+                 not stored
+        """
+        self.heap = []
+        self.index = {}
+        if events is not None:
+            # Sorted entries already satisfy the heap property, so build the heap in one pass
+            self.heap = sorted([[time, event] for event, time in events if time != np.infty], key=lambda entry: entry[0])
+            self.index = {entry[1]: position for position, entry in enumerate(self.heap)}
+
+    @classmethod
+    def from_heap(cls, events):
+        """
+        Return a new queue holding the given (event, time) pairs in exactly the given heap order, as returned by
+        items, so that a saved queue can be restored with the same layout
+
+        events - iterable of (event, time) pairs in heap order
+        """
+        queue = cls()
+        queue.heap = [[time, event] for event, time in events]
+        queue.index = {entry[1]: position for position, entry in enumerate(queue.heap)}
+        return queue
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, event):
+        return event in self.index
+
+    def __getitem__(self, event):
+        """
+        Return the time of the given event, or np.infty if it is not scheduled
+
+        event - tuple type value of the 2 colliding objects
+        """
+        position = self.index.get(event)
+        if position is None:
+            return np.infty
+        return self.heap[position][0]
+
+    def __setitem__(self, event, time):
+        """
+        Schedule the event at the given time, replacing any previous time for it, or remove it if the time is infinite
+
+        event - tuple type value of the 2 colliding objects
+        time - float type value of the absolute time of the event
+        """
+        if time == np.infty:
+            self.remove(event)
+            return
+        position = self.index.get(event)
+        if position is None:
+            self.heap.append([time, event])
+            self.index[event] = len(self.heap) - 1
+            self._sift_up(len(self.heap) - 1)
+        else:
+            old_time = self.heap[position][0]
+            self.heap[position][0] = time
+            if time < old_time:
+                self._sift_up(position)
+            else:
+                self._sift_down(position)
+
+    def remove(self, event):
+        """
+        Remove the event from the queue if it is scheduled
+
+        event - tuple type value of the 2 colliding objects
+        """
+        position = self.index.pop(event, None)
+        if position is None:
+            return
+        last = self.heap.pop()
+        # Fill the gap with the last entry and restore the heap property around it
+        if position < len(self.heap):
+            self.heap[position] = last
+            self.index[last[1]] = position
+            self._sift_up(position)
+            self._sift_down(self.index[last[1]])
+
+    def peek(self):
+        """
+        Return the next event and its time without removing it
+        """
+        time, event = self.heap[0]
+        return event, time
+
+    def pop(self):
+        """
+        Remove and return the next event and its time
+        """
+        event, time = self.peek()
+        self.remove(event)
+        return event, time
+
+    def items(self):
+        """
+        Return a list of all scheduled (event, time) pairs in heap order
+        """
+        return [(event, time) for time, event in self.heap]
+
+    def _swap(self, position_1, position_2):
+        """
+        Swap 2 entries of the heap and update their positions in the index
+        """
+        heap = self.heap
+        heap[position_1], heap[position_2] = heap[position_2], heap[position_1]
+        self.index[heap[position_1][1]] = position_1
+        self.index[heap[position_2][1]] = position_2
+
+    def _sift_up(self, position):
+        """
+        Move the entry at the given position towards the root until its parent is not later than it
+        """
+        heap = self.heap
+        while position > 0:
+            parent = (position - 1) // 2
+            if heap[position][0] < heap[parent][0]:
+                self._swap(position, parent)
+                position = parent
+            else:
+                break
+
+    def _sift_down(self, position):
+        """
+        Move the entry at the given position towards the leaves until neither child is earlier than it
+        """
+        heap = self.heap
+        size = len(heap)
+        while True:
+            smallest = position
+            for child in (2*position + 1, 2*position + 2):
+                if child < size and heap[child][0] < heap[smallest][0]:
+                    smallest = child
+            if smallest == position:
+                break
+            self._swap(position, smallest)
+            position = smallest
+
+
+class EventSeries:
+    """
+    Read-only view of an EventQueue giving the time remaining until each event, matching the pd.Series previously
+    stored as System.event_series
+
+    Has the following attributes:
+    self.queue -> Queue of absolute event times to view (EventQueue)
+    self.origin -> The time the remaining times are measured from (float)
+    """
+
+    def __init__(self, queue, origin):
+        """
+        Initialisation arguments:
+
+        queue - EventQueue type object to view
+        origin - float type value of the time the remaining times are measured from
+        """
+        self.queue = queue
+        self.origin = origin
+
+    def __getitem__(self, event):
+        """
+        Return the time until the given event, or np.infty if it is not scheduled
+
+        event - tuple type value of the 2 colliding objects
+        """
+        return self.queue[event] - self.origin
+
+    def __len__(self):
+        return len(self.queue)
+
+    def first_valid_index(self):
+        """
+        Return the next event
+        """
+        return self.queue.peek()[0]
+
+    def to_series(self):
+        """
+        Return the scheduled events as a pd.Series of remaining times sorted by time
+        """
+        items = self.queue.items()
+        series = pd.Series([time - self.origin for event, time in items], [event for event, time in items],
+                           dtype=np.float64)
+        return series.sort_values()
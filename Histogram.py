@@ -0,0 +1,113 @@
+import numpy as np
+
+class SpeedHistogram:
+    """
+    Class keeping a histogram of the speeds of every particle up to date one collision at a time, along with the
+    histogram averaged over simulated time, so that neither needs every speed to be binned again
+
+    The time average is kept lazily: each bin only adds its count multiplied by the time since it last changed when
+    its count changes, and every bin is brought up to date only when the average is read
+    Speeds of max_speed or more are counted in a final overflow bin
+
+    Has the following attributes:
+    self.max_speed -> The upper edge of the last bin (float)
+    self.no_bins -> Number of bins below max_speed (int)
+    self.edges -> Contains the edges of the bins, from 0 to max_speed (np.array)
+    self.counts -> Contains the number of particles in each bin, followed by the overflow bin (np.array)
+    self.particle_bins -> Contains the bin of every particle (np.array)
+    self.totals -> Contains the time integral of each bin's count up to its entry in self.bin_times (np.array)
+    self.bin_times -> Contains the global_time each bin's total was last brought up to (np.array)
+    self.start_time -> The global_time the time average starts from (float)
+    """
+
+    def __init__(self, max_speed, no_bins, time=0):
+        """
+        Initialisation arguments:
+
+        max_speed - float type value for the upper edge of the last bin
+        no_bins - int type value for the number of bins below max_speed
+        time - float type value of the global_time the time average starts from
+        """
+        self.max_speed = float(max_speed)
+        self.no_bins = int(no_bins)
+        self.edges = np.linspace(0, self.max_speed, self.no_bins + 1)
+        self.counts = np.zeros(self.no_bins + 1, dtype=int)
+        self.particle_bins = np.empty(0, dtype=int)
+        self.reset_average(time)
+
+    def bin(self, speeds):
+        """
+        Return the bin of each speed, or of a single speed
+
+        speeds - float type value or np.array of speeds
+        """
+        # Searching the edges keeps a speed on an edge in the bin above it, as np.histogram does
+        return np.searchsorted(self.edges, speeds, side='right') - 1
+
+    def fill(self, speeds, time):
+        """
+        Bin every speed again, such as after the velocities change other than by collisions, keeping the time average
+        of the previous counts up to the given time
+
+        speeds - np.array containing the speed of every particle
+        time - float type value of the current global_time
+        """
+        self.flush(time)
+        self.particle_bins = self.bin(np.asarray(speeds, dtype=float))
+        self.counts = np.bincount(self.particle_bins, minlength=self.no_bins + 1)
+
+    def update(self, index, speed, time):
+        """
+        Move a particle to the bin of its new speed, only updating the two bins involved
+
+        index - int type value of the particle's index
+        speed - float type value of the particle's new speed
+        time - float type value of the global_time of the change
+        """
+        old_bin = self.particle_bins[index]
+        new_bin = self.bin(speed)
+        if new_bin == old_bin:
+            return
+        for bin_index in (old_bin, new_bin):
+            self.totals[bin_index] += self.counts[bin_index]*(time - self.bin_times[bin_index])
+            self.bin_times[bin_index] = time
+        self.counts[old_bin] -= 1
+        self.counts[new_bin] += 1
+        self.particle_bins[index] = new_bin
+
+    def flush(self, time):
+        """
+        Bring the total of every bin up to the given time
+
+        time - float type value of the current global_time
+        """
+        self.totals += self.counts*(time - self.bin_times)
+        self.bin_times[:] = time
+
+    def reset_average(self, time):
+        """
+        Discard the time average and start it again from the given time
+
+        time - float type value of the current global_time
+        """
+        self.start_time = time
+        self.totals = np.zeros(self.no_bins + 1)
+        self.bin_times = np.full(self.no_bins + 1, float(time))
+
+    def distribution(self):
+        """
+        Return the current number of particles in each bin below max_speed
+        """
+        return self.counts[:-1].copy()
+
+    def time_averaged(self, time):
+        """
+        Return the mean number of particles in each bin below max_speed since start_time, or the current counts if
+        no time has passed
+
+        time - float type value of the current global_time
+        """
+        if time == self.start_time:
+            return self.distribution().astype(float)
+        self.flush(time)
+        return self.totals[:-1] / (time - self.start_time)
@@ -0,0 +1,424 @@
+import numpy as np
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from CellGrid import CellGrid
+import kernels
+
+# State of a pool process, which only ever works for the engine that started it, set once by attach_process
+_worker = {}
+
+def attach_process(*arguments):
+    """
+    Attach a pool process to the shared particle arrays of its ParallelEngine, taking the arguments of attach
+    """
+    _worker.update(attach(*arguments))
+
+def attach(names, shapes, dtypes, box, cell_length, backend):
+    """
+    Return the state speculate needs to simulate the events of a ParallelEngine in this process - the shared 
+    particle arrays and a grid of the process's own with the particles placed in it
+
+    names - dictionary mapping each array's name to the name of its shared memory block
+    shapes - dictionary mapping each array's name to its shape
+    dtypes - dictionary mapping each array's name to its dtype
+    box - np.array containing the length of the container in each spatial dimension
+    cell_length - float type value for the smallest allowed length of a cell of the System's grid
+    backend - str type value of the System's collision kernel backend
+    """
+    worker = {'memory': [shared_memory.SharedMemory(name=name) for name in names.values()]}
+    worker['arrays'] = {key: np.ndarray(shapes[key], dtype=dtypes[key], buffer=memory.buf)
+                        for key, memory in zip(names, worker['memory'])}
+    worker['box'] = box
+    worker['grid'] = CellGrid(box, cell_length)
+    worker['grid'].place(worker['arrays']['particle_cells'])
+    worker['version'] = int(worker['arrays']['version'][0])
+    worker['crossed'] = []
+    worker['kernels'] = kernels.get_backend(backend)
+    return worker
+
+def catch_up(worker):
+    """
+    Bring a process's grid up to date with the cell crossings committed since it was last used, and undo those it
+    speculated that were not committed, placing every particle again if more have been committed than the log of
+    moved particles holds
+
+    worker - dictionary of the process's state returned by attach
+    """
+    arrays = worker['arrays']
+    grid = worker['grid']
+    version = int(arrays['version'][0])
+    moved = arrays['moved']
+    if version - worker['version'] > len(moved):
+        grid.place(arrays['particle_cells'])
+    else:
+        indices = worker['crossed'] + [int(moved[position % len(moved)]) 
+                                       for position in range(worker['version'], version)]
+        # A particle crossing several times is logged each time, but only moved once
+        for index in indices:
+            if np.any(grid.particle_cells[index] != arrays['particle_cells'][index]):
+                grid.relocate(index, arrays['particle_cells'][index])
+    worker['version'] = version
+    worker['crossed'] = []
+
+def synchronise(positions, velocities, update_times, indices, time):
+    """
+    Propagate the given particles up to the time exactly as System.synchronise does
+    """
+    positions[indices] += velocities[indices]*(time - update_times[indices])[:, np.newaxis]
+    update_times[indices] = time
+
+class RowOverlay:
+    """
+    Class holding private copies of the rows of shared particle arrays that a round of speculation changes, so that
+    only the rows of particles taking part in an event or neighbouring one are copied rather than whole arrays
+    Rows are copied the first time they are used and kept in compact arrays, indexed by the row's slot
+
+    Has the following attributes:
+    self.arrays -> Maps each array's name to the shared array (dict)
+    self.rows -> Maps each array's name to the copied rows, one row per slot (dict)
+    self.slot_of -> Maps the index of each copied particle to its slot (dict)
+    self.no_rows -> Number of rows copied (int)
+    """
+
+    def __init__(self, arrays, capacity=64):
+        """
+        Initialisation arguments:
+
+        arrays - dictionary mapping each array's name to the shared array, one row per particle
+        capacity - int type value for the number of rows to make room for at first
+        """
+        self.arrays = arrays
+        self.rows = {name: np.empty((capacity,) + array.shape[1:], dtype=array.dtype) for name, array in arrays.items()}
+        self.slot_of = {}
+        self.no_rows = 0
+
+    def slots(self, indices):
+        """
+        Return the slots of the given particles, copying the rows of any not copied yet
+
+        indices - list or np.array of int type values of the particles' indices
+        """
+        indices = np.asarray(indices, dtype=int).tolist()
+        missing = [index for index in dict.fromkeys(indices) if index not in self.slot_of]
+        if missing:
+            start, stop = self.no_rows, self.no_rows + len(missing)
+            capacity = len(next(iter(self.rows.values())))
+            if stop > capacity:
+                capacity = max(2*capacity, stop)
+                for name, rows in self.rows.items():
+                    self.rows[name] = np.empty((capacity,) + rows.shape[1:], dtype=rows.dtype)
+                    self.rows[name][:start] = rows[:start]
+            for name, array in self.arrays.items():
+                self.rows[name][start:stop] = array[missing]
+            self.slot_of.update(zip(missing, range(start, stop)))
+            self.no_rows = stop
+        return np.array([self.slot_of[index] for index in indices], dtype=int)
+
+def speculate(events, worker=None):
+    """
+    Simulate the given events in turn on private copies of the particles they change, exactly as a lazy System
+    with a grid would, returning for each event the new collision times of its particles, the particles whose state
+    was used and the cells of its particles
+    Other events simulated at the same time by other processes are not seen, so System must check the results
+    against them before using them
+
+    events - list of (object_1, object_2, time) tuples in time order, where time is the absolute event time
+    worker - Optional dictionary of the process's state returned by attach, defaulting to the state of the pool 
+             process
+    """
+    worker = worker if worker is not None else _worker
+    catch_up(worker)
+    arrays = worker['arrays']
+    overlay = RowOverlay({name: arrays[name] for name in ['positions', 'velocities', 'update_times', 'masses', 
+                                                          'radii']})
+    grid = worker['grid']
+    backend = worker['kernels']
+    # Cell crossings are made in the process's grid so later events find the right neighbours, and checked against
+    # the committed cells at the start of the next round
+    crossed = worker['crossed']
+
+    results = []
+    for object_1, object_2, time in events:
+        participants = [object_i for object_i in [object_1, object_2] if type(object_i) != str]
+        slots = overlay.slots(participants)
+        rows = overlay.rows
+        synchronise(rows['positions'], rows['velocities'], rows['update_times'], slots, time)
+        if object_2 == 'Cell':
+            crossed.append(object_1)
+            grid.move(object_1, rows['positions'][slots[0]], rows['velocities'][slots[0]])
+        elif type(object_2) == str:
+            backend.reflect(rows['velocities'], rows['masses'], slots[0], int(object_2.split('.')[0]) - 1)
+        else:
+            backend.collide_pair(rows['positions'], rows['velocities'], rows['masses'], slots[0], slots[1])
+
+        predictions = []
+        used = set(participants)
+        for index, slot in zip(participants, slots):
+            neighbours = np.array(grid.neighbours(index), dtype=int)
+            neighbour_slots = overlay.slots(neighbours)
+            rows = overlay.rows
+            synchronise(rows['positions'], rows['velocities'], rows['update_times'], neighbour_slots, time)
+            pair_times = backend.pair_collision_times(rows['positions'][slot], rows['velocities'][slot], 
+                                                      rows['radii'][slot], rows['positions'][neighbour_slots], 
+                                                      rows['velocities'][neighbour_slots], 
+                                                      rows['radii'][neighbour_slots])
+            wall_times = backend.wall_collision_times(rows['positions'][slot], rows['velocities'][slot], 
+                                                      rows['radii'][slot], worker['box'])
+            exit_time = grid.exit_time(index, rows['positions'][slot], rows['velocities'][slot])
+            predictions.append((index, neighbours, np.concatenate([pair_times, wall_times]), exit_time))
+            used.update(neighbours.tolist())
+        results.append((predictions, used, grid.particle_cells[participants].copy()))
+    return results
+
+class ParallelEngine:
+    """
+    Class simulating the events of a lazy System with a grid across several processes, giving exactly the same
+    events and results as System.simulate_event
+
+    Each round takes the next events with no particles in common, splits them between domains that divide the box
+    into slabs along its longest side and simulates every domain's events speculatively in its own process
+    The events are then committed to the System in time order, stopping at the first whose speculation is invalid -
+    if an event from another domain changed a particle it used, or a newly predicted event happens first - and
+    returning the rest to the event queue to be simulated again
+    Only the new collision times are calculated in parallel, and queue handling, collisions and scheduling stay in 
+    this process, so this is only faster for large, dilute Systems simulated on several cores
+    Rounds are made smaller after events are rolled back and larger again while every event is committed, so that 
+    few speculated events are wasted
+    Each process keeps its own grid, brought up to date from a log of the particles that crossed cells, so the 
+    System must only be simulated through the engine until close is called
+
+    Has the following attributes:
+    self.system -> The lazy System with a grid being simulated (System)
+    self.processes -> Number of worker processes (int)
+    self.domains -> Number of slabs the box is divided into (int)
+    self.batch_size -> Largest number of events simulated in each round (int)
+    self.batch_limit -> Largest number of events simulated in the next round, no more than batch_size (int)
+    self.axis -> The spatial dimension the slabs divide (int)
+    self.memory -> Shared memory blocks holding the particle arrays and the log of cell crossings (dict)
+    self.version -> Holds the number of cell crossings committed, in shared memory (np.array)
+    self.moved -> Holds the index of the particle in each of the latest cell crossings, in the order they were 
+                  committed, in shared memory (np.array)
+    self.pool -> The worker processes (ProcessPoolExecutor)
+    self.worker -> State of this process for simulating rounds with a single busy domain, returned by attach (dict)
+    self.no_rounds -> Number of rounds simulated (int)
+    self.no_committed -> Number of speculatively simulated events committed to the System (int)
+    self.no_rolled_back -> Number of speculatively simulated events returned to the event queue (int)
+    """
+
+    array_names = ['positions', 'velocities', 'update_times', 'masses', 'radii', 'particle_cells']
+
+    def __init__(self, system, processes=2, domains=None, batch_size=None):
+        """
+        Initialisation arguments:
+
+        system - System type object initialised with lazy=True and a cell_length, whose particle arrays are moved
+                 into shared memory until close is called
+        processes - int type value for the number of worker processes, which only pays off for large Systems with a
+                    core for each process
+        domains - Optional int type value for the number of slabs, defaulting to the number of processes
+        batch_size - Optional int type value for the largest number of events in each round, defaulting to 16 per
+                     domain
+        """
+        if not system.lazy or system.grid is None:
+            raise ValueError("ParallelEngine needs a lazy System with a cell_length")
+        self.system = system
+        self.processes = processes
+        self.domains = domains if domains is not None else processes
+        self.batch_size = batch_size if batch_size is not None else 16*self.domains
+        self.batch_limit = self.batch_size
+        self.axis = int(np.argmax(system.grid.shape))
+        self.no_rounds = 0
+        self.no_committed = 0
+        self.no_rolled_back = 0
+
+        # Move the particle arrays into shared memory so the workers read the current state without copying it
+        self.memory = {}
+        arrays = {}
+        for name in self.array_names:
+            array = self.array(name)
+            self.memory[name] = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            arrays[name] = np.ndarray(array.shape, dtype=array.dtype, buffer=self.memory[name].buf)
+            arrays[name][...] = array
+        self.bind(arrays)
+        # Falling further behind than the log holds costs a process no more than placing every particle again
+        log = {'version': np.zeros(1, dtype=np.int64), 'moved': np.zeros(max(system.no_particles, 1), dtype=np.int64)}
+        for name, array in log.items():
+            self.memory[name] = shared_memory.SharedMemory(create=True, size=array.nbytes)
+            arrays[name] = np.ndarray(array.shape, dtype=array.dtype, buffer=self.memory[name].buf)
+            arrays[name][...] = array
+        self.version = arrays['version']
+        self.moved = arrays['moved']
+        arguments = ({name: memory.name for name, memory in self.memory.items()},
+                     {name: array.shape for name, array in arrays.items()},
+                     {name: array.dtype for name, array in arrays.items()},
+                     system.box, system.cell_length, system.kernels.name)
+        self.pool = ProcessPoolExecutor(max_workers=processes, initializer=attach_process, initargs=arguments)
+        # Rounds with a single busy domain are simulated here rather than sent to a worker
+        self.worker = attach(*arguments)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def array(self, name):
+        """
+        Return the System's particle array of the given name
+
+        name - str type value of one of array_names
+        """
+        if name == 'particle_cells':
+            return self.system.grid.particle_cells
+        return getattr(self.system, name)
+
+    def bind(self, arrays):
+        """
+        Make the System, its grid and its particles use the given particle arrays
+
+        arrays - dictionary mapping each of array_names to its new array
+        """
+        for name, array in arrays.items():
+            if name == 'particle_cells':
+                self.system.grid.particle_cells = array
+            else:
+                setattr(self.system, name, array)
+        for index, particle in enumerate(self.system._particles):
+            particle.position.components = self.system.positions[index]
+            particle.velocity.components = self.system.velocities[index]
+
+    def close(self):
+        """
+        Stop the worker processes and move the particle arrays back out of shared memory
+        """
+        if self.pool is None:
+            return
+        self.pool.shutdown()
+        self.pool = None
+        self.bind({name: self.array(name).copy() for name in self.array_names})
+        for memory in self.worker.pop('memory'):
+            memory.close()
+        self.worker = None
+        for memory in self.memory.values():
+            memory.close()
+            memory.unlink()
+
+    def domain(self, index):
+        """
+        Return the domain containing the given particle's cell
+
+        index - int type value of the particle's index in System.particles
+        """
+        return int(self.system.grid.particle_cells[index, self.axis])*self.domains // self.system.grid.shape[self.axis]
+
+    def next_batch(self, max_collisions=None):
+        """
+        Remove and return the next events with no particles in common from the event queue, in time order
+
+        max_collisions - Optional int type value for the most collisions, rather than cell crossings, to include,
+                         ending the batch with the last of them
+        """
+        queue = self.system.event_queue
+        batch = []
+        participants = set()
+        no_collisions = 0
+        while len(queue) and len(batch) < self.batch_limit:
+            (object_1, object_2), time = queue.peek()
+            particles = {object_i for object_i in [object_1, object_2] if type(object_i) != str}
+            if particles & participants:
+                break
+            queue.pop()
+            batch.append((object_1, object_2, time))
+            participants |= particles
+            if object_2 != 'Cell':
+                no_collisions += 1
+                # Stop straight after the last collision as System.simulate_event would
+                if no_collisions == max_collisions:
+                    break
+        return batch
+
+    def conflicts(self, domain, used, cells, committed):
+        """
+        Return True if an event's speculation is invalid because an event already committed from another domain
+        changed a particle it used or moved a particle into its neighbourhood
+
+        domain - int type value of the event's domain
+        used - set of the indices of the particles whose state the event's speculation used
+        cells - np.array of the cells of the event's particles, one row per particle
+        committed - list of (domain, used, moved_cell) tuples of the events committed so far in the round
+        """
+        for other_domain, other_used, moved_cell in committed:
+            if other_domain == domain:
+                continue
+            if used & other_used:
+                return True
+            if moved_cell is not None and np.any(np.all(np.abs(cells - moved_cell) <= 1, axis=1)):
+                return True
+        return False
+
+    def simulate_batch(self, max_collisions=None):
+        """
+        Simulate one round of events, returning the number of events committed to the System
+
+        max_collisions - Optional int type value for the most collisions, rather than cell crossings, to simulate
+        """
+        system = self.system
+        batch = self.next_batch(max_collisions)
+        if not batch:
+            return 0
+        domains = [self.domain(object_1) for object_1, object_2, time in batch]
+        tasks = {}
+        for event, domain in zip(batch, domains):
+            tasks.setdefault(domain, []).append(event)
+        if len(tasks) == 1:
+            results = {domain: speculate(events, self.worker) for domain, events in tasks.items()}
+        else:
+            results = dict(zip(tasks, self.pool.map(speculate, tasks.values())))
+        for domain in results:
+            results[domain] = iter(results[domain])
+
+        committed = []
+        for position, ((object_1, object_2, time), domain) in enumerate(zip(batch, domains)):
+            predictions, used, cells = next(results[domain])
+            # A newly predicted event would happen first, or the speculation used a state that has since changed
+            if position and ((len(system.event_queue) and system.event_queue.peek()[1] <= time) 
+                             or self.conflicts(domain, used, cells, committed)):
+                for object_1, object_2, time in batch[position:]:
+                    system.event_queue[(object_1, object_2)] = time
+                self.no_rolled_back += len(batch) - position
+                break
+
+            # Repeat the serial event with the collision times calculated by the worker
+            system.global_time = time
+            system.synchronise([object_i for object_i in [object_1, object_2] if type(object_i) != str])
+            moved_cell = None
+            if object_2 == 'Cell':
+                system.grid.move(object_1, system.positions[object_1], system.velocities[object_1])
+                moved_cell = system.grid.particle_cells[object_1].copy()
+                self.moved[self.version[0] % len(self.moved)] = object_1
+                self.version[0] += 1
+            else:
+                system.collide(object_1, object_2)
+            for index, neighbours, times, exit_time in predictions:
+                system.synchronise(neighbours)
+                system.schedule_particle(index, neighbours, times, exit_time)
+            system.discard_event(object_1, object_2)
+            committed.append((domain, used, moved_cell))
+
+        # Halving after a rollback and growing slowly otherwise keeps the share of events rolled back small
+        if len(committed) < len(batch):
+            self.batch_limit = max(self.batch_limit // 2, 1)
+        elif len(batch) == self.batch_limit:
+            self.batch_limit = min(self.batch_limit + self.domains, self.batch_size)
+        self.no_rounds += 1
+        self.no_committed += len(committed)
+        return len(committed)
+
+    def simulate(self, total_collisions):
+        """
+        Simulate events until the System has had the given total number of collisions
+
+        total_collisions - int type value of the number of collisions to reach
+        """
+        while self.system.no_collisions < total_collisions:
+            self.simulate_batch(total_collisions - self.system.no_collisions)
@@ -52,7 +52,8 @@ class Particle:
 
         other - Particle type object to check for overlap with
         """
-        return (self.position - other.position).magnitude() < self.radius + other.radius
+        separation = self.position - other.position
+        return separation@separation < (self.radius + other.radius)**2
 
     def kinetic_energy(self):
         """
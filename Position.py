@@ -8,6 +8,8 @@ class Position(Vector):
     self.components -> Contains the position coordinate in each spatial direction (np.array)
     """
 
+    __slots__ = ()
+
     def __init__(self, values):
         """
         Initialisation arguments:
@@ -24,6 +26,7 @@ class Position(Vector):
         time_step - float or int type value to propagate over
         """
         if self.dimension() == velocity.dimension():
-            self.__init__(self.components + velocity.components*time_step)
+            # Update in place so Particles viewing System arrays stay attached to them
+            self.components += velocity.components*time_step
         else:
             raise DimensionError("Objects have incompatible dimensions")
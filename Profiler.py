@@ -0,0 +1,98 @@
+import time as tm
+
+class EventStats:
+    """
+    Class collecting the time spent in each phase of System.simulate_event and a histogram of the types of event
+    simulated, used by a System initialised with profile=True
+
+    The phases are:
+    'queue' -> Finding the next event, synchronising lazily propagated neighbours and updating the event queue with the
+               new predictions
+    'propagate' -> Moving the particles up to the time of the event
+    'collide' -> Updating the velocities and running totals in the collision, or moving the particle between cells
+    'neighbours' -> Finding the particles that could collide with the particles in the event
+    'predict' -> Calculating the new collision times of the particles in the event
+
+    Has the following attributes:
+    self.times -> Maps each phase to the total time spent in it (dict)
+    self.calls -> Maps each phase to the number of times it was entered (dict)
+    self.events -> Maps each type of event ('wall', 'pair' or 'cell') to the number of them simulated (dict)
+    """
+
+    phases = ['queue', 'propagate', 'collide', 'neighbours', 'predict']
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Set every time, call count and event count back to zero
+        """
+        self.times = {phase: 0.0 for phase in self.phases}
+        self.calls = {phase: 0 for phase in self.phases}
+        self.events = {'wall': 0, 'pair': 0, 'cell': 0}
+
+    def add(self, phase, time, calls=1):
+        """
+        Add time spent in a phase
+
+        phase - str type value of one of the phases
+        time - float type value of the time spent in seconds
+        calls - int type value of the number of times the phase was entered
+        """
+        self.times[phase] += time
+        self.calls[phase] += calls
+
+    def timed(self, phase, function):
+        """
+        Return a version of the function which adds the time spent in each call to the phase
+
+        phase - str type value of one of the phases
+        function - the function to time
+        """
+        def timed_function(*args, **kwargs):
+            start = tm.perf_counter()
+            result = function(*args, **kwargs)
+            self.add(phase, tm.perf_counter() - start)
+            return result
+        return timed_function
+
+    def count_event(self, object_2):
+        """
+        Add an event to the histogram of event types
+
+        object_2 - int or str type value of the second object in the event, as in System.simulate_event
+        """
+        if object_2 == 'Cell':
+            self.events['cell'] += 1
+        elif type(object_2) == str:
+            self.events['wall'] += 1
+        else:
+            self.events['pair'] += 1
+
+    def no_events(self):
+        """
+        Return the total number of events simulated
+        """
+        return sum(self.events.values())
+
+    def report(self):
+        """
+        Return a table of the total and mean time spent in each phase and its share of the total, followed by the
+        number and share of each type of event
+        """
+        total_time = sum(self.times.values())
+        no_events = self.no_events()
+        lines = ['{:<12}{:>10}{:>14}{:>14}{:>9}'.format('Phase', 'Calls', 'Total (s)', 'Mean (us)', 'Share')]
+        for phase in self.phases:
+            mean = 1e6*self.times[phase]/self.calls[phase] if self.calls[phase] else 0
+            share = self.times[phase]/total_time if total_time else 0
+            lines.append('{:<12}{:>10}{:>14.4f}{:>14.2f}{:>9.1%}'.format(phase, self.calls[phase], self.times[phase],
+                                                                        mean, share))
+        lines.append('{:<12}{:>10}{:>14.4f}{:>14.2f}'.format('Total', no_events, total_time,
+                                                            1e6*total_time/no_events if no_events else 0))
+        lines.append('')
+        lines.append('{:<12}{:>10}{:>14}'.format('Event', 'Count', 'Share'))
+        for event, count in self.events.items():
+            lines.append('{:<12}{:>10}{:>14.1%}'.format(event, count, count/no_events if no_events else 0))
+        return '\n'.join(lines)
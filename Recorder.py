@@ -0,0 +1,164 @@
+import numpy as np
+import os
+import tempfile
+
+class TrajectoryRecorder:
+    """
+    Class recording the positions of chosen particles after each event into preallocated chunks, which are spilled
+    to a file on disk once more than max_chunks are held in memory - a temporary file if no file_name is given
+
+    The file starts with a header of int64 values giving the number of particles P, the number of dimensions D and
+    the P particle indices, followed by one row of float64 values per frame holding the time and then the D
+    coordinates of each particle in turn
+
+    Has the following attributes:
+    self.tracked_particles -> Contains the indices of the recorded particles in System.particles (np.array)
+    self.dimensions -> Number of spatial dimensions recorded (int)
+    self.chunk_size -> Number of frames in each chunk (int)
+    self.max_chunks -> Number of full chunks held in memory before they are spilled to the file (int)
+    self.file_name -> File to spill chunks to, or None until a temporary file is needed (str)
+    self.temporary -> Whether file_name is a temporary file created by the recorder, which the caller removes with 
+                      remove_temporary once the trajectory is no longer needed (bool)
+    self.chunks -> List of full chunks not yet spilled (list of np.array)
+    self.chunk -> The chunk currently being filled, one row per frame (np.array)
+    self.filled -> Number of frames in self.chunk (int)
+    self.spilled_frames -> Number of frames already written to the file, or handed to the writer (int)
+    self.writer -> Writes spilled chunks to the file in the background, or None to write them straight away 
+                   (BackgroundWriter)
+    """
+
+    def __init__(self, tracked_particles, dimensions, file_name=None, chunk_size=1024, max_chunks=64, writer=None):
+        """
+        Initialisation arguments:
+
+        tracked_particles - list of int type values of the indices of particles to record in System.particles
+        dimensions - int type value for the number of spatial dimensions of the System
+        file_name - Optional str type value of the file to spill chunks to once a run gets large, defaulting to a 
+                    temporary file created when the first chunks are spilled
+        chunk_size - int type value for the number of frames in each chunk
+        max_chunks - int type value for the number of full chunks held in memory before they are spilled
+        writer - Optional BackgroundWriter type object to spill chunks with, so recording carries on while they 
+                 are written
+        """
+        self.tracked_particles = np.array(tracked_particles, dtype=int)
+        self.dimensions = dimensions
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.file_name = file_name
+        self.temporary = False
+        self.chunks = []
+        self.chunk = self.new_chunk()
+        self.filled = 0
+        self.spilled_frames = 0
+        self.writer = writer
+
+    def new_chunk(self):
+        """
+        Return an empty chunk with room for chunk_size frames
+        """
+        return np.empty((self.chunk_size, 1 + len(self.tracked_particles)*self.dimensions))
+
+    def record(self, time, positions):
+        """
+        Record a frame of the tracked particles' positions
+
+        time - float type value of the global_time of the frame
+        positions - np.array containing the position of every particle in the System, one row per particle
+        """
+        self.chunk[self.filled, 0] = time
+        self.chunk[self.filled, 1:] = positions[self.tracked_particles].ravel()
+        self.filled += 1
+        if self.filled == self.chunk_size:
+            self.chunks.append(self.chunk)
+            self.chunk = self.new_chunk()
+            self.filled = 0
+            if len(self.chunks) > self.max_chunks:
+                if self.file_name is None:
+                    # Long runs never keep every frame in memory, even without a file of their own
+                    descriptor, self.file_name = tempfile.mkstemp(prefix='Trajectory ', suffix='.bin')
+                    os.close(descriptor)
+                    self.temporary = True
+                self.spill()
+
+    def spill(self):
+        """
+        Append every full chunk held in memory to the file, writing the header first if the file is new
+        """
+        # Full chunks are never written to again, so they can be handed over without copying
+        if self.writer is None:
+            self.write_chunks(self.chunks, not self.spilled_frames)
+        else:
+            self.writer.submit(self.write_chunks, self.chunks, not self.spilled_frames)
+        self.spilled_frames += sum(len(chunk) for chunk in self.chunks)
+        self.chunks = []
+
+    def write_chunks(self, chunks, new_file):
+        """
+        Append the chunks to the file
+
+        chunks - list of np.array chunks to write
+        new_file - Bool type value, if True the file is replaced and the header written first
+        """
+        with open(self.file_name, 'wb' if new_file else 'ab') as file:
+            if new_file:
+                header = [len(self.tracked_particles), self.dimensions] + self.tracked_particles.tolist()
+                np.array(header, dtype=np.int64).tofile(file)
+            for chunk in chunks:
+                chunk.tofile(file)
+
+    def no_frames(self):
+        """
+        Return the total number of frames recorded
+        """
+        return self.spilled_frames + len(self.chunks)*self.chunk_size + self.filled
+
+    def save(self):
+        """
+        Write every remaining frame to the file and return the recorded trajectory read lazily from it - requires 
+        a file_name
+        """
+        self.chunks.append(self.chunk[:self.filled])
+        self.chunk = self.new_chunk()
+        self.filled = 0
+        self.spill()
+        if self.writer is not None:
+            self.writer.flush()
+        return load_trajectory(self.file_name)
+
+    def remove_temporary(self):
+        """
+        Remove the temporary file the recorder spilled to, if it created one, after which only the frames still 
+        held in memory remain
+        """
+        if self.temporary:
+            if self.writer is not None:
+                self.writer.flush()
+            os.remove(self.file_name)
+            self.file_name = None
+            self.temporary = False
+
+    def trajectory(self):
+        """
+        Return the times of the frames and the recorded positions with shape (frames, particles, dimensions), read
+        lazily from the file if any frames have been spilled
+        """
+        if self.spilled_frames:
+            return self.save()
+        frames = np.concatenate(self.chunks + [self.chunk[:self.filled]])
+        return frames[:, 0], frames[:, 1:].reshape(len(frames), len(self.tracked_particles), self.dimensions)
+
+def load_trajectory(file_name):
+    """
+    Return the times of the frames and the recorded positions with shape (frames, particles, dimensions) from a file
+    written by TrajectoryRecorder, memory-mapped so frames are only read from disk when used
+
+    file_name - str type value of the trajectory file
+    """
+    no_particles, dimensions = np.fromfile(file_name, dtype=np.int64, count=2)
+    offset = (2 + no_particles)*8
+    row_length = 1 + no_particles*dimensions
+    no_frames = (os.path.getsize(file_name) - offset) // (8*row_length)
+    if no_frames == 0:
+        return np.empty(0), np.empty((0, no_particles, dimensions))
+    frames = np.memmap(file_name, dtype=np.float64, mode='r', offset=offset, shape=(no_frames, row_length))
+    return frames[:, 0], frames[:, 1:].reshape(no_frames, no_particles, dimensions)
@@ -0,0 +1,121 @@
+import os
+import sqlite3
+import pandas as pd
+
+class ResultsStore:
+    """
+    Class storing the quantities of every simulation run in a single SQLite database with one row per run, so that
+    thousands of runs can be queried in one read rather than one .csv file each
+
+    Columns are named after the quantities saved by the Tracker simulate method, like 'Pressure' and 'Number of
+    particles', and any new quantity adds a column of its own
+    The swept variables are indexed so that selecting runs by them does not scan the whole table
+
+    Has the following attributes:
+    self.file_name -> The database file (str)
+    self.connection -> Open connection to the database (sqlite3.Connection)
+    self.columns -> Contains the names of the columns of the runs table (list of str)
+    """
+
+    indexed = ['Temperature', 'Volume', 'Number of particles', 'Number of collisions', 'Radius', 'Mass', 'Seed']
+
+    def __init__(self, file_name):
+        """
+        Initialisation arguments:
+
+        file_name - str type value of the database file, created if it does not exist
+        """
+        self.file_name = file_name
+        # Several processes may append to the same store, so wait for their writes rather than failing
+        self.connection = sqlite3.connect(file_name, timeout=60)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS runs ("Run" INTEGER PRIMARY KEY, "Name" TEXT)')
+        self.columns = [row[1] for row in self.connection.execute('PRAGMA table_info(runs)')]
+        self.add_columns(self.indexed)
+        with self.connection:
+            for column in self.indexed:
+                self.connection.execute('CREATE INDEX IF NOT EXISTS "runs {0}" ON runs ("{0}")'.format(column))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM runs').fetchone()[0]
+
+    def close(self):
+        """
+        Close the connection to the database
+        """
+        self.connection.close()
+
+    def add_columns(self, names):
+        """
+        Add a column for each of the given quantities that does not have one yet
+
+        names - iterable of str type values of the quantities' names
+        """
+        with self.connection:
+            for name in names:
+                if name not in self.columns:
+                    if '"' in name:
+                        raise ValueError("Quantity names cannot contain '\"'")
+                    self.connection.execute('ALTER TABLE runs ADD COLUMN "{}"'.format(name))
+                    self.columns.append(name)
+
+    def add_run(self, quantities, name=None):
+        """
+        Add a row for a simulation run and return its run number
+
+        quantities - dictionary or pd.Series mapping the name of each parameter and simulated quantity to its value,
+                     including 'Seed' if the run was seeded
+        name - Optional str type value of the run's simulation_name
+        """
+        # Store numpy scalars as the Python values SQLite understands
+        quantities = {key: value.item() if hasattr(value, 'item') else value for key, value in dict(quantities).items()}
+        self.add_columns(quantities.keys())
+        columns = ['Name'] + list(quantities.keys())
+        with self.connection:
+            cursor = self.connection.execute('INSERT INTO runs ({}) VALUES ({})'.format(
+                ', '.join('"{}"'.format(column) for column in columns), ', '.join(['?']*len(columns))),
+                [name] + list(quantities.values()))
+        return cursor.lastrowid
+
+    def runs(self, columns=None, **filters):
+        """
+        Return a DataFrame of every run matching the given values, with one row per run indexed by run number
+
+        columns - Optional dictionary mapping the exact name of each quantity to the value to select, for names 
+                  that contain underscores, for example runs({'Number of particles': 100})
+        filters - keyword arguments of the values to select, where spaces in the quantity name are replaced by
+                  underscores, for example runs(Number_of_particles=100, Temperature=300)
+        """
+        selected = {key.replace('_', ' '): value for key, value in filters.items()}
+        selected.update(columns if columns is not None else {})
+        conditions = []
+        values = []
+        for column, value in selected.items():
+            if column not in self.columns:
+                raise KeyError("No quantity named '" + column + "' in the store")
+            conditions.append('"{}" = ?'.format(column))
+            values.append(value)
+        query = 'SELECT * FROM runs'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        return pd.read_sql_query(query, self.connection, params=values, index_col='Run')
+
+    def import_csv(self, folder_name):
+        """
+        Add a run for every file ending with 'Quantities.csv' in the folder, as saved by the Tracker simulate method,
+        and return the number of runs added
+
+        folder_name - str type value of the folder containing the files
+        """
+        added = 0
+        for entry in sorted(os.scandir(folder_name), key=lambda entry: entry.name):
+            if entry.name.endswith('Quantities.csv') and entry.is_file():
+                quantities = pd.read_csv(entry.path, index_col=0).iloc[:, 0]
+                self.add_run(quantities, entry.name[:-len(' Quantities.csv')])
+                added += 1
+        return added
@@ -1,10 +1,20 @@
 from Particle import *
+from Vector import random_unit_vectors
+from EventQueue import EventQueue, EventSeries
+from CellGrid import CellGrid
+from Profiler import EventStats
+from Histogram import SpeedHistogram
+import kernels
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib as mpl
 import math
 import time as tm
+import os
+import json
+import warnings
+from collections.abc import Sequence
 
 class System:
     """
@@ -13,16 +23,50 @@ class System:
     Has the following attributes:
     self.dimensions -> Number of spatial dimensions of the system (int)
     self.box -> Contains the length of the container in each spatial dimension (np.array)
+    self.walls -> Contains the names of the container walls, ordered as the minimum and then maximum wall of each
+                  spatial dimension in turn (list of str)
     self.global_time -> The time of the system since initialisation (float)
     self.no_collisions -> The total number of collisions that have occured at the current global_time (int)
-    self.event_series - > Contains the time values of the next collision between the 2 objects in the 
-                          corresponding tuple index (pd.Series)
+    self.event_queue -> Contains the absolute time of the next collision between the 2 objects in each tuple 
+                        key (EventQueue)
+    self.event_series -> Read-only view of event_queue giving the time until each collision (EventSeries)
     self.no_particles -> The number of particles to initialise the System with (int)
-    self.particles -> List containing all Particle-objects in the system (list of Particle objects)
-    self.net_impulse -> The total impulse delivered to the container walls over the whole simulation (float)
+    self.particles -> List-like view of all Particle-objects in the system, each a view of its row in the particle
+                      arrays and brought up to the global_time as it is read (ParticleView)
+    self.positions -> Contains the position of every particle, one row per particle (np.array)
+    self.velocities -> Contains the velocity of every particle, one row per particle (np.array)
+    self.masses -> Contains the mass of every particle (np.array)
+    self.radii -> Contains the radius of every particle (np.array)
+    self.net_impulse -> The total impulse delivered to the container walls since measurement_start (float)
+    self.wall_impulse -> Contains the impulse delivered to each wall in self.walls since measurement_start (np.array)
+    self.measurement_start -> The global_time the impulse totals were last reset at, 0 unless reset_measurement is 
+                              called (float)
+    self.kinetic_energy -> Running total of the kinetic energy of all particles, updated by each collision (float)
+    self.momentum -> Running total of the momentum of all particles, updated by each collision (np.array)
+    self.recompute_interval -> Number of collisions between full recalculations of the running totals, or None (int)
+    self.cell_length -> The smallest allowed cell length of the neighbour grid, or None to check every pair of 
+                        particles for collisions (float)
+    self.grid -> Grid of cells restricting collision checks to neighbouring particles, or None (CellGrid)
+    self.partners -> Contains the set of particles each particle has a scheduled collision with when a grid is 
+                     used (list of sets)
+    self.lazy -> Whether particles are only propagated when they take part in an event or are synchronised (bool)
+    self.update_times -> Contains the global_time each particle's position was last brought up to (np.array)
+    self.propagated_time -> The time the positions of a System that is not lazy were last brought up to, which 
+                            only lags the global_time after simulate_until (float)
+    self.kernels -> The collision time and collision kernels of the chosen backend (SimpleNamespace)
+    self.rng -> Source of every random number drawn by the System, either a generator or the np.random module 
+                (np.random.Generator or module)
+    self.seed -> The seed the System's generator was created from, or None if it was not given one (int, list of
+                 ints or np.random.SeedSequence)
+    self.stats -> Time spent in each phase of simulate_event and counts of each type of event, or None if the 
+                  System is not profiled (EventStats)
+    self.speed_histogram -> Histogram of the particle speeds updated by each collision, along with its time 
+                            average, or None until track_speeds is called (SpeedHistogram)
     """
 
-    def __init__(self, no_particles, mass, radius, dimensions, starting_speed):
+    def __init__(self, no_particles, mass, radius, dimensions, starting_speed, cell_length=None, lazy=False, placement='random', 
+                 max_attempts=1000, backend='numpy', 
+                 recompute_interval=None, profile=False, rng=None):
         """
         Initialisation arguments:
         
@@ -31,59 +75,361 @@ class System:
         radius - Float type value for the radius of the initial particles
         dimensions - List of floats containing the lengths of the box in each spatial dimension
         starting_speed - Float type value for the speed of the initial particles
+        cell_length - Optional float type value for the smallest cell length of a neighbour grid, which must be at
+                      least the largest particle diameter - particles then only check for collisions with particles
+                      in neighbouring cells and leaving a cell becomes an event of its own
+        lazy - Bool type value, if True only the particles taking part in each event are propagated and the rest 
+               are brought up to date by synchronise when their positions are needed - this only pays off with a 
+               cell_length and many particles, as without a grid every particle is a neighbour and is synchronised 
+               in every event, making it slower than propagating them all
+        placement - str type value choosing how the initial positions are found: 'random' checks each random 
+                    position against every placed particle, 'grid' does the same against particles in neighbouring
+                    cells only and 'lattice' places particles on a regular lattice with a random jitter
+        max_attempts - Int type value for the number of random positions tried for each particle before 'grid'
+                       placement gives up
+        backend - str type value choosing the collision kernels: 'numpy' or 'numba' to compile them with Numba, 
+                  which falls back to 'numpy' if Numba is not installed
+        recompute_interval - Optional int type value for the number of collisions between full recalculations of 
+                             the running kinetic energy and momentum totals, to remove floating point drift
+        profile - Bool type value, if True the time spent in each phase of simulate_event and the type of every 
+                  event are recorded in self.stats
+        rng - Optional np.random.Generator type object, or seed for one such as an int or np.random.SeedSequence, to 
+              draw every random number of the System from so that it is reproducible on its own, defaulting to the 
+              global np.random functions
         """
         self.dimensions = len(dimensions)
         self.box = np.array(dimensions, dtype='float')
+        self.walls = [str(D)+side for D in range(1, self.dimensions+1) for side in ['.Min', '.Max']]
         self.no_particles = no_particles
         self.global_time = 0
+        self.propagated_time = 0
         self.no_collisions = 0
         self.net_impulse = 0
+        self.wall_impulse = np.zeros(2*self.dimensions)
+        self.measurement_start = 0
+        self.recompute_interval = recompute_interval
+        self.cell_length = cell_length
+        self.grid = None
+        self.lazy = lazy
+        if lazy and cell_length is None:
+            warnings.warn("lazy=True without a cell_length synchronises every particle in each event, which is slower "
+                          "than lazy=False")
+        self.kernels = kernels.get_backend(backend)
+        self.seed = None
+        if rng is None:
+            rng = np.random
+        elif not isinstance(rng, np.random.Generator):
+            self.seed = rng
+            rng = np.random.default_rng(rng)
+        self.rng = rng
+        self.positions = np.empty((0, self.dimensions))
+        self.velocities = np.empty((0, self.dimensions))
+        self.update_times = np.empty(0)
+        self.speed_histogram = None
+        self.stats = None
+        if profile:
+            self.stats = EventStats()
+            # Shadow the methods with timed versions so an unprofiled System pays nothing for them
+            self.neighbours = self.stats.timed('neighbours', self.neighbours)
+            self.collision_times = self.stats.timed('predict', self.collision_times)
 
+        directions = None
+        if placement == 'random':
+            initial_positions, directions = self.place_random(no_particles, radius)
+        elif placement == 'grid':
+            initial_positions = self.place_grid(no_particles, radius, max_attempts)
+        elif placement == 'lattice':
+            initial_positions = self.place_lattice(no_particles, radius)
+        else:
+            raise ValueError("placement must be 'random', 'grid' or 'lattice'")
+        # Give each particle a velocity of magnitude starting_speed and random direction
+        if directions is None:
+            directions = random_unit_vectors(no_particles, self.dimensions, self.rng)
+        particles = [Particle(position, direction*starting_speed, mass, radius) 
+                     for position, direction in zip(initial_positions, directions)]
+        
+        self.particles = particles
+        self.initialise_event_series()
+
+    def place_random(self, no_particles, radius):
+        """
+        Return non-overlapping random positions for the given number of particles, checking each new position 
+        against every particle already placed, along with a random direction for each particle if the System draws 
+        from the global np.random functions, or None otherwise
+        Without a generator of its own, a direction is drawn after each position tried, in the same order as 
+        earlier versions, so that runs seeded with np.random.seed place the same particles with the same velocities
+
+        no_particles - Int type value for the number of particles to place
+        radius - Float type value for the radius of the particles
+        """
+        particles = []
+        legacy = self.rng is np.random
+        directions = []
         # Randomly select the initial position of each particle, making sure it is 
         # within the system and not overlapping with any other particles
-        self.particles = []
         for i in range(no_particles):    
             searching = True
             while searching:
                 available_space = self.box - 2*radius
-                initial_position = Position(np.random.rand(self.dimensions)*available_space + radius)
-                # Give each particle a velocity of magnitude starting_speed and random direction
-                initial_velocity = (Velocity([0]*self.dimensions).random_unit_vector()) * starting_speed
-                new_particle = Particle(initial_position, initial_velocity, mass, radius)
+                initial_position = Position(self.rng.random(self.dimensions)*available_space + radius)
+                if legacy:
+                    direction = Velocity(self.rng.normal(0, 1, self.dimensions)).unit_vector().components
+                new_particle = Particle(initial_position, Velocity([0]*self.dimensions), 1, radius)
                 # Check for overlap with all current particles
                 overlap = False
-                for particle in self.particles:
+                for particle in particles:
                     if new_particle.overlap(particle):
                         overlap = True
                         break
                 if not overlap:
                     searching = False
-                    self.particles.append(new_particle)
-        
-        self.initialise_event_series()
+                    particles.append(new_particle)
+                    if legacy:
+                        directions.append(direction)
+        positions = np.array([particle.position.components for particle in particles]).reshape(no_particles, 
+                                                                                               self.dimensions)
+        return positions, np.array(directions).reshape(no_particles, self.dimensions) if legacy else None
+
+    def place_grid(self, no_particles, radius, max_attempts):
+        """
+        Return non-overlapping random positions for the given number of particles, only checking each new position
+        against particles already placed in neighbouring cells of a grid with cells one diameter wide
+
+        no_particles - Int type value for the number of particles to place
+        radius - Float type value for the radius of the particles
+        max_attempts - Int type value for the number of random positions tried for each particle
+        """
+        available_space = self.box - 2*radius
+        if np.any(available_space < 0):
+            raise PlacementError("The box is too small to hold a particle of radius " + str(radius))
+        grid = CellGrid(self.box, 2*radius)
+        positions = np.empty((no_particles, self.dimensions))
+        for i in range(no_particles):
+            for attempt in range(max_attempts):
+                candidate = self.rng.random(self.dimensions)*available_space + radius
+                nearby = grid.nearby(grid.cell_of(candidate))
+                separations = positions[nearby] - candidate
+                if not np.any(np.einsum('ij,ij->i', separations, separations) < (2*radius)**2):
+                    positions[i] = candidate
+                    grid.cells.setdefault(grid.cell_of(candidate), set()).add(i)
+                    break
+            else:
+                raise PlacementError("Could not place particle " + str(i+1) + " of " + str(no_particles) + " after " 
+                                     + str(max_attempts) + " attempts - the density is too high for random placement")
+        return positions
+
+    def place_lattice(self, no_particles, radius):
+        """
+        Return non-overlapping positions for the given number of particles at randomly chosen sites of a regular
+        lattice filling the box, each moved by a random jitter small enough to never cause an overlap
+
+        no_particles - Int type value for the number of particles to place
+        radius - Float type value for the radius of the particles
+        """
+        available_space = self.box - 2*radius
+        if no_particles == 0:
+            return np.empty((0, self.dimensions))
+        if np.any(available_space <= 0):
+            raise PlacementError("The box is too small to hold a particle of radius " + str(radius))
+
+        # Start from the spacing that gives exactly no_particles sites and add sites along the sparsest dimension
+        spacing = (np.prod(available_space)/no_particles)**(1/self.dimensions)
+        sites = np.maximum(np.floor(available_space/spacing), 1).astype(int)
+        while np.prod(sites) < no_particles:
+            sites[np.argmax(available_space/sites)] += 1
+        spacing = available_space/sites
+        if np.any(spacing < 2*radius):
+            raise PlacementError("Cannot fit " + str(no_particles) + " particles of radius " + str(radius) 
+                                 + " on a lattice in the box")
+
+        # Spread the particles over the lattice if there are more sites than particles
+        chosen = self.rng.permutation(np.prod(sites))[:no_particles]
+        positions = (np.array(np.unravel_index(chosen, sites)).T + 0.5)*spacing + radius
+        jitter = (spacing - 2*radius)/2
+        return positions + (2*self.rng.random((no_particles, self.dimensions)) - 1)*jitter
+
+    @property
+    def particles(self):
+        """
+        List-like view of the Particle objects viewing the particle arrays, which brings each particle up to the 
+        global_time only when it is read
+        """
+        return ParticleView(self)
+
+    @particles.setter
+    def particles(self, particles):
+        self._particles = list(particles)
+        self.store_particles()
+
+    def store_particles(self):
+        """
+        Copy the state of every Particle in self.particles into the contiguous particle arrays and make each Particle
+        a view of its row, so that changes made through either are seen by both
+        """
+        # Particles still viewing the old arrays may not have been propagated yet
+        self.synchronise()
+        self.no_particles = len(self._particles)
+        if self.no_particles == 0:
+            self.positions = np.empty((0, self.dimensions))
+            self.velocities = np.empty((0, self.dimensions))
+        else:
+            self.positions = np.array([particle.position.components for particle in self._particles], dtype=float)
+            self.velocities = np.array([particle.velocity.components for particle in self._particles], dtype=float)
+        self.masses = np.array([particle.mass for particle in self._particles], dtype=float)
+        self.radii = np.array([particle.radius for particle in self._particles], dtype=float)
+        self.update_times = np.full(self.no_particles, float(self.global_time))
+        self.recompute_observables()
+
+        # Point each Particle at its row so the arrays remain the single copy of the state
+        for index, particle in enumerate(self._particles):
+            particle.position.components = self.positions[index]
+            particle.velocity.components = self.velocities[index]
+
+    def store_arrays(self, positions, velocities, masses, radii):
+        """
+        Replace every particle with the given particle states, copied straight into the particle arrays, with each 
+        new Particle created as a view of its row
+
+        positions - array-like object containing the position of every particle, one row per particle
+        velocities - array-like object containing the velocity of every particle, one row per particle
+        masses - array-like object containing the mass of every particle
+        radii - array-like object containing the radius of every particle
+        """
+        self.positions = np.array(positions, dtype=float).reshape(-1, self.dimensions)
+        self.velocities = np.array(velocities, dtype=float).reshape(-1, self.dimensions)
+        self.masses = np.array(masses, dtype=float)
+        self.radii = np.array(radii, dtype=float)
+        self.no_particles = len(self.positions)
+        self._particles = [Particle(Position.wrap(position), Velocity.wrap(velocity), mass, radius) for 
+                           position, velocity, mass, radius in zip(self.positions, self.velocities, 
+                                                                   self.masses.tolist(), self.radii.tolist())]
+        self.update_times = np.full(self.no_particles, float(self.global_time))
+        self.propagated_time = self.global_time
+        self.recompute_observables()
+
+    def recompute_observables(self):
+        """
+        Recalculate the running kinetic energy and momentum totals from every particle - needed after velocities 
+        are changed other than by collide
+        """
+        self.kinetic_energy = 0.5*np.sum(self.masses*np.einsum('ij,ij->i', self.velocities, self.velocities))
+        self.momentum = np.sum(self.masses[:, np.newaxis]*self.velocities, axis=0)
+        if self.speed_histogram is not None:
+            self.speed_histogram.fill(self.speeds(), self.global_time)
+
+    def speeds(self):
+        """
+        Return the speed of every particle
+        """
+        return np.sqrt(np.einsum('ij,ij->i', self.velocities, self.velocities))
+
+    def track_speeds(self, max_speed, no_bins):
+        """
+        Start keeping a histogram of the particle speeds, updated by each collision, with its time average 
+        starting from the current global_time
+
+        max_speed - float type value for the upper edge of the last bin
+        no_bins - int type value for the number of bins below max_speed
+        """
+        self.speed_histogram = SpeedHistogram(max_speed, no_bins, self.global_time)
+        self.speed_histogram.fill(self.speeds(), self.global_time)
   
     def initialise_event_series(self):
         """
-        Calculate and organise all collisions in the system into a Pandas Series
+        Calculate and organise all collisions in the system into the event queue
         """
         # In case particles have been added manually after initialisation
-        self.no_particles = len(self.particles)
+        self.store_particles()
+        self.partners = [set() for i in range(self.no_particles)]
+        if self.cell_length is not None:
+            if self.no_particles and self.cell_length < 2*self.radii.max():
+                raise ValueError("cell_length must be at least the largest particle diameter")
+            self.grid = CellGrid(self.box, self.cell_length)
+            self.grid.assign(self.positions)
 
         event_timings = []
         event_index = []
         for particle_i in range(self.no_particles):
-            for D in range(1, self.dimensions+1):
-                event_timings.append(self.time_of_collision(particle_i, str(D)+'.Min'))
-                event_index.append((particle_i,str(D)+'.Min'))
-                event_timings.append(self.time_of_collision(particle_i, str(D)+'.Max'))
-                event_index.append((particle_i,str(D)+'.Max'))
-            for particle_j in range(particle_i+1, self.no_particles):
-                event_timings.append(self.time_of_collision(particle_i, particle_j))
-                event_index.append((particle_i,particle_j))
+            others = self.neighbours(particle_i)
+            others = others[others > particle_i]
+            times = self.collision_times(particle_i, others)
+            event_timings.extend(times)
+            event_index.extend([(particle_i,particle_j) for particle_j in others.tolist()])
+            event_index.extend([(particle_i,wall) for wall in self.walls])
+            if self.grid is not None:
+                event_timings.append(self.grid.exit_time(particle_i, self.positions[particle_i], 
+                                                         self.velocities[particle_i]))
+                event_index.append((particle_i,'Cell'))
+                for particle_j in others[times[:len(others)] != np.infty].tolist():
+                    self.partners[particle_i].add(particle_j)
+                    self.partners[particle_j].add(particle_i)
         
-        # Sort the entries by the time values
-        self.event_series = pd.Series(event_timings, event_index, dtype=np.float64)
-        self.event_series = self.event_series.sort_values()  
+        # Order the entries by their absolute time values
+        event_timings = np.array(event_timings, dtype=np.float64) + self.global_time
+        self.event_queue = EventQueue(zip(event_index, event_timings))
+        if self.stats is not None:
+            # Only time the events simulated from the new queue
+            self.stats.reset()
+
+    @property
+    def event_series(self):
+        """
+        View of the event queue giving the time remaining until each collision
+        """
+        return EventSeries(self.event_queue, self.global_time)
+
+    def synchronise(self, indices=None):
+        """
+        Propagate the given particles from the time they were last updated up to the global_time - only needed when 
+        the System is lazy, or after simulate_until, when every particle of a System that is not lazy is propagated
+
+        indices - Optional list or np.array of the particles' indices in self.particles, defaulting to all particles
+        """
+        if not self.lazy:
+            if self.propagated_time != self.global_time:
+                self.positions += self.velocities*(self.global_time - self.propagated_time)
+                self.propagated_time = self.global_time
+            return
+        if indices is None:
+            indices = slice(None)
+        self.positions[indices] += self.velocities[indices]*(self.global_time - self.update_times[indices])[:, np.newaxis]
+        self.update_times[indices] = self.global_time
+
+    def neighbours(self, index):
+        """
+        Return the indices of the particles that could collide with the given particle next - those in neighbouring
+        cells if a grid is used, otherwise every other particle
+
+        index - int type value of the particle's index in self.particles
+        """
+        if self.grid is None:
+            return np.delete(np.arange(self.no_particles), index)
+        return np.array(self.grid.neighbours(index), dtype=int)
+
+    def schedule_pair(self, index_1, index_2, time):
+        """
+        Store the collision time of 2 particles in event_queue
+
+        index_1 - int type value of the first particle's index in self.particles
+        index_2 - int type value of the second particle's index in self.particles
+        time - float type value of the time after which the particles collide
+        """
+        event = (min(index_1, index_2), max(index_1, index_2))
+        self.event_queue[event] = self.global_time + time
+        if self.grid is not None and time != np.infty:
+            self.partners[index_1].add(index_2)
+            self.partners[index_2].add(index_1)
+
+    def forget_pairs(self, index):
+        """
+        Remove every scheduled collision between the given particle and other particles from event_queue
+
+        index - int type value of the particle's index in self.particles
+        """
+        for partner in self.partners[index]:
+            self.event_queue.remove((min(index, partner), max(index, partner)))
+            self.partners[partner].discard(index)
+        self.partners[index] = set()
 
     def within_box(self, particle):
         """
@@ -106,94 +452,104 @@ class System:
         object_2 - int or str type value representing the index of the colliding particle in self.particles or the
                    dimension of the constraining wall
         """
-        particle_1 = self.particles[object_1]
-        
         # Check if object_2 is one of the container walls
         if type(object_2) == str:
-            dimension, side = object_2.split('.')
-            dimension = int(dimension) - 1
-            if side == 'Min':
-                coordinate = particle_1.radius
-            else:
-                coordinate = self.box[dimension] - particle_1.radius
-            # In case the particle is already touching the wall and has 0 velocity
-            if coordinate == particle_1.position[dimension]:
-                return 0
-            # To avoid division by zero errors
-            elif particle_1.velocity[dimension] == 0:
-                return np.infty
-            
-            else:
-                time = (coordinate - particle_1.position[dimension])/particle_1.velocity[dimension]
-            if time > 0:
-                return time
-            else:
-                return np.infty
-
+            wall = self.walls.index(object_2)
+            return self.kernels.wall_collision_times(self.positions[object_1], self.velocities[object_1], 
+                                                     self.radii[object_1], self.box)[wall]
         else:
-            particle_2 = self.particles[object_2]
-
-            # Check if both particles have 0 velocity
-            if particle_1.velocity.magnitude() == 0 and particle_2.velocity.magnitude() == 0:
-                return np.infty
-
-            velocity_difference = particle_2.velocity - particle_1.velocity
-            position_difference = particle_2.position - particle_1.position
-
-            # Define the quadratic coefficients to find the collision time
-            a = 0
-            b = 0
-            c = - (particle_1.radius + particle_2.radius)**2
-            for D in range(self.dimensions):
-                a += velocity_difference[D]**2
-                b += 2*velocity_difference[D]*position_difference[D]
-                c += position_difference[D]**2
-            roots = np.roots([a,b,c])
-
-            # Find the smallest positive and real root if applicable 
-            if type(roots[0]) == np.float64:
-                if (roots[0] < 0) != (roots[1] < 0):
-                    return max(roots)
-                elif (roots[0] > 0) and (roots[1] > 0):
-                    return min(roots)
-            return np.infty
+            return self.kernels.pair_collision_times(self.positions[object_1], self.velocities[object_1], 
+                                                     self.radii[object_1], self.positions[[object_2]],
+                                                     self.velocities[[object_2]], self.radii[[object_2]])[0]
+
+    def collision_times(self, index, others=None):
+        """
+        Returns the times after which the particle will collide with each of the other particles followed by each of 
+        the walls in self.walls, with np.infty for any it will not collide with on their current trajectories
+
+        index - int type value of the particle's index in self.particles
+        others - Optional np.array of the indices of the other particles, defaulting to every particle with the 
+                 particle itself given np.infty
+        """
+        if others is None:
+            others = np.arange(self.no_particles)
+        position = self.positions[index]
+        velocity = self.velocities[index]
+        radius = self.radii[index]
+        pair_times = self.kernels.pair_collision_times(position, velocity, radius, self.positions[others], 
+                                                       self.velocities[others], self.radii[others])
+        pair_times[others == index] = np.infty
+        wall_times = self.kernels.wall_collision_times(position, velocity, radius, self.box)
+        return np.concatenate([pair_times, wall_times])
 
     def update_event_series(self, object_1, object_2):
         """
-        Calculate the event timings for any particles involved in a collision and simultaneously update event_series
+        Calculate the event timings for any particles involved in a collision and simultaneously update event_queue
 
         object_1 - int type value representing the index of the colliding particle in self.particles
-        object_2 - int or str type value representing the index of the colliding particle in self.particles or the
-                   dimension of the constraining wall
+        object_2 - int or str type value representing the index of the colliding particle in self.particles, the
+                   dimension of the constraining wall or 'Cell' if the particle left its cell
         """
         # Check if either object is a wall
         to_update = [object_i for object_i in [object_1, object_2] if type(object_i) != str]
 
-        # Update all event_series entries corresponding to the particle(s)
+        # Update all event_queue entries corresponding to the particle(s)
         for particle_index in to_update:
-            for D in range(1, self.dimensions+1):
-                self.event_series[(particle_index,str(D)+'.Min')] = self.time_of_collision(particle_index,str(D)+'.Min')
-                self.event_series[(particle_index,str(D)+'.Max')] = self.time_of_collision(particle_index,str(D)+'.Max')
-            for index_1 in range(0,particle_index):
-                self.event_series[(index_1,particle_index)] = self.time_of_collision(index_1,particle_index)
-            for index_2 in range(particle_index+1, self.no_particles):
-                self.event_series[(particle_index,index_2)] = self.time_of_collision(particle_index,index_2)
-        
+            neighbours = self.neighbours(particle_index)
+            self.synchronise(neighbours)
+            times = self.collision_times(particle_index, neighbours)
+            exit_time = None
+            if self.grid is not None:
+                exit_time = self.grid.exit_time(particle_index, self.positions[particle_index], 
+                                                self.velocities[particle_index])
+            self.schedule_particle(particle_index, neighbours, times, exit_time)
+        self.discard_event(object_1, object_2)
+
+    def schedule_particle(self, index, neighbours, times, exit_time=None):
+        """
+        Replace every event_queue entry of a particle with newly calculated times
+
+        index - int type value of the particle's index in self.particles
+        neighbours - np.array of the indices of the particles the times were calculated against
+        times - np.array of the times after which the particle collides with each neighbour followed by each of the
+                walls in self.walls, as returned by collision_times
+        exit_time - Optional float type value of the time after which the particle leaves its cell, required if a 
+                    grid is used
+        """
+        now = self.global_time
+        for wall, time in zip(self.walls, times[len(neighbours):]):
+            self.event_queue[(index,wall)] = now + time
+        if self.grid is not None:
+            # Collisions with particles outside the new neighbourhood can no longer happen first
+            self.forget_pairs(index)
+            self.event_queue[(index,'Cell')] = now + exit_time
+        for other_index, time in zip(neighbours.tolist(), times[:len(neighbours)]):
+            self.schedule_pair(index, other_index, time)
+
+    def discard_event(self, object_1, object_2):
+        """
+        Remove the event that has just been simulated from event_queue
+
+        object_1 - int type value representing the index of the colliding particle in self.particles
+        object_2 - int or str type value representing the index of the colliding particle in self.particles, the
+                   dimension of the constraining wall or 'Cell' if the particle left its cell
+        """
         # Ensures the next event can't be between the same objects due to machine precision causing overlaps
-        self.event_series[(object_1, object_2)] = np.infty
-        
-        # Sort the new event_series
-        self.event_series = self.event_series.sort_values()
+        if object_2 != 'Cell':
+            self.event_queue.remove((object_1, object_2))
+            if type(object_2) != str:
+                self.partners[object_1].discard(object_2)
+                self.partners[object_2].discard(object_1)
 
     def collide(self, object_1, object_2):
         """
-        Calculate and update the velocities of particles involved in the collision
+        Calculate and update the velocities of particles involved in the collision, along with the running totals 
+        of the observables they change
 
         object_1 - int type value representing the index of the colliding particle in self.particles
         object_2 - int or str type value representing the index of the colliding particle in self.particles or the
                    dimension of the constraining wall
         """
-        particle_1 = self.particles[object_1]
         self.no_collisions += 1
 
         # Check if object_2 is one of the container walls
@@ -201,60 +557,358 @@ class System:
             # Identify which coordinate the wall is restricting
             dimension, side = object_2.split('.')
             dimension = int(dimension) - 1
-            # Add the impulse acting on the wall to the System total
-            self.net_impulse += 2*particle_1.mass*abs(particle_1.velocity[dimension])
-            # Invert the velocity component perpendicular to the wall
-            particle_1.velocity.invert_component(dimension)
+            # Invert the velocity component perpendicular to the wall and add the impulse acting on the wall to the 
+            # System total
+            impulse = self.kernels.reflect(self.velocities, self.masses, object_1, dimension)
+            self.net_impulse += impulse
+            self.wall_impulse[self.walls.index(object_2)] += impulse
+            # The wall reverses the particle's momentum perpendicular to it, leaving its kinetic energy unchanged
+            self.momentum[dimension] += 2*self.masses[object_1]*self.velocities[object_1, dimension]
         else:
-            particle_2 = self.particles[object_2]
-            mass_1 = particle_1.mass
-            mass_2 = particle_2.mass
-            unit_position_vector = (particle_2.position - particle_1.position).unit_vector()
-            delta_velocity = (particle_2.velocity - particle_1.velocity)
-            impulse = Vector(unit_position_vector) * (-((2*mass_1*mass_2)/(mass_1+mass_2))*(delta_velocity@unit_position_vector))
-            particle_1.velocity.add_velocity(-Velocity(impulse)/mass_1)     
-            particle_2.velocity.add_velocity(Velocity(impulse)/mass_2)   
+            pair = [object_1, object_2]
+            old_momentum = self.masses[pair] @ self.velocities[pair]
+            old_energy = 0.5*self.masses[pair] @ np.einsum('ij,ij->i', self.velocities[pair], self.velocities[pair])
+            self.kernels.collide_pair(self.positions, self.velocities, self.masses, object_1, object_2)
+            self.momentum += self.masses[pair] @ self.velocities[pair] - old_momentum
+            self.kinetic_energy += 0.5*self.masses[pair] @ np.einsum('ij,ij->i', self.velocities[pair], 
+                                                                     self.velocities[pair]) - old_energy
+            # Only the two particles' speeds change, and a wall reflection leaves the speed unchanged
+            if self.speed_histogram is not None:
+                for index in pair:
+                    velocity = self.velocities[index]
+                    self.speed_histogram.update(index, math.sqrt(velocity @ velocity), self.global_time)
+
+        if self.recompute_interval is not None and self.no_collisions % self.recompute_interval == 0:
+            self.recompute_observables()
+
+    def reset_measurement(self):
+        """
+        Reset the impulse totals and start measuring them from the current global_time, to exclude the time before 
+        the System reached equilibrium
+        """
+        self.net_impulse = 0
+        self.wall_impulse = np.zeros(2*self.dimensions)
+        self.measurement_start = self.global_time
+        if self.speed_histogram is not None:
+            self.speed_histogram.reset_average(self.global_time)
 
     def system_KE(self):
         """
         Return the total kinetic energy of the system
         """
-        KE = 0
-        for particle in self.particles:
-            KE += np.float64(particle.kinetic_energy())
-        return KE
+        return self.kinetic_energy
 
     def simulate_event(self):
         """
-        Simulate a single event for the whole system, updating the positions of all particles up to the next event, updating the 
-        particles involved in the collision and recalculating relevant collision times in the event_series
+        Simulate a single event for the whole system, updating the positions of all particles (or only those involved if 
+        the System is lazy) up to the next event, updating the particles involved in the collision and recalculating relevant collision times in the event_queue
         """
-        # First index of the sorted series is the next collision
-        (object_1, object_2) = self.event_series.first_valid_index()
-        time =  self.event_series[0]
-        
-        # Update all particles over the time step
-        for particle in self.particles:
-            particle.update(time)
-        
-        self.global_time += time
-        self.collide(object_1, object_2)
-        
-        # Progress the time of collisions not changed by the collision before updating the event_series
-        self.event_series -= time
+        if self.stats is not None:
+            return self.simulate_event_profiled()
+        # Root of the event queue is the next collision
+        (object_1, object_2), event_time = self.event_queue.peek()
+        self.propagate_to(event_time, object_1, object_2)
+        self.handle_event(object_1, object_2)
+        self.update_event_series(object_1, object_2)
+
+    def propagate_to(self, event_time, object_1, object_2):
+        """
+        Advance the System to the time of an event, moving every particle, or only the particles taking part in the
+        event if the System is lazy
+
+        event_time - float type value of the absolute time of the event
+        object_1 - int type value representing the index of the particle in the event
+        object_2 - int or str type value representing the index of the other particle, a wall or 'Cell'
+        """
+        # Event times are absolute, so collisions not changed by this one need no adjustment
+        if self.lazy:
+            # Only the particles taking part in the event need to be brought up to date
+            self.global_time = event_time
+            self.synchronise([object_i for object_i in [object_1, object_2] if type(object_i) != str])
+        else:
+            # Update all particles over the time step, from the last event if simulate_until has moved on since
+            self.positions += self.velocities*(event_time - self.propagated_time)
+            self.global_time = event_time
+            self.propagated_time = event_time
+
+    def handle_event(self, object_1, object_2):
+        """
+        Carry out an event once the System has been propagated to its time, colliding the objects or moving the 
+        particle into its new cell
+
+        object_1 - int type value representing the index of the particle in the event
+        object_2 - int or str type value representing the index of the other particle, a wall or 'Cell'
+        """
+        if object_2 == 'Cell':
+            self.grid.move(object_1, self.positions[object_1], self.velocities[object_1])
+        else:
+            self.collide(object_1, object_2)
+
+    def simulate_until(self, time):
+        """
+        Simulate every event up to and including the given time and then advance the System to exactly that time, 
+        without propagating any particles - positions_at gives their positions at the time, and synchronise brings 
+        them up to it
+
+        time - float type value of the global_time to advance to, which must not be earlier than the current one
+        """
+        if time < self.global_time:
+            raise ValueError("Cannot simulate back to an earlier time")
+        while len(self.event_queue) and self.event_queue.peek()[1] <= time:
+            self.simulate_event()
+        # Nothing happens between events, so the particles are only propagated to the time when they are next needed
+        self.global_time = time
+
+    def positions_at(self, indices=None, time=None):
+        """
+        Return the positions of the given particles at a time no later than the next event, without changing the 
+        state of the System
+
+        indices - Optional list or np.array of the particles' indices in self.particles, defaulting to all particles
+        time - Optional float type value of the time to find the positions at, defaulting to the global_time
+        """
+        if indices is None:
+            indices = slice(None)
+        if time is None:
+            time = self.global_time
+        # Positions of a lazy System are only up to date at each particle's update_time
+        last_update = self.update_times[indices] if self.lazy else np.full(len(self.positions[indices]), 
+                                                                              float(self.propagated_time))
+        return self.positions[indices] + self.velocities[indices]*(time - last_update)[:, np.newaxis]
+
+    def simulate_event_profiled(self):
+        """
+        Simulate a single event with the same steps as simulate_event, adding the time spent in each phase and the 
+        type of the event to self.stats
+        """
+        stats = self.stats
+        start = tm.perf_counter()
+        (object_1, object_2), event_time = self.event_queue.peek()
+        queue_time = tm.perf_counter() - start
+
+        start = tm.perf_counter()
+        self.propagate_to(event_time, object_1, object_2)
+        stats.add('propagate', tm.perf_counter() - start)
+
+        start = tm.perf_counter()
+        self.handle_event(object_1, object_2)
+        stats.add('collide', tm.perf_counter() - start)
+
+        # Neighbour finding and prediction are timed inside update_event_series, the remainder is queue updates
+        inner_time = stats.times['neighbours'] + stats.times['predict']
+        start = tm.perf_counter()
         self.update_event_series(object_1, object_2)
+        update_time = tm.perf_counter() - start
+        stats.add('queue', queue_time + update_time - (stats.times['neighbours'] + stats.times['predict'] - inner_time))
+        stats.count_event(object_2)
 
     def check_N(self):
         """
         Return True if the number of particles in the box equals no_particles
         """
-        in_box = 0
-        for particle in self.particles:
-            if self.within_box(particle):
-                in_box += 1
+        self.synchronise()
+        available_space = self.box - 2*self.radii[:, np.newaxis]
+        offset = self.positions - self.radii[:, np.newaxis]
+        in_box = np.count_nonzero(np.all((0 <= offset) & (offset <= available_space), axis=1))
         # Machine precision may leave the last colliding particle temporarily outside the box 
         # before it can propagate inside again
         if in_box == self.no_particles or in_box == self.no_particles - 1:
             return True
         return False
 
+    def encode_object(self, object_2):
+        """
+        Return an int code for the second object of an event - its index if it is a particle and a negative number 
+        identifying a wall or the cell boundary otherwise
+
+        object_2 - int or str type value representing the index of a particle, the dimension of a wall or 'Cell'
+        """
+        if type(object_2) != str:
+            return object_2
+        if object_2 == 'Cell':
+            return -len(self.walls) - 1
+        return -self.walls.index(object_2) - 1
+
+    def decode_object(self, code):
+        """
+        Return the second object of an event from the int code given by encode_object
+
+        code - int type value returned by encode_object
+        """
+        if code >= 0:
+            return code
+        if code == -len(self.walls) - 1:
+            return 'Cell'
+        return self.walls[-code - 1]
+
+    def save_checkpoint(self, file_name):
+        """
+        Save the complete state of the System, including the event queue, counters and the state of the random 
+        number generator, to a .npz file from which load_checkpoint can continue the simulation exactly
+
+        file_name - str type value of the file to save to, which is replaced atomically
+        """
+        self.write_checkpoint(file_name, self.checkpoint_data())
+
+    def checkpoint_data(self):
+        """
+        Return a dictionary of copies of everything save_checkpoint saves, which write_checkpoint can write later 
+        while the System carries on
+        """
+        events = self.event_queue.items()
+        data = {'box': self.box, 'cell_length': np.nan if self.cell_length is None else self.cell_length,
+                'lazy': self.lazy, 'backend': self.kernels.name, 
+                'recompute_interval': 0 if self.recompute_interval is None else self.recompute_interval,
+                'global_time': self.global_time, 'no_collisions': self.no_collisions, 'net_impulse': self.net_impulse,
+                'measurement_start': self.measurement_start,
+                'wall_impulse': self.wall_impulse, 'kinetic_energy': self.kinetic_energy, 'momentum': self.momentum,
+                # Positions of a System that is not lazy may not have been propagated since simulate_until
+                'positions': self.positions if self.lazy else self.positions_at(), 'velocities': self.velocities, 
+                'masses': self.masses, 'radii': self.radii, 'update_times': self.update_times,
+                'event_object_1': np.array([event[0] for event, time in events], dtype=int),
+                'event_object_2': np.array([self.encode_object(event[1]) for event, time in events], dtype=int),
+                'event_times': np.array([time for event, time in events], dtype=float)}
+        if self.rng is np.random:
+            state = np.random.get_state()
+            data.update({'rng_keys': state[1], 'rng_position': state[2], 'rng_has_gauss': state[3], 
+                         'rng_cached_gaussian': state[4]})
+        else:
+            data['rng_state'] = json.dumps(self.rng.bit_generator.state)
+            if isinstance(self.seed, (int, np.integer)):
+                data['seed'] = int(self.seed)
+            elif self.seed is not None:
+                # Any other seed is saved as the entropy and spawn key of its SeedSequence, which recreate it
+                sequence = self.seed
+                if not isinstance(sequence, np.random.SeedSequence):
+                    sequence = np.random.SeedSequence(sequence)
+                data['seed_sequence'] = json.dumps({'entropy': sequence.entropy, 'spawn_key': sequence.spawn_key}, 
+                                                   default=lambda value: value.tolist())
+        if self.grid is not None:
+            data['particle_cells'] = self.grid.particle_cells
+        if self.speed_histogram is not None:
+            histogram = self.speed_histogram
+            data.update({'histogram_range': [histogram.max_speed, histogram.no_bins], 
+                         'histogram_start': histogram.start_time, 'histogram_totals': histogram.totals, 
+                         'histogram_times': histogram.bin_times})
+        return {key: np.copy(value) if isinstance(value, np.ndarray) else value for key, value in data.items()}
+
+    @staticmethod
+    def write_checkpoint(file_name, data):
+        """
+        Write the checkpoint data returned by checkpoint_data to a .npz file
+
+        file_name - str type value of the file to save to, which is replaced atomically
+        data - dictionary returned by checkpoint_data
+        """
+        # Write to a temporary file first so an interruption can never leave a partial checkpoint
+        temporary_name = file_name + '.tmp'
+        with open(temporary_name, 'wb') as file:
+            np.savez(file, **data)
+        os.replace(temporary_name, file_name)
+
+    @classmethod
+    def load_checkpoint(cls, file_name):
+        """
+        Return the System saved in a .npz file by save_checkpoint, restoring its random number generator, or the 
+        global one if it had none of its own, to the saved state
+
+        file_name - str type value of the file to load
+        """
+        data = np.load(file_name, allow_pickle=False)
+        cell_length = float(data['cell_length'])
+        system = cls(0, 1, 1, list(data['box']), 0, cell_length=None if np.isnan(cell_length) else cell_length, 
+                     lazy=bool(data['lazy']), backend=str(data['backend']), 
+                     recompute_interval=int(data['recompute_interval']) or None)
+        system.restore_checkpoint(data)
+        return system
+
+    def restore_checkpoint(self, data):
+        """
+        Replace the state of the System with checkpoint data, restoring its random number generator, or the global 
+        one if it had none of its own, to the saved state
+        The System must have been initialised with the same box, cell_length, lazy, backend and recompute_interval 
+        as the System the data was saved from
+
+        data - dictionary returned by checkpoint_data, or the data of a file saved by save_checkpoint
+        """
+        self.global_time = float(data['global_time'])
+        self.no_collisions = int(data['no_collisions'])
+        self.net_impulse = float(data['net_impulse'])
+        self.wall_impulse = np.array(data['wall_impulse'], dtype=float)
+        # Checkpoints from before measurements could be reset measured from the start
+        self.measurement_start = float(data['measurement_start']) if 'measurement_start' in data else 0
+        self.store_arrays(data['positions'], data['velocities'], data['masses'], data['radii'])
+        self.update_times = np.array(data['update_times'], dtype=float)
+        # Keep the saved running totals, including any drift, so the run continues exactly
+        self.kinetic_energy = float(data['kinetic_energy'])
+        self.momentum = np.array(data['momentum'], dtype=float)
+
+        # Restore the event queue exactly rather than predicting it again, so no event is repeated or lost
+        events = [((object_1, self.decode_object(code)), time) for object_1, code, time 
+                  in zip(data['event_object_1'].tolist(), data['event_object_2'].tolist(), data['event_times'])]
+        self.event_queue = EventQueue.from_heap(events)
+        self.partners = [set() for i in range(self.no_particles)]
+        if self.cell_length is not None:
+            self.grid = CellGrid(self.box, self.cell_length)
+            self.grid.place(data['particle_cells'])
+            for (object_1, object_2), time in events:
+                if type(object_2) != str:
+                    self.partners[object_1].add(object_2)
+                    self.partners[object_2].add(object_1)
+        if 'histogram_range' in data:
+            max_speed, no_bins = data['histogram_range']
+            self.track_speeds(max_speed, int(no_bins))
+            self.speed_histogram.start_time = float(data['histogram_start'])
+            self.speed_histogram.totals = np.array(data['histogram_totals'], dtype=float)
+            self.speed_histogram.bin_times = np.array(data['histogram_times'], dtype=float)
+        else:
+            self.speed_histogram = None
+
+        if 'rng_state' in data:
+            state = json.loads(str(data['rng_state']))
+            bit_generator = getattr(np.random, state['bit_generator'])()
+            bit_generator.state = state
+            self.rng = np.random.Generator(bit_generator)
+            if 'seed' in data:
+                self.seed = int(data['seed'])
+            elif 'seed_sequence' in data:
+                sequence = json.loads(str(data['seed_sequence']))
+                self.seed = np.random.SeedSequence(sequence['entropy'], spawn_key=sequence['spawn_key'])
+            else:
+                self.seed = None
+        else:
+            np.random.set_state(('MT19937', data['rng_keys'], int(data['rng_position']), int(data['rng_has_gauss']),
+                                 float(data['rng_cached_gaussian'])))
+
+class ParticleView(Sequence):
+    """
+    List-like view of the Particle objects of a System, bringing each particle up to the global_time as it is read 
+    so that reading some particles of a lazy System does not propagate all of them
+
+    Has the following attributes:
+    self.system -> The System whose particles are viewed (System)
+    """
+
+    def __init__(self, system):
+        """
+        Initialisation arguments:
+
+        system - System type object whose particles to view
+        """
+        self.system = system
+
+    def __getitem__(self, index):
+        """
+        Return the Particle, or list of Particles for a slice, at the given index after bringing it up to the 
+        global_time
+
+        index - int type value or slice of the particles' indices in System.particles
+        """
+        if isinstance(index, slice):
+            self.system.synchronise(np.arange(len(self))[index])
+        else:
+            self.system.synchronise([index])
+        return self.system._particles[index]
+
+    def __len__(self):
+        return len(self.system._particles)
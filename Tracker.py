@@ -1,4 +1,14 @@
 from System import *
+from Recorder import TrajectoryRecorder
+from Results import ResultsStore
+from states import save_state, load_state
+from Parallel import ParallelEngine
+from plotter import plot_trajectory
+from render import render_trajectory
+from Writer import BackgroundWriter
+from Cache import ResultCache
+import contextlib
+import shutil
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -6,6 +16,7 @@ import matplotlib as mpl
 import math
 import time as tm
 import scipy.constants as sp
+import scipy.stats as stats
 
 class Tracker:
     """
@@ -13,6 +24,15 @@ class Tracker:
 
     Has the following attributes:
     self.system -> System to simulate and analyse (System)
+    self.block_time -> The length of simulated time of each pressure block, or None until it is chosen (float)
+    self.block_start -> Contains the global_time, net_impulse and no_collisions at the start of the current 
+                        pressure block (tuple)
+    self.block_pressures -> Contains the pressure measured over each completed block (list of floats)
+    self.blocks_restored -> Whether the pressure blocks were restored from a checkpoint by resume, so that the next 
+                            simulate continues them rather than starting new ones (bool)
+    self.equilibrated -> Whether the System has been equilibrated by equilibrate, so that simulate does not 
+                         equilibrate it again (bool)
+    self.equilibration_collisions -> The number of collisions equilibrate took, or None if it has not been run (int)
     """
 
     def __init__(self, system = System(0,1,1,[1,1,1],1)):
@@ -22,189 +42,525 @@ class Tracker:
         system - System type object to simulate
         """
         self.system = system
+        self.start_blocks()
+        self.blocks_restored = False
+        self.equilibrated = False
+        self.equilibration_collisions = None
 
     def temperature(self):
         """
         Returns the temperature of the system
         """
-
-        # Calculate the total energy of the system
-        KE_total = 0
-        for particle in self.system.particles:
-            KE_total += particle.kinetic_energy()
-        return 2*KE_total/(sp.Boltzmann*self.system.no_particles*len(self.system.box))
+        return 2*self.system.system_KE()/(sp.Boltzmann*self.system.no_particles*len(self.system.box))
 
     def pressure(self):
         """
-        Return the pressure of the system
+        Return the pressure of the system, measured since System.measurement_start
         """
-        if self.system.global_time == 0:
+        if self.measured_time() == 0:
             return 0
-        container_area = 0
-        for dimension_main in range(len(self.system.box)):
-            other_dimensions = list(range(len(self.system.box)))
-            other_dimensions.remove(dimension_main)
-            # Opposite sides have equal area
-            area = 2
-            for dimension in other_dimensions:
-                area *= self.system.box[dimension]
-            container_area += area
-        return self.system.net_impulse / (self.system.global_time*container_area)
+        return self.system.net_impulse / (self.measured_time()*self.container_area())
+
+    def measured_time(self):
+        """
+        Return the simulated time the wall impulses have been measured over
+        """
+        return self.system.global_time - self.system.measurement_start
+
+    def container_area(self):
+        """
+        Return the total area of the container walls
+        """
+        # Opposite sides have equal area, given by the product of the other box lengths
+        box = self.system.box
+        return np.sum([2*np.prod(np.delete(box, dimension)) for dimension in range(len(box))])
+
+    def start_blocks(self, block_time=None):
+        """
+        Discard any pressure blocks and start the first new block at the current global_time
+
+        block_time - Optional float type value for the length of simulated time of each block, defaulting to the 
+                     time taken by the first no_particles collisions
+        """
+        self.block_time = block_time
+        self.block_start = (self.system.global_time, self.system.net_impulse, self.system.no_collisions)
+        self.block_pressures = []
+
+    def update_blocks(self):
+        """
+        Complete the current pressure block if it has lasted block_time, returning True if a block was completed
+        """
+        start_time, start_impulse, start_collisions = self.block_start
+        elapsed = self.system.global_time - start_time
+        if self.block_time is None:
+            if self.system.no_collisions - start_collisions < self.system.no_particles:
+                return False
+            self.block_time = elapsed
+        elif elapsed < self.block_time:
+            return False
+        self.block_pressures.append((self.system.net_impulse - start_impulse) / (elapsed*self.container_area()))
+        self.block_start = (self.system.global_time, self.system.net_impulse, self.system.no_collisions)
+        return True
+
+    def pressure_error(self):
+        """
+        Return the standard error of the block-averaged pressure and the same error relative to the mean pressure, 
+        both np.infty until 2 blocks are complete
+        """
+        if len(self.block_pressures) < 2:
+            return np.infty, np.infty
+        error = np.std(self.block_pressures, ddof=1) / np.sqrt(len(self.block_pressures))
+        return error, error / abs(np.mean(self.block_pressures))
+
+    def wall_pressures(self):
+        """
+        Return the pressure on each wall of the system, ordered as System.walls, measured since 
+        System.measurement_start
+        """
+        if self.measured_time() == 0:
+            return np.zeros(len(self.system.walls))
+        box = self.system.box
+        areas = np.repeat([np.prod(np.delete(box, dimension)) for dimension in range(len(box))], 2)
+        return self.system.wall_impulse / (self.measured_time()*areas)
+
+    def equilibrium_test(self):
+        """
+        Return the Kolmogorov-Smirnov statistic and p-value comparing the speeds of the particles to the 
+        Maxwell-Boltzmann distribution at the system's temperature
+        """
+        # Each speed scaled by sqrt(kT/m) follows a chi distribution with one degree of freedom per dimension
+        kT = sp.Boltzmann*self.temperature()
+        speeds = np.sqrt(np.einsum('ij,ij->i', self.system.velocities, self.system.velocities))
+        result = stats.kstest(speeds*np.sqrt(self.system.masses/kT), 'chi', args=(self.system.dimensions,))
+        return result.statistic, result.pvalue
+
+    def equilibrate(self, max_collisions, check_interval=None, significance=0.05, consecutive=3):
+        """
+        Run the simulation until the speeds of the particles are consistent with the Maxwell-Boltzmann distribution, 
+        then reset the System's impulse totals and the pressure blocks so measurement starts from equilibrium
+        Returns the number of collisions taken to equilibrate
+
+        max_collisions - int type value of the total number of collisions to give up at, raising a SimulationError
+        check_interval - Optional int type value for the number of collisions between tests of the speeds, 
+                         defaulting to the number of particles
+        significance - float type value of the p-value the speeds must reach to pass a test
+        consecutive - int type value of the number of tests in a row that must pass, as a single test can pass by 
+                      chance before equilibrium
+        """
+        if check_interval is None:
+            check_interval = max(self.system.no_particles, 1)
+        start_collisions = self.system.no_collisions
+        passed = 0
+        next_check = start_collisions + check_interval
+        while passed < consecutive:
+            if self.system.no_collisions >= max_collisions:
+                raise SimulationError("The speeds did not reach the Maxwell-Boltzmann distribution within " 
+                                      + str(max_collisions) + " collisions")
+            self.system.simulate_event()
+            if self.system.no_collisions >= next_check:
+                next_check += check_interval
+                passed = passed + 1 if self.equilibrium_test()[1] >= significance else 0
+        self.system.reset_measurement()
+        self.start_blocks(self.block_time)
+        self.equilibrated = True
+        self.equilibration_collisions = self.system.no_collisions - start_collisions
+        return self.equilibration_collisions
+
+    def momentum(self):
+        """
+        Return the total momentum of the system
+        """
+        return self.system.momentum
 
     def volume(self):
         """
         Return the volume of the system
         """
-        volume = 1
-        for length in self.system.box:
-            volume *= length
-        return volume
+        return np.prod(self.system.box)
 
-    def simulate(self, total_collisions, simulation_name):
+    def simulate(self, total_collisions, simulation_name, checkpoint_interval=None, target_error=None, 
+                 block_time=None, min_blocks=10, store=None, state_format='npy', processes=None, 
+                 max_equilibration=None, writer=None, cache=None):
         """
         Run the simulation for the given number of collsions, save the final state of the system as a
-        .pkl file and separately save simulated quantities in a .csv file
+        .npy file and separately save simulated quantities in a .csv file
+        A System resumed from a checkpoint continues from its saved number of collisions
+        If a target_error is given the pressure is also measured over blocks of simulated time and the simulation
+        stops early once the relative standard error of the block-averaged pressure falls below it, with the 
+        achieved error saved in the .csv file
+        If max_equilibration is given the pressure is only measured once the speeds of the particles reach the 
+        Maxwell-Boltzmann distribution, with the collisions taken and the time measurement started saved in the 
+        .csv file - a System already equilibrated, such as one resumed from a checkpoint saved after equilibrating, 
+        is not equilibrated again
 
-        total_collisions - int type value of the number of collisions to simulate
+        total_collisions - int type value of the number of collisions to simulate, or the most collisions to 
+                           simulate if a target_error is given
         simulation_name - str type value for the file names
+        checkpoint_interval - Optional int type value, if given the complete System is saved to 
+                              '<simulation_name> Checkpoint.npz' every checkpoint_interval collisions
+        target_error - Optional float type value of the relative standard error of the pressure to stop at
+        block_time - Optional float type value for the length of simulated time of each pressure block, 
+                     defaulting to the time taken by the first no_particles collisions
+        min_blocks - int type value for the fewest blocks to complete before the error is trusted
+        store - Optional ResultsStore type object, or str type value of its file, to also add the quantities to 
+                along with the System's parameters and seed
+        state_format - str type value that accepts: 'npy' to save the final state with save_state, 'pkl' to save it 
+                       as a pickled DataFrame as older versions did
+        processes - Optional int type value, if given the events of a lazy System with a grid are simulated across 
+                    this many processes by a ParallelEngine, with checkpoints and pressure blocks checked after each
+                    round of events rather than each event - only faster for Systems of many thousands of particles 
+                    with a core for each process
+        max_equilibration - Optional int type value of the most collisions to spend reaching equilibrium with 
+                            equilibrate before measuring, which count towards total_collisions
+        writer - Optional BackgroundWriter type object to write the files with, which is left open so that the 
+                 files of several runs can be written while the next one runs, defaulting to a new writer closed 
+                 once every file is written
+        cache - Optional ResultCache type object, or str type value of its folder, to reuse the files and final 
+                System of an identical earlier run from rather than simulating again, or to add this run to
         """
-        # Run the simulation
-        print(tm.process_time())
-        while self.system.no_collisions < total_collisions:
-            self.system.simulate_event()
-        print(tm.process_time())
+        if cache is not None:
+            if type(cache) == str:
+                cache = ResultCache(cache)
+            # Checkpoints do not change the results, so runs differing only in them share a key, and neither do 
+            # processes unless pressure blocks are checked, as a ParallelEngine checks them after each round
+            key = cache.key(self.system, {'total_collisions': total_collisions, 'target_error': target_error, 
+                                          'block_time': block_time, 'min_blocks': min_blocks, 
+                                          'state_format': state_format, 'max_equilibration': max_equilibration,
+                                          'blocks': self.block_data() if self.blocks_restored else None,
+                                          'equilibration': self.equilibration_collisions,
+                                          'parallel': processes is not None if target_error is not None else None})
+            if self.load_cached(cache, key, simulation_name, store, checkpoint_interval):
+                return
 
-        # Check N is conserved
-        if not self.system.check_N():
-            raise SimulationError("Unexpected number of particles in the box")
+        with self.output_writer(writer) as writer:
+            # Run the simulation
+            print(tm.process_time())
+            if max_equilibration is not None and not self.equilibrated:
+                self.equilibrate(self.system.no_collisions + max_equilibration)
+            next_checkpoint = np.infty
+            if checkpoint_interval is not None:
+                next_checkpoint = self.system.no_collisions + checkpoint_interval
+            # A resumed run carries on with the blocks it had completed, rather than starting its measurement again
+            if target_error is not None and not self.blocks_restored:
+                self.start_blocks(block_time)
+            self.blocks_restored = False
+            engine = ParallelEngine(self.system, processes) if processes is not None else None
+            try:
+                while self.system.no_collisions < total_collisions:
+                    if engine is None:
+                        self.system.simulate_event()
+                    else:
+                        engine.simulate_batch(total_collisions - self.system.no_collisions)
+                    if self.system.no_collisions >= next_checkpoint:
+                        writer.submit(System.write_checkpoint, simulation_name + ' Checkpoint.npz', 
+                                      self.checkpoint_data())
+                        next_checkpoint += checkpoint_interval
+                    if target_error is not None and self.update_blocks() and len(self.block_pressures) >= min_blocks:
+                        if self.pressure_error()[1] < target_error:
+                            break
+            finally:
+                if engine is not None:
+                    engine.close()
+            print(tm.process_time())
+
+            # Check N is conserved
+            if not self.system.check_N():
+                raise SimulationError("Unexpected number of particles in the box")
+
+            # Store all particle properties with one row per particle
+            self.system.synchronise()
+            if state_format == 'npy':
+                writer.submit(save_state, simulation_name + ' State.npy', self.system.positions.copy(), 
+                              self.system.velocities.copy(), self.system.masses.copy(), self.system.radii.copy())
+            elif state_format == 'pkl':
+                final_state = pd.DataFrame({'Position': list(self.system.positions.copy()), \
+                                            'Velocity': list(self.system.velocities.copy()), \
+                                            'Mass': self.system.masses.copy(), \
+                                            'Radius': self.system.radii.copy()})
+                writer.submit(final_state.to_pickle, simulation_name + ' State.pkl')
+            else:
+                raise ValueError("state_format must be 'npy' or 'pkl'")
+
+            quantities = pd.Series({'Pressure': self.pressure(), 'Volume': self.volume(), \
+                                    'Temperature': self.temperature(), \
+                                    'Number of particles': self.system.no_particles, \
+                                    'Number of collisions': self.system.no_collisions, \
+                                    'Time': self.system.global_time})
+            if self.equilibrated:
+                quantities['Equilibration collisions'] = self.equilibration_collisions
+                quantities['Measurement start'] = self.system.measurement_start
+            if target_error is not None:
+                error, relative_error = self.pressure_error()
+                quantities['Pressure error'] = error
+                quantities['Relative pressure error'] = relative_error
+                quantities['Number of blocks'] = len(self.block_pressures)
+            writer.submit(quantities.to_csv, simulation_name + ' Quantities.csv')
+            if cache is not None:
+                writer.flush()
+                self.cache_run(cache, key, simulation_name, state_format)
+            if store is not None:
+                self.store_run(store, quantities, simulation_name)
+
+    def cache_run(self, cache, key, simulation_name, state_format='npy'):
+        """
+        Add the files saved by simulate, the final System and the pressure blocks to a ResultCache
+
+        cache - ResultCache type object to add the run to
+        key - str type value of the run's key, given by ResultCache.key before the run
+        simulation_name - str type value of the run's file names
+        state_format - str type value of the format the final state was saved in, 'npy' or 'pkl'
+        """
+        with cache.entry(key) as folder:
+            for name in ['State.' + state_format, 'Quantities.csv']:
+                shutil.copyfile(simulation_name + ' ' + name, os.path.join(folder, name))
+            System.write_checkpoint(os.path.join(folder, 'Checkpoint.npz'), self.checkpoint_data())
+
+    def load_cached(self, cache, key, simulation_name, store=None, checkpoint_interval=None):
+        """
+        Copy the files of a cached run to the simulation's file names and load the run's final state into the 
+        System, as if the run had just been simulated, returning False if the run is not cached
+
+        cache - ResultCache type object to look for the run in
+        key - str type value of the run's key
+        simulation_name - str type value for the file names
+        store - Optional ResultsStore type object, or str type value of its file, to also add the quantities to
+        checkpoint_interval - Optional int type value, if given the final state is also saved to 
+                              '<simulation_name> Checkpoint.npz' in place of the run's checkpoints
+        """
+        folder = cache.get(key)
+        if folder is None:
+            return False
+        global_state = np.random.get_state()
+        try:
+            for name in os.listdir(folder):
+                if name.startswith('State.') or name == 'Quantities.csv':
+                    shutil.copyfile(os.path.join(folder, name), simulation_name + ' ' + name)
+            with np.load(os.path.join(folder, 'Checkpoint.npz'), allow_pickle=False) as data:
+                data = dict(data)
+        except FileNotFoundError:
+            # Another process removed the run while it was being read
+            return False
+        # Loaded into the same System, so any reference to it sees the final state
+        self.system.restore_checkpoint(data)
+        self.restore_checkpoint(data)
+        # Loading a System without a generator of its own sets the global random state, which a run leaves alone
+        if self.system.rng is np.random:
+            np.random.set_state(global_state)
+        # The run is over, as if it had just been simulated
+        self.blocks_restored = False
+        if checkpoint_interval is not None:
+            System.write_checkpoint(simulation_name + ' Checkpoint.npz', self.checkpoint_data())
+        if store is not None:
+            quantities = pd.read_csv(simulation_name + ' Quantities.csv', index_col=0).iloc[:, 0]
+            self.store_run(store, quantities, simulation_name)
+        return True
+
+    def output_writer(self, writer=None):
+        """
+        Return a context manager giving the writer to write a simulation's files with, which only closes the 
+        writer on leaving if it was created here
 
-        # Store all particle properties in a nested dictionary
-        final_state_dict = {}
-        for index, particle in enumerate(self.system.particles):
-            final_state_dict[index] = {'Position': particle.position.components, \
-                                  'Velocity': particle.velocity.components, \
-                                  'Mass': particle.mass, \
-                                  'Radius': particle.radius}
-                  
-        final_state = pd.DataFrame(final_state_dict)
-        final_state.transpose().to_pickle(simulation_name + ' State.pkl')
-
-        quantities = pd.Series({'Pressure': self.pressure(), 'Volume': self.volume(), \
-                                'Temperature': self.temperature(), 'Number of particles': self.system.no_particles, \
-                                'Number of collisions': self.system.no_collisions, \
-                                'Time': self.system.global_time})
-        quantities.to_csv(simulation_name + ' Quantities.csv')
-
-    def simulate_conservation(self, total_collisions, simulation_name):
+        writer - Optional BackgroundWriter type object to use, defaulting to a new one
+        """
+        if writer is None:
+            return BackgroundWriter()
+        return contextlib.nullcontext(writer)
+
+    def store_run(self, store, quantities, simulation_name=None):
+        """
+        Add the simulated quantities to a ResultsStore along with the System's parameters and seed, returning the
+        run number
+
+        store - ResultsStore type object, or str type value of its file
+        quantities - dictionary or pd.Series of the simulated quantities
+        simulation_name - Optional str type value of the run's name
+        """
+        parameters = {'Dimensions': self.system.dimensions, 'Seed': self.system.seed}
+        if self.system.no_particles:
+            parameters.update({'Mass': self.system.masses[0], 'Radius': self.system.radii[0]})
+        parameters.update(dict(quantities))
+        if type(store) == str:
+            with ResultsStore(store) as results:
+                return results.add_run(parameters, simulation_name)
+        return store.add_run(parameters, simulation_name)
+
+    def simulate_conservation(self, total_collisions, simulation_name, chunk_size=4096, writer=None):
         """
         Run the simulation for the given number of collsions, exporting the values of the supposedly conserved quantity 
-        energy after each event to a .pkl file and a .csv file
+        energy after each collision to a .pkl file and a .csv file
+        The energies are appended to the .csv file in chunks as the simulation runs, and the .pkl file is made from 
+        it at the end
 
         total_collisions - int type value of the number of collisions to simulate
         simulation_name - str type value for the file names
+        chunk_size - int type value for the number of energies held in memory before they are written
+        writer - Optional BackgroundWriter type object to write the files with, defaulting to a new writer closed 
+                 once every file is written
         """
-        quantities_dict = {}
+        csv_name = simulation_name + ' Conservation.csv'
+        chunk = np.empty(chunk_size)
+        first_collision = self.system.no_collisions
+        filled = 0
 
         # Run the simulation
         print(tm.process_time())
-        while self.system.no_collisions < total_collisions:
-            quantities_dict[self.system.no_collisions] = {'Energy': self.system.system_KE()}
-            self.system.simulate_event()
-        quantities_dict[self.system.no_collisions] = {'Energy': self.system.system_KE()}
-        print(tm.process_time())
+        with self.output_writer(writer) as writer:
+            # The header is written first so every chunk can be appended
+            writer.submit(pd.DataFrame(columns=['Energy']).to_csv, csv_name)
+            while True:
+                chunk[filled] = self.system.system_KE()
+                filled += 1
+                if filled == chunk_size:
+                    writer.submit(self.write_energies, csv_name, first_collision, chunk)
+                    chunk = np.empty(chunk_size)
+                    first_collision += filled
+                    filled = 0
+                if self.system.no_collisions >= total_collisions:
+                    break
+                # Cell crossings leave the energy unchanged, so only record once each collision has happened
+                no_collisions = self.system.no_collisions
+                while self.system.no_collisions == no_collisions:
+                    self.system.simulate_event()
+            writer.submit(self.write_energies, csv_name, first_collision, chunk[:filled])
+            print(tm.process_time())
 
-        # Check N is conserved
-        if not self.system.check_N():
-            raise SimulationError("Unexpected number of particles in the box")
+            # Check N is conserved
+            if not self.system.check_N():
+                raise SimulationError("Unexpected number of particles in the box")
 
-        # Check N is conserved
-        if not self.system.check_N():
-            raise SimulationError("Unexpected number of particles in the box")
-                  
-        quantities = pd.DataFrame(quantities_dict)
-        quantities.transpose().to_pickle(simulation_name + ' Conservation.pkl')
-        quantities.transpose().to_csv(simulation_name + ' Conservation.csv')
+            writer.submit(lambda: pd.read_csv(csv_name, index_col=0).to_pickle(simulation_name + ' Conservation.pkl'))
+
+    def write_energies(self, file_name, first_collision, energies):
+        """
+        Append energies to a Conservation.csv file, indexed by the number of collisions
+
+        file_name - str type value of the file
+        first_collision - int type value of the number of collisions at the first energy
+        energies - np.array of the energies after each collision in turn
+        """
+        index = np.arange(first_collision, first_collision + len(energies))
+        pd.DataFrame({'Energy': energies}, index=index).to_csv(file_name, mode='a', header=False)
     
-    def simulate_track_particles(self, total_collisions, tracked_particles):
+    def simulate_track_particles(self, total_collisions, tracked_particles, file_name=None, plot=True, 
+                                 max_points=10000, writer=None, animation_folder=None, processes=None):
         """
-        Track the motion of the given particles and plot their trajectories throughout the simulation
+        Track the motion of the given particles throughout the simulation, recording all of their coordinates after 
+        every event, and plot their trajectories
+        Returns the TrajectoryRecorder holding the recorded frames - without a file_name, frames a long run spilled 
+        to a temporary file are removed with it once plotted and rendered
 
         total_collisions - int type value of the number of collisions to simulate
         tracked_particles - list of int type values of the indices of particles to track in System.particles
+        file_name - Optional str type value of the file to record the trajectories in, which long runs spill to 
+                    and plot_trajectory can read separately
+        plot - Bool type value, if True plot the trajectories with the final locations of the particles
+        max_points - int type value for the largest number of frames to plot, with frames skipped evenly beyond it
+        writer - Optional BackgroundWriter type object to spill the recorded frames with, defaulting to a new 
+                 writer closed once every frame is written
+        animation_folder - Optional str type value of a folder to render every recorded frame into as a .png image 
+                           with render_trajectory
+        processes - Optional int type value for the number of processes rendering the frames, defaulting to the 
+                    number of CPUs
         """
+        with self.output_writer(writer) as writer:
+            recorder = TrajectoryRecorder(tracked_particles, self.system.positions.shape[1], file_name, 
+                                          writer=writer)
+            while self.system.no_collisions < total_collisions:
+                self.system.synchronise(tracked_particles)
+                recorder.record(self.system.global_time, self.system.positions)
+                self.system.simulate_event()
 
-        # Empty DataFrame of the particle positions
-        positions = pd.DataFrame(columns=range(2*len(tracked_particles)))
-        while self.system.no_collisions < total_collisions:
-            position_frame = []
-            for index, particle_index in enumerate(tracked_particles):    
-                position_frame.append(self.system.particles[particle_index].position.components[0])
-                position_frame.append(self.system.particles[particle_index].position.components[1])
-            positions = positions.append(pd.DataFrame([position_frame]), ignore_index=True)
-            self.system.simulate_event()
+            # Check N is conserved
+            if not self.system.check_N():
+                raise SimulationError("Unexpected number of particles in the box")
+            
+            # Add the positions of the final frame
+            self.system.synchronise()
+            recorder.record(self.system.global_time, self.system.positions)
+            if file_name is not None:
+                recorder.save()
+        # Any later spills are written straight away, as the writer may have been closed
+        recorder.writer = None
+
+        try:
+            if animation_folder is not None:
+                render_trajectory(file_name if file_name is not None else recorder.trajectory(), self.system.box, 
+                                  self.system.radii[recorder.tracked_particles], animation_folder, processes)
+
+            if plot:
+                plot_trajectory(file_name if file_name is not None else recorder.trajectory(), self.system.box, 
+                                max_points, self.system.positions, self.system.radii)
+        finally:
+            recorder.remove_temporary()
+        return recorder
+ 
+    def simulate_sampled(self, sample_times, callbacks, simulation_name=None):
+        """
+        Run the simulation up to each of the given times in turn and sample the given quantities at exactly that 
+        time, rather than at the irregular times of collisions
+        Returns a DataFrame of the samples with one row per sample time and one column per callback
+
+        sample_times - array-like object of the global_time values to sample at in increasing order, such as
+                       np.arange(0, 1e-9, 1e-11)
+        callbacks - dictionary mapping the name of each sampled quantity to a function of the Tracker returning its 
+                    value, which should use System.positions_at for any positions it needs so that only those 
+                    particles are propagated
+        simulation_name - Optional str type value for the file names, saving the samples to a .csv file if given
+        """
+        samples = {}
+        for time in sample_times:
+            self.system.simulate_until(time)
+            samples[time] = {name: callback(self) for name, callback in callbacks.items()}
 
         # Check N is conserved
         if not self.system.check_N():
             raise SimulationError("Unexpected number of particles in the box")
-        
-        # Add the positions of the final frame
-        position_frame = []
-        for index, particle_index in enumerate(tracked_particles):    
-            position_frame.append(self.system.particles[particle_index].position.components[0])
-            position_frame.append(self.system.particles[particle_index].position.components[1])
-        positions = positions.append(pd.DataFrame([position_frame]), ignore_index=True)
-
-        # Plot the particle trajectories
-        fig, ax = plt.subplots()
-        for index, particle_index in enumerate(tracked_particles):
-            x = positions[2*index].to_list()
-            y = positions[2*index + 1].to_list()
-            plt.plot(x,y, zorder=1)
-
-        # Plot the final locations of the particles
-        x = []
-        y = []
-        radius = []
-        for particle in self.system.particles:
-            x.append(particle.position[0])
-            y.append(particle.position[1])
-            radius.append(particle.radius)
-        particles = [plt.Circle(np.array([x_i,y_i]), radius=r_i) for x_i, y_i, r_i in zip(x,y,radius)]
-        ensemble = mpl.collections.PatchCollection(particles, color='k', zorder=20)
-        ax.set_xlim(0, self.system.box[0])
-        ax.set_ylim(0, self.system.box[1])
-        fig.set_size_inches(6,6)
-        ax.add_collection(ensemble)
-        plt.show()
- 
-    def speed_distribution(self, number_bins, max_speed):
+
+        samples = pd.DataFrame(samples).transpose()
+        samples.index.name = 'Time'
+        if simulation_name is not None:
+            samples.to_csv(simulation_name + ' Samples.csv')
+        return samples
+
+    def speed_distribution(self, number_bins, max_speed, time_averaged=False):
         """
         Return a histogram of the speeds of particles in the system and compare to the expected 
         Maxwell-Boltzmann distribution, assuming all particles have the same mass
+        If the System is tracking its speeds with track_speeds its histogram is plotted instead, without binning 
+        the speeds again, and number_bins and max_speed are ignored
 
         number_bins - int type value of the number of bins to plot
         max_speed - float type value for the max speed to include if the actual values don't exceed it
+        time_averaged - Bool type value, if True the histogram averaged over the simulated time since the System 
+                        started tracking its speeds, or since reset_measurement, is plotted
         """
-        mass = self.system.particles[0].mass
+        mass = self.system.masses[0]
         plt.rcParams.update({'font.size': 25})
-        
-        # Create a list of all particle speeds
-        velocities = []
-        for particle in self.system.particles:
-            velocity = particle.velocity.magnitude()    
-            velocities.append(velocity)
-
-        # Calculate the histogram bins
-        if max_speed > math.ceil(max(velocities)):
-            bins = [v for v in range(0, max_speed, math.ceil(max_speed/number_bins))] 
-        else:
-            bins = [v for v in range(0, math.ceil(max(velocities)), math.ceil(max(velocities)/number_bins))]
+        histogram = self.system.speed_histogram
+        if time_averaged and histogram is None:
+            raise ValueError("time_averaged needs the System to be tracking its speeds with track_speeds")
 
         fig,ax = plt.subplots(1,1)
         ax.set_xlabel('Speed ($ms^{-1}$)')
-        ax.set_ylabel('Frequency')
+        ax.set_ylabel('Mean frequency' if time_averaged else 'Frequency')
         ax.set_title('Number of collisions = ' + str(int(self.system.no_collisions)))
-        ax.hist(velocities, bins, label='Simulation Data')
+        if histogram is not None:
+            bins = histogram.edges
+            if time_averaged:
+                counts = histogram.time_averaged(self.system.global_time)
+            else:
+                counts = histogram.distribution()
+            ax.hist(bins[:-1], bins, weights=counts, label='Simulation Data')
+        else:
+            # Calculate all particle speeds
+            velocities = self.system.speeds()
+
+            # Calculate the histogram bins
+            if max_speed > math.ceil(max(velocities)):
+                bins = [v for v in range(0, max_speed, math.ceil(max_speed/number_bins))] 
+            else:
+                bins = [v for v in range(0, math.ceil(max(velocities)), math.ceil(max(velocities)/number_bins))]
+            ax.hist(velocities, bins, label='Simulation Data')
         bin_width = bins[1]-bins[0]
         kT = sp.Boltzmann * self.temperature()
         v = np.linspace(0,bins[-1]*1.2,1000)
@@ -216,25 +572,77 @@ class Tracker:
 
     def import_state(self, file_name):
         """
-        Read a .pkl file and import its state into the Tracker - only imports the particle states 
+        Read a .npy file saved by save_state, or a .pkl file saved by older versions, and import its state into the 
+        Tracker - only imports the particle states 
         It is not recommended to continue a simulation from this imported state - the last collision may be 
-        repeated leading to loss of particles from the box
+        repeated leading to loss of particles from the box - use resume with a checkpoint instead
 
         file_name - str value of the file name in the directory of this file containing the state data
         """
-        # Initialise the empty System.particles
-        self.system.particles = []
-
-        # Read .pkl file as DataFrames
-        directory = 'C:\\Users\\wardi\\Documents\\Uni\\OneDrive - Lancaster University\\Year 4\\Computer Modelling\\Kinetic Gas\\phys389-2021-project-Wardi0-1\\' +  file_name
-        state = pd.read_pickle(directory)
-        
-        positions = state['Position']
-        velocities = state['Velocity']
-        masses = state['Mass']
-        radii = state['Radius']
-        for i in range(len(positions)):
-            self.system.particles.append(Particle(positions[i],velocities[i],masses[i],radii[i]))
+        directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), file_name)
+        if directory.endswith('.npy'):
+            # Copied straight from the memory-mapped file into the particle arrays
+            self.system.store_arrays(*load_state(directory))
+        else:
+            # Only unpickle files from a trusted source, as unpickling can run arbitrary code
+            state = pd.read_pickle(directory)
+            
+            positions = state['Position']
+            velocities = state['Velocity']
+            masses = state['Mass']
+            radii = state['Radius']
+            self.system.particles = [Particle(positions[i],velocities[i],masses[i],radii[i]) for i in range(len(positions))]
 
         # Initialise the new event_series
         self.system.initialise_event_series()
+
+    def resume(self, file_name):
+        """
+        Replace the Tracker's System with the complete System saved in a checkpoint, along with the pressure blocks 
+        and whether it had equilibrated if the checkpoint was saved by simulate, so that simulate continues exactly 
+        where the checkpointed run stopped
+
+        file_name - str value of the checkpoint file saved by simulate or System.save_checkpoint
+        """
+        self.system = System.load_checkpoint(file_name)
+        self.restore_checkpoint(np.load(file_name, allow_pickle=False))
+
+    def restore_checkpoint(self, data):
+        """
+        Restore the pressure blocks and whether the System had equilibrated from checkpoint data, starting new 
+        blocks if the data was not saved by simulate
+
+        data - dictionary returned by checkpoint_data, or the data of a checkpoint file
+        """
+        self.blocks_restored = 'block_start' in data
+        if self.blocks_restored:
+            block_time = float(data['block_time'])
+            self.block_time = None if np.isnan(block_time) else block_time
+            start_time, start_impulse, start_collisions = data['block_start'].tolist()
+            self.block_start = (start_time, start_impulse, int(start_collisions))
+            self.block_pressures = data['block_pressures'].tolist()
+        else:
+            self.start_blocks()
+        self.equilibrated = bool(data['equilibrated']) if 'equilibrated' in data else False
+        self.equilibration_collisions = int(data['equilibration_collisions']) if self.equilibrated else None
+
+    def block_data(self):
+        """
+        Return a dictionary of the pressure block state, as saved in checkpoints by simulate
+        """
+        return {'block_time': np.nan if self.block_time is None else self.block_time, 
+                'block_start': np.array(self.block_start, dtype=float), 
+                'block_pressures': np.array(self.block_pressures, dtype=float)}
+
+    def checkpoint_data(self):
+        """
+        Return the System's checkpoint data along with the pressure block state and whether the System has 
+        equilibrated, so that resume restores them all
+        """
+        data = self.system.checkpoint_data()
+        data.update(self.block_data())
+        data['equilibrated'] = self.equilibrated
+        no_collisions = self.equilibration_collisions
+        data['equilibration_collisions'] = -1 if no_collisions is None else no_collisions
+        return data
+
@@ -9,6 +9,9 @@ class Vector:
     self.components -> Contains the vector's components (np.array)
     """
 
+    # No per-instance __dict__, as particles hold many small vectors
+    __slots__ = ('components',)
+
     def __init__(self, values):
         """
         Initialisation arguments:
@@ -33,6 +36,18 @@ class Vector:
         """
         return cls(values)
 
+    @classmethod
+    def wrap(cls, components):
+        """
+        Create a new instance of the class using the given array as its components without copying it, so that
+        changes to either are shared
+
+        components - np.array of floats containing the vector's components
+        """
+        vector = cls.__new__(cls)
+        vector.components = components
+        return vector
+
     def __getitem__(self, index):
         """
         Overload the index operation to work with the vector's components
@@ -48,7 +63,20 @@ class Vector:
         other - Vector-like object to add 
         """
         if self.dimension() == other.dimension():
-            return self.new(self.components + other.components)
+            return self.wrap(self.components + other.components)
+        else:
+            raise DimensionError("Objects have incompatible dimensions")
+
+    def __iadd__(self, other):
+        """
+        Overload the in-place addition operator to add individual components to this vector's own components if 
+        dimensionally compatible
+
+        other - Vector-like object to add
+        """
+        if self.dimension() == other.dimension():
+            self.components += other.components
+            return self
         else:
             raise DimensionError("Objects have incompatible dimensions")
 
@@ -56,7 +84,7 @@ class Vector:
         """
         Overload the negation operator to invert each component of the vector
         """
-        return self.new(-self.components)
+        return self.wrap(-self.components)
 
     def __sub__(self, other):
         """
@@ -65,7 +93,23 @@ class Vector:
 
         other - Vector-like object to subtract
         """
-        return self + (-other)
+        if self.dimension() == other.dimension():
+            return self.wrap(self.components - other.components)
+        else:
+            raise DimensionError("Objects have incompatible dimensions")
+
+    def __isub__(self, other):
+        """
+        Overload the in-place subtraction operator to subtract components of the second vector from this vector's own
+        components if dimensionally compatible
+
+        other - Vector-like object to subtract
+        """
+        if self.dimension() == other.dimension():
+            self.components -= other.components
+            return self
+        else:
+            raise DimensionError("Objects have incompatible dimensions")
 
     def __mul__(self, val):
         """
@@ -74,7 +118,19 @@ class Vector:
         val - int or float type value to multiply each component by
         """
         if type(val) in [float, int, np.float64]:
-            return self.new(self.components * val)
+            return self.wrap(self.components * val)
+        else:
+            raise TypeError("Can only multiply by a float or integer")
+
+    def __imul__(self, val):
+        """
+        Overload the in-place multiplication operator to scale this vector's own components by the scalar value
+
+        val - int or float type value to multiply each component by
+        """
+        if type(val) in [float, int, np.float64]:
+            self.components *= val
+            return self
         else:
             raise TypeError("Can only multiply by a float or integer")
 
@@ -85,7 +141,7 @@ class Vector:
         other - Vector-like object to calculate the scalar product with
         """
         if self.dimension() == other.dimension():
-            return sum(self.components * other.components)
+            return np.dot(self.components, other.components)
         else:
             raise DimensionError("Objects have incompatible dimensions")
 
@@ -96,7 +152,7 @@ class Vector:
         val - int or float type value to divide each component by
         """
         if type(val) in [float, int, np.float64]:
-            return self.new(self.components / val)
+            return self.wrap(self.components / val)
         else:
             raise TypeError("Can only divide by a float or integer")
 
@@ -129,15 +185,14 @@ class Vector:
         """
         return self/(self.magnitude())
 
-    def random_unit_vector(self):
+    def random_unit_vector(self, rng=np.random):
         """
         Return a unit vector with a random direction, where the distribution is uniform across all possible directions, of
         the same dimension 
+
+        rng - np.random.Generator type object or the np.random module to draw the direction from
         """
-        components = []
-        for D in range(len(self.components)):
-            components.append(np.random.normal(0,1))
-        return self.new(components).unit_vector()
+        return self.wrap(random_unit_vectors(1, self.dimension(), rng)[0])
     
     def polar_angle(self):
         """
@@ -151,19 +206,16 @@ class Vector:
         else:
             return (np.arctan2(y,x)*180/np.pi) + 360
 
-    def random_distribution(self, no_samples):
+    def random_distribution(self, no_samples, rng=np.random):
         """
-        Plot a histogram of angles (polar coordinates in degrees) produced by random_unit_vector in 2D 
+        Plot a histogram of angles (polar coordinates in degrees) produced by random_unit_vectors in 2D 
         Expect the distribution to be uniform for large no_samples
 
         no_samples - int type value for the number of random vectors generated
+        rng - np.random.Generator type object or the np.random module to draw the vectors from
         """
-        base = Vector([0,0])
-        angles = []
-        for sample in range(no_samples):
-            unit_vector = base.random_unit_vector()
-            angle = unit_vector.polar_angle()
-            angles.append(angle)
+        unit_vectors = random_unit_vectors(no_samples, 2, rng)
+        angles = np.degrees(np.arctan2(unit_vectors[:, 1], unit_vectors[:, 0])) % 360
         fig,ax = plt.subplots(1,1)
         bins = [10*n for n in range(37)] 
         ax.set_xticks([0,90,180,270,360])
@@ -171,4 +223,17 @@ class Vector:
         ax.set_ylabel('Frequency')
         ax.set_title('Histogram of angles produced by random_unit_vector in 2D (N='+str(no_samples)+')')
         ax.hist(angles, bins)
-        plt.show()
\ No newline at end of file
+        plt.show()
+
+def random_unit_vectors(no_vectors, dimensions, rng=np.random):
+    """
+    Return unit vectors with random directions, where the distribution is uniform across all possible directions, one
+    row per vector
+
+    no_vectors - int type value for the number of vectors to generate
+    dimensions - int type value for the number of components of each vector
+    rng - np.random.Generator type object or the np.random module to draw the directions from
+    """
+    # Gaussian components are spherically symmetric, so normalising them gives a uniform direction
+    components = rng.normal(0, 1, (no_vectors, dimensions))
+    return components / np.linalg.norm(components, axis=1)[:, np.newaxis]
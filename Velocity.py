@@ -8,6 +8,8 @@ class Velocity(Vector):
     self.components -> Contains the velocity component in each spatial direction (np.array)
     """
 
+    __slots__ = ()
+
     def __init__(self, components):
         """
         Initialisation arguments:
@@ -23,7 +25,8 @@ class Velocity(Vector):
         delta_velocity - Vector-like object to add the components of to self
         """
         if self.dimension() == delta_velocity.dimension():
-            self.__init__(self.components + delta_velocity.components)
+            # Update in place so Particles viewing System arrays stay attached to them
+            self.components += delta_velocity.components
         else:
             raise DimensionError("Objects have incompatible dimensions")
 
@@ -0,0 +1,96 @@
+import threading
+import queue
+
+class BackgroundWriter:
+    """
+    Class writing output files on a background thread, so that the simulation can carry on while the files are
+    serialised and written to disk
+
+    Writes are handed over as a function and its arguments, which must be copies of anything the simulation goes on
+    to change, and are carried out in the order they were submitted
+    The queue of waiting writes is bounded, so a simulation producing output faster than it can be written waits
+    rather than holding every copy in memory
+    The first write to fail stops the writer, and its exception is raised by the next call to submit, flush or close
+
+    Has the following attributes:
+    self.queue -> Writes waiting to be carried out, as (function, args, kwargs) tuples (queue.Queue)
+    self.thread -> The thread carrying out the writes (threading.Thread)
+    self.error -> The exception raised by the first write to fail, or None (Exception)
+    self.no_written -> Number of writes carried out (int)
+    """
+
+    def __init__(self, max_queued=16):
+        """
+        Initialisation arguments:
+
+        max_queued - int type value for the largest number of writes waiting at once before submit waits for one
+                     to finish
+        """
+        self.queue = queue.Queue(maxsize=max_queued)
+        self.error = None
+        self.no_written = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        # Still write everything submitted if the simulation failed, without hiding its exception
+        self.close(raise_error=exception_type is None)
+
+    def run(self):
+        """
+        Carry out each write in turn until close is called, skipping the rest once one has failed
+        """
+        while True:
+            task = self.queue.get()
+            try:
+                if task is None:
+                    return
+                if self.error is None:
+                    function, args, kwargs = task
+                    function(*args, **kwargs)
+                    self.no_written += 1
+            except Exception as error:
+                self.error = error
+            finally:
+                self.queue.task_done()
+
+    def check(self):
+        """
+        Raise the exception of a failed write, if there has been one
+        """
+        if self.error is not None:
+            raise self.error
+
+    def submit(self, function, *args, **kwargs):
+        """
+        Hand a write over to the background thread, waiting for room in the queue if it is full
+
+        function - the function carrying out the write
+        args, kwargs - the arguments to call the function with
+        """
+        self.check()
+        if not self.thread.is_alive():
+            raise RuntimeError("The BackgroundWriter has been closed")
+        self.queue.put((function, args, kwargs))
+
+    def flush(self):
+        """
+        Wait until every write submitted so far has been carried out
+        """
+        self.queue.join()
+        self.check()
+
+    def close(self, raise_error=True):
+        """
+        Carry out every remaining write and stop the background thread
+
+        raise_error - Bool type value, if False the exception of a failed write is not raised
+        """
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        if raise_error:
+            self.check()
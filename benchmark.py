@@ -0,0 +1,173 @@
+import sys
+import json
+import time
+import argparse
+import itertools
+import platform
+import tracemalloc
+import numpy as np
+from scipy.special import gamma
+from System import *
+
+def box_length(no_particles, radius, packing_fraction, dimensions):
+    """
+    Return the side length of the cube in which the particles fill the given fraction of the volume
+
+    no_particles - int type value for the number of particles
+    radius - float type value for the radius of the particles
+    packing_fraction - float type value for the fraction of the volume filled by the particles
+    dimensions - int type value for the number of spatial dimensions
+    """
+    ball_volume = np.pi**(dimensions/2) / gamma(dimensions/2 + 1) * radius**dimensions
+    return (no_particles*ball_volume/packing_fraction)**(1/dimensions)
+
+def benchmark_case(no_particles, dimensions, packing_fraction, no_events, seed=0, system_options=None):
+    """
+    Return a dictionary of the setup time, event throughput and peak memory of simulating one System, with the peak
+    memory of building the System and the extra memory its events allocate reported separately
+
+    no_particles - int type value for the number of particles
+    dimensions - int type value for the number of spatial dimensions
+    packing_fraction - float type value for the fraction of the volume filled by the particles
+    no_events - int type value for the number of events to time
+    seed - int type value to seed the initial placement with
+    system_options - Optional dictionary of any further keyword arguments to initialise the System with
+    """
+    if system_options is None:
+        system_options = {}
+    options = {'placement': 'lattice'}
+    options.update(system_options)
+    radius = 1
+    length = box_length(no_particles, radius, packing_fraction, dimensions)
+
+    # Memory is traced while the System and its event queue are built, as they hold almost all of it
+    np.random.seed(seed)
+    tracemalloc.start()
+    system = System(no_particles, 1, radius, [length]*dimensions, 1, **options)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    system.initialise_event_series()
+    setup_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for event in range(no_events):
+        system.simulate_event()
+    run_time = time.perf_counter() - start
+
+    # Tracing slows the events down, so the memory they allocate, such as a growing event queue, is traced over a
+    # further run of events rather than the timed one
+    tracemalloc.start()
+    for event in range(no_events):
+        system.simulate_event()
+    event_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {'N': no_particles, 'dimensions': dimensions, 'packing_fraction': packing_fraction,
+            'options': dict(options), 'events': no_events, 'setup_seconds': setup_time, 
+            'events_per_second': no_events/run_time, 'peak_memory_bytes': peak_memory, 
+            'event_memory_bytes': event_memory}
+
+def run_benchmarks(sizes=(100, 200, 400), dimensions=(2, 3, 4), packing_fractions=(0.001, 0.01, 0.05), no_events=1000,
+                   system_options=None):
+    """
+    Return the results of benchmark_case for every combination of the given sizes, dimensions and packing fractions
+
+    sizes - iterable of int type values for the numbers of particles
+    dimensions - iterable of int type values for the numbers of spatial dimensions
+    packing_fractions - iterable of float type values for the fractions of the volume filled by the particles
+    no_events - int type value for the number of events to time in each case
+    system_options - Optional dictionary of any further keyword arguments to initialise every System with
+    """
+    results = []
+    for no_particles, dimension, packing_fraction in itertools.product(sizes, dimensions, packing_fractions):
+        result = benchmark_case(no_particles, dimension, packing_fraction, no_events, system_options=system_options)
+        print('N={N:<6} D={dimensions} phi={packing_fraction:<6} setup={setup_seconds:.3f}s '
+              'events/s={events_per_second:.1f} memory={peak_memory_bytes}B '
+              'event memory={event_memory_bytes}B'.format(**result))
+        results.append(result)
+    return results
+
+def save_baseline(results, file_name):
+    """
+    Save benchmark results to a JSON file along with the versions they were measured with
+
+    results - list of dictionaries returned by run_benchmarks
+    file_name - str type value of the JSON file to write
+    """
+    baseline = {'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.machine(),
+                'results': results}
+    with open(file_name, 'w') as file:
+        json.dump(baseline, file, indent=2)
+
+def load_baseline(file_name):
+    """
+    Return the list of benchmark results saved in a JSON file by save_baseline
+
+    file_name - str type value of the JSON file to read
+    """
+    with open(file_name) as file:
+        return json.load(file)['results']
+
+def compare(baseline, results, tolerance=0.1):
+    """
+    Return a list of descriptions of every case where the results are worse than the baseline by more than the
+    tolerance - slower throughput, longer setup or more memory
+
+    baseline - list of dictionaries returned by run_benchmarks or load_baseline to compare against
+    results - list of dictionaries returned by run_benchmarks or load_baseline to check
+    tolerance - float type value of the fractional change allowed before a case is flagged
+    """
+    def case(result):
+        return (result['N'], result['dimensions'], result['packing_fraction'],
+                json.dumps(result['options'], sort_keys=True))
+
+    reference = {case(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        if case(result) not in reference:
+            continue
+        old = reference[case(result)]
+        label = 'N={} D={} phi={}'.format(result['N'], result['dimensions'], result['packing_fraction'])
+        # Throughput regresses by falling, the other measures by rising
+        if result['events_per_second'] < old['events_per_second']*(1 - tolerance):
+            regressions.append(label + ': events/s fell from {:.1f} to {:.1f}'.format(old['events_per_second'],
+                                                                                      result['events_per_second']))
+        # Baselines saved before event memory was measured are only compared on the other measures
+        for key in ['setup_seconds', 'peak_memory_bytes', 'event_memory_bytes']:
+            if key in old and result[key] > old[key]*(1 + tolerance):
+                regressions.append(label + ': {} rose from {:.4g} to {:.4g}'.format(key, old[key], result[key]))
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark event throughput of the simulation')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help='run the benchmarks and save the results as a JSON baseline')
+    run.add_argument('output')
+    run.add_argument('--sizes', type=int, nargs='+', default=[100, 200, 400])
+    run.add_argument('--dimensions', type=int, nargs='+', default=[2, 3, 4])
+    run.add_argument('--packing-fractions', type=float, nargs='+', default=[0.001, 0.01, 0.05])
+    run.add_argument('--events', type=int, default=1000)
+    run.add_argument('--cell-length', type=float, default=None)
+    run.add_argument('--lazy', action='store_true')
+    run.add_argument('--backend', default='numpy')
+    check = commands.add_parser('compare', help='flag regressions of one JSON result file against a baseline')
+    check.add_argument('baseline')
+    check.add_argument('results')
+    check.add_argument('--tolerance', type=float, default=0.1)
+    arguments = parser.parse_args()
+
+    if arguments.command == 'run':
+        options = {'lazy': arguments.lazy, 'backend': arguments.backend}
+        if arguments.cell_length is not None:
+            options['cell_length'] = arguments.cell_length
+        save_baseline(run_benchmarks(arguments.sizes, arguments.dimensions, arguments.packing_fractions,
+                                     arguments.events, options), arguments.output)
+    else:
+        regressions = compare(load_baseline(arguments.baseline), load_baseline(arguments.results),
+                              arguments.tolerance)
+        for regression in regressions:
+            print(regression)
+        print(str(len(regressions)) + ' regressions found')
+        sys.exit(1 if regressions else 0)
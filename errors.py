@@ -8,4 +8,10 @@ class SimulationError(Exception):
     """
     Unexpected number of particles in the box
     """
-    pass
\ No newline at end of file
+    pass
+
+class PlacementError(Exception):
+    """
+    Particles cannot be placed in the box at the requested density
+    """
+    pass
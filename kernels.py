@@ -0,0 +1,198 @@
+import numpy as np
+import math
+import warnings
+from types import SimpleNamespace
+
+# Numba is optional, the NumPy kernels are used when it is not installed
+try:
+    import numba
+except ImportError:
+    numba = None
+
+def pair_collision_times(position, velocity, radius, positions, velocities, radii):
+    """
+    Return the times after which a particle will collide with each of the given particles, with np.infty where they
+    will not collide on their current trajectories
+
+    position - np.array containing the particle's position
+    velocity - np.array containing the particle's velocity
+    radius - float type value of the particle's radius
+    positions - np.array containing the positions of the other particles, one row per particle
+    velocities - np.array containing the velocities of the other particles, one row per particle
+    radii - np.array containing the radii of the other particles
+    """
+    position_difference = positions - position
+    velocity_difference = velocities - velocity
+
+    # Coefficients of a*t^2 + 2*b*t + c = 0, where the particles touch at the roots
+    a = np.einsum('ij,ij->i', velocity_difference, velocity_difference)
+    b = np.einsum('ij,ij->i', velocity_difference, position_difference)
+    c = np.einsum('ij,ij->i', position_difference, position_difference) - (radius + radii)**2
+    discriminant = b*b - a*c
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Avoid cancellation by finding the larger magnitude root first and the other from the product of the roots
+        q = -(b + np.copysign(np.sqrt(discriminant), b))
+        root_1 = q / a
+        root_2 = np.where(q != 0, c / q, 0)
+    smaller = np.minimum(root_1, root_2)
+    larger = np.maximum(root_1, root_2)
+
+    # Overlapping particles separate at the positive root, otherwise the earliest positive root is the collision
+    times = np.where((smaller < 0) & (larger >= 0), larger, np.where(smaller > 0, smaller, np.infty))
+    # No relative motion or complex roots mean the particles never touch
+    times[(a == 0) | (discriminant < 0)] = np.infty
+    return times
+
+def wall_collision_times(position, velocity, radius, box):
+    """
+    Return the times after which a particle will collide with each container wall, ordered as the minimum and then
+    maximum wall of each spatial dimension in turn, with np.infty where it is moving away from the wall
+
+    position - np.array containing the particle's position
+    velocity - np.array containing the particle's velocity
+    radius - float type value of the particle's radius
+    box - np.array containing the length of the container in each spatial dimension
+    """
+    coordinates = np.stack([np.full(len(box), radius), box - radius], axis=1).ravel()
+    positions = np.repeat(position, 2)
+    velocities = np.repeat(velocity, 2)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        times = (coordinates - positions) / velocities
+    times = np.where(times > 0, times, np.infty)
+    # To avoid division by zero errors
+    times[velocities == 0] = np.infty
+    # In case the particle is already touching the wall
+    times[coordinates == positions] = 0
+    return times
+
+def collide_pair(positions, velocities, masses, index_1, index_2):
+    """
+    Update the velocities of 2 touching particles after an elastic collision
+
+    positions - np.array containing the position of every particle, one row per particle
+    velocities - np.array containing the velocity of every particle, one row per particle, updated in place
+    masses - np.array containing the mass of every particle
+    index_1 - int type value of the first particle's index
+    index_2 - int type value of the second particle's index
+    """
+    mass_1 = masses[index_1]
+    mass_2 = masses[index_2]
+    position_difference = positions[index_2] - positions[index_1]
+    unit_position_vector = position_difference / np.sqrt(position_difference @ position_difference)
+    delta_velocity = velocities[index_2] - velocities[index_1]
+    impulse = unit_position_vector * (-((2*mass_1*mass_2)/(mass_1+mass_2))*(delta_velocity@unit_position_vector))
+    velocities[index_1] -= impulse/mass_1
+    velocities[index_2] += impulse/mass_2
+
+def reflect(velocities, masses, index, dimension):
+    """
+    Invert the velocity component of a particle perpendicular to a wall and return the impulse delivered to the wall
+
+    velocities - np.array containing the velocity of every particle, one row per particle, updated in place
+    masses - np.array containing the mass of every particle
+    index - int type value of the particle's index
+    dimension - int type value of the index of the velocity component to invert
+    """
+    impulse = 2*masses[index]*abs(velocities[index, dimension])
+    velocities[index, dimension] = -velocities[index, dimension]
+    return impulse
+
+def pair_collision_times_loop(position, velocity, radius, positions, velocities, radii):
+    """
+    Explicit loop form of pair_collision_times for compilation with Numba
+    """
+    times = np.empty(positions.shape[0])
+    for i in range(positions.shape[0]):
+        a = 0.0
+        b = 0.0
+        c = -(radius + radii[i])**2
+        for D in range(positions.shape[1]):
+            position_difference = positions[i, D] - position[D]
+            velocity_difference = velocities[i, D] - velocity[D]
+            a += velocity_difference*velocity_difference
+            b += velocity_difference*position_difference
+            c += position_difference*position_difference
+        discriminant = b*b - a*c
+        if a == 0 or discriminant < 0:
+            times[i] = np.inf
+            continue
+        q = -(b + math.copysign(math.sqrt(discriminant), b))
+        root_1 = q / a
+        root_2 = c / q if q != 0 else 0.0
+        smaller = min(root_1, root_2)
+        larger = max(root_1, root_2)
+        if smaller < 0 and larger >= 0:
+            times[i] = larger
+        elif smaller > 0:
+            times[i] = smaller
+        else:
+            times[i] = np.inf
+    return times
+
+def wall_collision_times_loop(position, velocity, radius, box):
+    """
+    Explicit loop form of wall_collision_times for compilation with Numba
+    """
+    times = np.empty(2*box.shape[0])
+    for D in range(box.shape[0]):
+        for side in range(2):
+            coordinate = radius if side == 0 else box[D] - radius
+            if coordinate == position[D]:
+                time = 0.0
+            elif velocity[D] == 0:
+                time = np.inf
+            else:
+                time = (coordinate - position[D]) / velocity[D]
+                if not time > 0:
+                    time = np.inf
+            times[2*D + side] = time
+    return times
+
+def collide_pair_loop(positions, velocities, masses, index_1, index_2):
+    """
+    Explicit loop form of collide_pair for compilation with Numba
+    """
+    mass_1 = masses[index_1]
+    mass_2 = masses[index_2]
+    dimensions = positions.shape[1]
+    separation = 0.0
+    for D in range(dimensions):
+        separation += (positions[index_2, D] - positions[index_1, D])**2
+    separation = math.sqrt(separation)
+    projection = 0.0
+    for D in range(dimensions):
+        projection += (velocities[index_2, D] - velocities[index_1, D]) * \
+                      ((positions[index_2, D] - positions[index_1, D]) / separation)
+    scale = -((2*mass_1*mass_2)/(mass_1+mass_2))*projection
+    for D in range(dimensions):
+        impulse = ((positions[index_2, D] - positions[index_1, D]) / separation) * scale
+        velocities[index_1, D] -= impulse/mass_1
+        velocities[index_2, D] += impulse/mass_2
+
+def get_backend(name):
+    """
+    Return the collision kernels of the named backend, falling back to the NumPy kernels with a warning if 'numba'
+    is requested but Numba is not installed
+
+    name - str type value that accepts: 'numpy', 'numba'
+    """
+    if name == 'numba':
+        if numba is not None:
+            return NUMBA_BACKEND
+        warnings.warn("Numba is not installed, using the numpy backend instead")
+    elif name != 'numpy':
+        raise ValueError("backend must be 'numpy' or 'numba'")
+    return NUMPY_BACKEND
+
+NUMPY_BACKEND = SimpleNamespace(name='numpy', pair_collision_times=pair_collision_times, 
+                                wall_collision_times=wall_collision_times, collide_pair=collide_pair, reflect=reflect)
+
+if numba is not None:
+    NUMBA_BACKEND = SimpleNamespace(name='numba', 
+                                    pair_collision_times=numba.njit(cache=True)(pair_collision_times_loop), 
+                                    wall_collision_times=numba.njit(cache=True)(wall_collision_times_loop), 
+                                    collide_pair=numba.njit(cache=True)(collide_pair_loop), 
+                                    reflect=numba.njit(cache=True)(reflect))
+
@@ -1,18 +1,23 @@
 import os
 import pandas as pd
 import matplotlib.pyplot as plt
+import matplotlib as mpl
 import scipy.constants as sp
 import numpy as np
+from Recorder import load_trajectory
+from Results import ResultsStore
 
-def plot_relation(variable_to_plot, folder_name):
+def plot_relation(variable_to_plot, folder_name=None, store=None, **filters):
     """
     Plot pressure against another variable from the simulation data as exported from the simulate Tracker method
-    All data files must be in a single folder and end with 'Quantities.csv'
+    All data files must be in a single folder and end with 'Quantities.csv', or be added to a ResultsStore
     Also plots the theoretical pressure from the ideal gas law
 
     variable_to_plot - str value that accepts: 'Temperature','Volume, 'Inverse Volume', 
                        'Number of particles', 'Number of collisions
     folder_name - str value of the folder name in the directory of this file containing the simulation data
+    store - Optional ResultsStore type object, or str value of its file, to read the runs from instead of a folder
+    filters - keyword arguments passed to ResultsStore.runs to select the runs to plot from the store
     """
     plt.rcParams.update({'font.size': 25})
     if variable_to_plot == 'Inverse Volume':
@@ -20,24 +25,29 @@ def plot_relation(variable_to_plot, folder_name):
     else:
         variable = variable_to_plot
 
-    # Read data files as DataFrames
-    directory = 'C:\\Users\\wardi\\Documents\\Uni\\OneDrive - Lancaster University\\Year 4\\Computer Modelling\\Kinetic Gas\\phys389-2021-project-Wardi0-1\\' +  folder_name
-    simulation_quantities = []
-    for entry in os.scandir(directory):
-        if entry.path.endswith("Quantities.csv") and entry.is_file():
-            simulation_quantities.append(pd.read_csv(entry,index_col=0))
+    # Read the quantities of every run into a DataFrame with one row per run
+    if store is not None:
+        if type(store) == str:
+            with ResultsStore(store) as results:
+                simulation_quantities = results.runs(**filters)
+        else:
+            simulation_quantities = store.runs(**filters)
+    else:
+        directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), folder_name)
+        simulations = []
+        for entry in os.scandir(directory):
+            if entry.path.endswith("Quantities.csv") and entry.is_file():
+                simulations.append(pd.read_csv(entry,index_col=0).iloc[:, 0])
+        simulation_quantities = pd.DataFrame(simulations)
     
-    # Extract the pressure and relevant variable from the DataFrames
-    pressures = []
-    variables = []
-    for simulation in simulation_quantities:
-        pressures.append(simulation.loc['Pressure'][0])
-        variables.append(simulation.loc[variable][0])
+    # Extract the pressure and relevant variable from the DataFrame
+    pressures = list(simulation_quantities['Pressure'])
+    variables = list(simulation_quantities[variable])
 
     # Plot the relations for the chosen variable
     if variable_to_plot == 'Temperature':
-        volume = simulation_quantities[0].loc['Volume'][0]
-        number = simulation_quantities[0].loc['Number of particles'][0]
+        volume = simulation_quantities['Volume'].iloc[0]
+        number = simulation_quantities['Number of particles'].iloc[0]
         x = np.linspace(0,max(variables)*1.1,1000)
         y = number * sp.Boltzmann * x / volume
         plt.scatter(variables,pressures,color='k',label='Simulation Data',zorder=20)
@@ -46,8 +56,8 @@ def plot_relation(variable_to_plot, folder_name):
         plt.plot(x,y,color='r',label='Theoretical Values')
 
     elif variable_to_plot == 'Number of particles':
-        volume = simulation_quantities[0].loc['Volume'][0]
-        temperature = simulation_quantities[0].loc['Temperature'][0]
+        volume = simulation_quantities['Volume'].iloc[0]
+        temperature = simulation_quantities['Temperature'].iloc[0]
         x = np.linspace(0,max(variables)*1.1,1000)
         y = temperature * sp.Boltzmann * x / volume
         plt.scatter(variables,pressures,color='k',label='Simulation Data',zorder=20)
@@ -59,8 +69,8 @@ def plot_relation(variable_to_plot, folder_name):
         # Linear in 1/V so change data
         variables = np.array(variables)
         x = np.linspace(0,max(1/variables)*1.1,1000)
-        number = simulation_quantities[0].loc['Number of particles'][0]
-        temperature = simulation_quantities[0].loc['Temperature'][0]
+        number = simulation_quantities['Number of particles'].iloc[0]
+        temperature = simulation_quantities['Temperature'].iloc[0]
         y = temperature * number * sp.Boltzmann * x
         inverse_V = 1/np.array(variables)
         plt.scatter(inverse_V, pressures,color='k',label='Simulation Data',zorder=20)
@@ -69,8 +79,8 @@ def plot_relation(variable_to_plot, folder_name):
         plt.plot(x,y,color='r',label='Theoretical Values')
 
     elif variable_to_plot == 'Volume':
-        number = simulation_quantities[0].loc['Number of particles'][0]
-        temperature = simulation_quantities[0].loc['Temperature'][0]
+        number = simulation_quantities['Number of particles'].iloc[0]
+        temperature = simulation_quantities['Temperature'].iloc[0]
         x = np.linspace(min(variables)*0.95,max(variables)*1.1,1000)
         y = temperature * sp.Boltzmann * number / x
         plt.scatter(variables,pressures,color='k',label='Simulation Data',zorder=20)
@@ -80,9 +90,9 @@ def plot_relation(variable_to_plot, folder_name):
         plt.plot(x,y,color='r',label='Theoretical Values')
 
     elif variable_to_plot == 'Number of collisions':
-        volume = simulation_quantities[0].loc['Volume'][0]
-        number = simulation_quantities[0].loc['Number of particles'][0]
-        temperature = simulation_quantities[0].loc['Temperature'][0]
+        volume = simulation_quantities['Volume'].iloc[0]
+        number = simulation_quantities['Number of particles'].iloc[0]
+        temperature = simulation_quantities['Temperature'].iloc[0]
         x = np.linspace(0,max(variables)*1.1,10)
         y = np.array([temperature * sp.Boltzmann * number / volume]*10)
         plt.plot(x,y,color='r',label='Theoretical Value')
@@ -96,6 +106,39 @@ def plot_relation(variable_to_plot, folder_name):
     plt.grid()
     plt.show()
 
+def plot_trajectory(trajectory, box, max_points=10000, final_positions=None, radii=None):
+    """
+    Plot the x-y trajectories of particles recorded by a TrajectoryRecorder, reading a trajectory file lazily and 
+    skipping frames evenly so that no more than max_points frames are drawn
+
+    trajectory - str type value of a trajectory file written by TrajectoryRecorder, or the (times, positions) 
+                 tuple returned by its trajectory method
+    box - array-like object containing the length of the container in each spatial dimension
+    max_points - int type value for the largest number of frames to plot
+    final_positions - Optional np.array of particle positions, one row per particle, to draw as circles
+    radii - Optional np.array of the radii of the particles in final_positions
+    """
+    if type(trajectory) == str:
+        trajectory = load_trajectory(trajectory)
+    times, positions = trajectory
+
+    # Only the decimated frames are read from a memory-mapped file
+    step = max(1, int(np.ceil(len(times)/max_points)))
+    frames = np.array(positions[::step])
+    if len(times) and (len(times) - 1) % step:
+        frames = np.concatenate([frames, np.array(positions[-1:])])
 
+    fig, ax = plt.subplots()
+    for index in range(frames.shape[1]):
+        plt.plot(frames[:, index, 0], frames[:, index, 1], zorder=1)
 
+    # Plot the final locations of the particles
+    if final_positions is not None:
+        particles = [plt.Circle(position[:2], radius=radius) for position, radius in zip(final_positions, radii)]
+        ensemble = mpl.collections.PatchCollection(particles, color='k', zorder=20)
+        ax.add_collection(ensemble)
+    ax.set_xlim(0, box[0])
+    ax.set_ylim(0, box[1])
+    fig.set_size_inches(6,6)
+    plt.show()
 
@@ -0,0 +1,122 @@
+import os
+import shutil
+import subprocess
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import EllipseCollection
+from PIL import Image
+from Recorder import load_trajectory
+
+def frame_ranges(no_frames, no_chunks, step=1):
+    """
+    Return the indices of every step-th frame split into at most no_chunks consecutive ranges of similar length
+
+    no_frames - int type value of the number of recorded frames
+    no_chunks - int type value of the number of ranges to split them into
+    step - int type value of the number of recorded frames between rendered frames
+    """
+    indices = range(0, no_frames, step)
+    bounds = np.linspace(0, len(indices), min(no_chunks, len(indices)) + 1).astype(int)
+    return [indices[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+def frame_name(folder_name, number):
+    """
+    Return the file name of a rendered frame
+
+    folder_name - str type value of the folder of frames
+    number - int type value of the frame's position in the animation
+    """
+    return os.path.join(folder_name, 'Frame {:06d}.png'.format(number))
+
+def render_frames(trajectory, box, radii, folder_name, indices, first_number=0, size=6, dpi=100):
+    """
+    Render the given recorded frames as .png images of the particles' x-y positions and return the number rendered
+    A single figure is drawn with the Agg backend, and for each frame only the particles and time are drawn again on
+    top of a saved image of the axes
+
+    trajectory - str type value of a trajectory file written by TrajectoryRecorder, or the (times, positions) tuple
+                 returned by its trajectory method
+    box - array-like object containing the length of the container in each spatial dimension
+    radii - float type value or np.array of the radius of each recorded particle
+    folder_name - str type value of the folder to save the frames in
+    indices - range of the recorded frames to render
+    first_number - int type value of the number given to the first frame's file, with the rest numbered in turn
+    size - float type value of the width and height of the images in inches
+    dpi - int type value of the resolution of the images in dots per inch
+    """
+    if type(trajectory) == str:
+        trajectory = load_trajectory(trajectory)
+    times, positions = trajectory
+    radii = np.broadcast_to(np.asarray(radii, dtype=float), positions.shape[1:2])
+
+    fig = Figure(figsize=(size, size), dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.set_xlim(0, box[0])
+    ax.set_ylim(0, box[1])
+    ax.set_aspect('equal')
+    # Sized in data units, so each particle is drawn at its true radius
+    particles = EllipseCollection(2*radii, 2*radii, np.zeros_like(radii), units='xy',
+                                  offsets=np.zeros((len(radii), 2)), offset_transform=ax.transData, color='k',
+                                  animated=True)
+    ax.add_collection(particles)
+    label = ax.set_title('', animated=True)
+    # The axes, ticks and labels are drawn once and restored for every frame
+    canvas.draw()
+    background = canvas.copy_from_bbox(fig.bbox)
+
+    for number, index in enumerate(indices, first_number):
+        # Only the rendered frame is read from a memory-mapped file
+        particles.set_offsets(np.array(positions[index, :, :2]))
+        label.set_text('Time = {:.4g} s'.format(times[index]))
+        canvas.restore_region(background)
+        ax.draw_artist(particles)
+        ax.draw_artist(label)
+        # Light compression, as encoding the image takes longer than drawing it
+        Image.frombuffer('RGBA', canvas.get_width_height(), canvas.buffer_rgba()).save(
+            frame_name(folder_name, number), compress_level=1)
+    return len(indices)
+
+def render_trajectory(trajectory, box, radii, folder_name, processes=None, step=1, video_name=None, fps=30,
+                      size=6, dpi=100):
+    """
+    Render a recorded trajectory as numbered .png frames in a folder, splitting the frames into consecutive ranges
+    rendered by a pool of processes, and optionally join them into a video with ffmpeg
+    Returns the number of frames rendered
+
+    trajectory - str type value of a trajectory file written by TrajectoryRecorder, which each process reads lazily,
+                 or the (times, positions) tuple returned by its trajectory method
+    box - array-like object containing the length of the container in each spatial dimension
+    radii - float type value or np.array of the radius of each recorded particle
+    folder_name - str type value of the folder to save the frames in, created if it does not exist
+    processes - Optional int type value for the number of processes, defaulting to the number of CPUs
+    step - int type value of the number of recorded frames between rendered frames
+    video_name - Optional str type value of a video file, such as 'Trajectory.mp4', to join the frames into, which
+                 needs ffmpeg to be installed
+    fps - int type value of the frames per second of the video
+    size - float type value of the width and height of the frames in inches
+    dpi - int type value of the resolution of the frames in dots per inch
+    """
+    if video_name is not None and shutil.which('ffmpeg') is None:
+        raise RuntimeError("ffmpeg must be installed to make a video")
+    os.makedirs(folder_name, exist_ok=True)
+    times = load_trajectory(trajectory)[0] if type(trajectory) == str else trajectory[0]
+    processes = processes if processes is not None else os.cpu_count()
+    chunks = frame_ranges(len(times), processes, step)
+    first_numbers = np.cumsum([0] + [len(chunk) for chunk in chunks[:-1]]).tolist()
+    arguments = [(trajectory, box, radii, folder_name, chunk, first_number, size, dpi)
+                 for chunk, first_number in zip(chunks, first_numbers)]
+
+    if processes == 1 or len(chunks) <= 1:
+        no_frames = sum(render_frames(*argument) for argument in arguments)
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            no_frames = sum(pool.map(render_frames, *zip(*arguments)))
+
+    if video_name is not None:
+        subprocess.run(['ffmpeg', '-y', '-loglevel', 'error', '-framerate', str(fps),
+                        '-i', os.path.join(folder_name, 'Frame %06d.png'), '-pix_fmt', 'yuv420p',
+                        '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', video_name], check=True)
+    return no_frames
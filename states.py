@@ -0,0 +1,67 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+def save_state(file_name, positions, velocities, masses, radii):
+    """
+    Save the state of every particle to a .npy file as a single array with one row per particle, holding the D
+    position coordinates, the D velocity components, the mass and the radius of the particle in turn
+
+    file_name - str type value of the file to save to
+    positions - np.array containing the position of every particle, one row per particle
+    velocities - np.array containing the velocity of every particle, one row per particle
+    masses - np.array containing the mass of every particle
+    radii - np.array containing the radius of every particle
+    """
+    positions = np.asarray(positions, dtype=float)
+    state = np.column_stack([positions, np.asarray(velocities, dtype=float).reshape(positions.shape),
+                             np.asarray(masses, dtype=float), np.asarray(radii, dtype=float)])
+    np.save(file_name, state)
+
+def load_state(file_name, mmap=True):
+    """
+    Return the positions, velocities, masses and radii of every particle saved by save_state, as views of the file's
+    single array which is memory-mapped so it is only read from disk when used
+
+    file_name - str type value of the .npy file to load
+    mmap - Bool type value, if False the whole file is read into memory at once
+    """
+    state = np.load(file_name, mmap_mode='r' if mmap else None, allow_pickle=False)
+    dimensions = (state.shape[1] - 2) // 2
+    return state[:, :dimensions], state[:, dimensions:2*dimensions], state[:, -2], state[:, -1]
+
+def convert_state(file_name):
+    """
+    Convert a .pkl state saved by the Tracker simulate method to a .npy file of the same name and return the new
+    file name
+
+    file_name - str type value of the .pkl file, which should only come from a trusted source as unpickling it can
+                run arbitrary code
+    """
+    state = pd.read_pickle(file_name)
+    new_name = os.path.splitext(file_name)[0] + '.npy'
+    save_state(new_name, np.stack(state['Position'].tolist()), np.stack(state['Velocity'].tolist()),
+               state['Mass'].to_numpy(dtype=float), state['Radius'].to_numpy(dtype=float))
+    return new_name
+
+def convert_folder(folder_name):
+    """
+    Convert every .pkl state in the folder to a .npy file, leaving the .pkl files in place, and return the number of
+    files converted
+
+    folder_name - str type value of the folder containing the files ending with 'State.pkl'
+    """
+    converted = 0
+    for entry in os.scandir(folder_name):
+        if entry.name.endswith('State.pkl') and entry.is_file():
+            convert_state(entry.path)
+            converted += 1
+    return converted
+
+if __name__ == '__main__':
+    # Convert the states of the p-N, p-T and p-V studies, or of the folders given on the command line
+    directory = os.path.dirname(os.path.abspath(__file__))
+    folders = sys.argv[1:] or [os.path.join(directory, name) for name in ['p-N Data', 'p-T Data', 'p-V Data']]
+    for folder in folders:
+        print(folder + ': ' + str(convert_folder(folder)) + ' states converted')
@@ -0,0 +1,91 @@
+import os
+import itertools
+import numpy as np
+import scipy.constants as sp
+from concurrent.futures import ProcessPoolExecutor
+from Tracker import *
+
+def sweep_points(N, L, T, radius, mass, collisions):
+    """
+    Return a list of every combination of the given System and simulation parameters, each as a dictionary
+
+    N - int type value or list of values for the number of particles
+    L - float type value or list of values for the length of one side of the cube
+    T - float type value or list of values for the temperature of the gas
+    radius - float type value or list of values for the radius of the particles
+    mass - float type value or list of values for the mass of the particles
+    collisions - int type value or list of values for the number of collisions to simulate
+    """
+    values = {'N': N, 'L': L, 'T': T, 'radius': radius, 'mass': mass, 'collisions': collisions}
+    values = {key: value if isinstance(value, (list, tuple, np.ndarray)) else [value] for key, value in values.items()}
+    return [dict(zip(values.keys(), combination)) for combination in itertools.product(*values.values())]
+
+def run_point(point, seed, simulation_name, dimensions=3, system_options=None, cache=None):
+    """
+    Simulate a single point of a sweep and save its final state and quantities as Tracker.simulate does, returning
+    the simulated quantities
+
+    point - dictionary containing the 'N', 'L', 'T', 'radius', 'mass' and 'collisions' values to simulate
+    seed - np.random.SeedSequence type object to seed the random initialisation with
+    simulation_name - str type value for the file names
+    dimensions - int type value for the number of spatial dimensions of the cube
+    system_options - Optional dictionary of any further keyword arguments to initialise the System with
+    cache - Optional str type value of a ResultCache folder to reuse an identical earlier run from
+    """
+    if system_options is None:
+        system_options = {}
+    # Equipartition gives the speed with the mean kinetic energy at this temperature
+    speed = np.sqrt(dimensions*sp.Boltzmann*point['T']/point['mass'])
+    # The System gets a generator of its own, so the point does not depend on the global random state
+    gas = System(point['N'], point['mass'], point['radius'], [point['L']]*dimensions, speed, 
+                 rng=int(seed.generate_state(1)[0]), **system_options)
+    simulation = Tracker(gas)
+    simulation.simulate(point['collisions'], simulation_name, cache=cache)
+    # A cached run replaces the Tracker's System with its final System
+    gas = simulation.system
+    return {'Pressure': simulation.pressure(), 'Volume': simulation.volume(), 'Temperature': simulation.temperature(),
+            'Number of particles': gas.no_particles, 'Number of collisions': gas.no_collisions,
+            'Time': gas.global_time}
+
+def run_sweep(points, folder_name, simulation_name='Test', master_seed=None, processes=None, dimensions=3,
+              system_options=None, store=None, cache=None):
+    """
+    Simulate every point of a sweep in parallel across a pool of processes, saving the final state and quantities of
+    point i as '<simulation_name> i State.npy' and '<simulation_name> i Quantities.csv' in the folder, and return
+    the list of simulated quantities in the same order as the points
+
+    points - list of dictionaries as returned by sweep_points
+    folder_name - str type value of the folder to save the data in, created if it does not exist
+    simulation_name - str type value for the root of the file names
+    master_seed - Optional int type value from which the seed of every point is derived, so that the same
+                  master_seed reproduces the whole sweep
+    processes - Optional int type value for the number of processes, defaulting to the number of CPUs
+    dimensions - int type value for the number of spatial dimensions of the cube
+    system_options - Optional dictionary of any further keyword arguments to initialise every System with
+    store - Optional str type value of a ResultsStore file to add every point to, along with its parameters and seed
+    cache - Optional str type value of a ResultCache folder shared by the processes, so that points run before with 
+            the same seed are not simulated again
+    """
+    os.makedirs(folder_name, exist_ok=True)
+    seeds = np.random.SeedSequence(master_seed).spawn(len(points))
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        jobs = [pool.submit(run_point, point, seed, os.path.join(folder_name, simulation_name + ' ' + str(index)),
+                            dimensions, system_options, cache)
+                for index, (point, seed) in enumerate(zip(points, seeds), start=1)]
+        results = [job.result() for job in jobs]
+
+    # Points are added by this process once they are all done, so the workers never contend for the store
+    if store is not None:
+        with ResultsStore(store) as results_store:
+            for index, (point, seed, quantities) in enumerate(zip(points, seeds, results), start=1):
+                row = {'Dimensions': dimensions, 'Mass': point['mass'], 'Radius': point['radius'], 
+                       'Seed': int(seed.generate_state(1)[0])}
+                row.update(quantities)
+                results_store.add_run(row, simulation_name + ' ' + str(index))
+    return results
+
+if __name__ == '__main__':
+    # Reproduce the p-T study, one process per temperature
+    points = sweep_points(N=200, L=5e-7, T=[100, 200, 300, 400, 500, 600, 700], radius=2.5e-11, mass=3.3e-27,
+                          collisions=5000)
+    run_sweep(points, 'p-T Data', simulation_name='T Test', master_seed=389)
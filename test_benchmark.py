@@ -0,0 +1,20 @@
+import pytest
+import numpy as np
+from benchmark import *
+
+@pytest.mark.parametrize("test_input,expected", 
+[((1,1,np.pi/4,2), 2),
+((8,1,np.pi/6,3), 4),
+((100,0.5,0.01,3), (100*(4/3)*np.pi*0.125/0.01)**(1/3))])
+
+def test_box_length(test_input, expected):
+    assert np.isclose(box_length(*test_input), expected)
+
+def test_compare(tmp_path):
+    results = run_benchmarks([20], [2, 3], [0.01], no_events=50)
+    save_baseline(results, str(tmp_path / 'baseline.json'))
+    baseline = load_baseline(str(tmp_path / 'baseline.json'))
+    slower = [dict(result, events_per_second=result['events_per_second']/2) for result in results]
+    larger = [dict(result, event_memory_bytes=2*result['event_memory_bytes'] + 1) for result in results]
+    assert compare(baseline, results) == [] and len(compare(baseline, slower)) == 2 \
+           and len(compare(baseline, larger)) == 2 and all(result['event_memory_bytes'] > 0 for result in results)
@@ -0,0 +1,34 @@
+import pytest
+import os
+import time
+import numpy as np
+from Cache import *
+from System import System
+
+@pytest.mark.parametrize("test_input,expected", 
+[(({'a': 1, 'b': np.arange(3)}, {'b': np.arange(3), 'a': 1}), True),
+(({'a': 1}, {'a': 1.0}), False),
+(({'a': np.zeros(2)}, {'a': np.zeros((2,1))}), False)])
+
+def test_hash_values(test_input, expected):
+    assert (hash_values(test_input[0]) == hash_values(test_input[1])) == expected
+
+def test_key(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    key = cache.key(System(10, 1, 0.02, [1,1,1], 1, rng=3), {'total_collisions': 100})
+    assert key == cache.key(System(10, 1, 0.02, [1,1,1], 1, rng=3), {'total_collisions': 100}) \
+           and key != cache.key(System(10, 1, 0.02, [1,1,1], 1, rng=4), {'total_collisions': 100}) \
+           and key != cache.key(System(10, 1, 0.02, [1,1,1], 1, rng=3), {'total_collisions': 200})
+
+def test_evict(tmp_path):
+    cache = ResultCache(str(tmp_path), max_size=2500)
+    for key in ['a', 'b', 'c']:
+        with cache.entry(key) as folder:
+            with open(os.path.join(folder, 'Data'), 'wb') as file:
+                file.write(bytes(1000))
+        if key == 'b':
+            cache.get('a')
+        # Leave time between the runs so their last use can be told apart
+        time.sleep(0.05)
+    assert cache.entries() == ['a', 'c'] and cache.size() == 2000 and cache.get('b') is None \
+           and cache.invalidate('a') == 1 and cache.invalidate() == 1 and len(cache) == 0
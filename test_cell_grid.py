@@ -0,0 +1,29 @@
+import pytest
+import numpy as np
+from CellGrid import *
+
+@pytest.mark.parametrize("test_input,expected", 
+[(([10,10],2.5,[[1,1],[3,1],[9,9],[6,1]]), [1]),
+(([10,10,10],3,[[1,1,1],[4,4,4],[8,8,8]]), [1])])
+
+def test_neighbours(test_input, expected):
+    grid = CellGrid(test_input[0], test_input[1])
+    grid.assign(np.array(test_input[2], dtype=float))
+    assert sorted(grid.neighbours(0)) == expected
+
+@pytest.mark.parametrize("test_input,expected", 
+[(([3,3],[-2,1]), 0.25),
+(([9,1],[1,0]), np.infty),
+(([3,3],[1,0.5]), 2)])
+
+def test_exit_time(test_input, expected):
+    grid = CellGrid([10,10], 2.5)
+    position = np.array(test_input[0], dtype=float)
+    grid.assign(np.array([position]))
+    assert grid.exit_time(0, position, np.array(test_input[1], dtype=float)) == expected
+
+def test_move():
+    grid = CellGrid([10,10], 2.5)
+    grid.assign(np.array([[5,3],[1,1]], dtype=float))
+    grid.move(0, np.array([5,3], dtype=float), np.array([-1,0.2]))
+    assert grid.particle_cells[0].tolist() == [1,1] and grid.cells[(1,1)] == {0} and (2,1) not in grid.cells
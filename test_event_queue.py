@@ -0,0 +1,32 @@
+import pytest
+import numpy as np
+from EventQueue import *
+
+@pytest.mark.parametrize("test_input,expected",
+[([((0,1),3.0),((0,'1.Min'),1.5),((1,'2.Max'),2.0)], ((0,'1.Min'),1.5)),
+([((0,1),np.infty),((0,2),7.0),((1,2),4.0)], ((1,2),4.0))])
+
+def test_peek(test_input, expected):
+    assert EventQueue(test_input).peek() == expected
+
+def test_update():
+    queue = EventQueue([((0,1),3.0),((0,2),5.0),((1,2),4.0)])
+    queue[(0,2)] = 1.0
+    queue[(0,1)] = np.infty
+    queue[(1,'1.Max')] = 2.0
+    assert queue.pop() == ((0,2),1.0) and queue.pop() == ((1,'1.Max'),2.0) and \
+           queue[(0,1)] == np.infty and len(queue) == 1
+
+def test_heap_order():
+    times = np.random.rand(200)
+    queue = EventQueue()
+    for index, time in enumerate(times):
+        queue[(index,'1.Min')] = time
+    for index in range(0, 200, 3):
+        queue.remove((index,'1.Min'))
+    popped = [queue.pop()[1] for i in range(len(queue))]
+    assert popped == sorted(np.delete(times, range(0, 200, 3)))
+
+def test_event_series():
+    series = EventSeries(EventQueue([((0,1),3.0),((0,'1.Min'),1.5)]), 1)
+    assert series[(0,1)] == 2 and series[(1,'1.Max')] == np.infty and series.first_valid_index() == (0,'1.Min')
@@ -0,0 +1,24 @@
+import pytest
+import numpy as np
+from Histogram import *
+
+@pytest.mark.parametrize("test_input,expected", 
+[([0.5, 1.5, 1.7, 3.9], [1, 2, 0, 1]),
+([0, 4, 10], [1, 0, 0, 0])])
+
+def test_fill(test_input, expected):
+    histogram = SpeedHistogram(4, 4)
+    histogram.fill(np.array(test_input), 0)
+    assert list(histogram.distribution()) == expected \
+           and histogram.counts.sum() == len(test_input)
+
+def test_time_averaged():
+    histogram = SpeedHistogram(4, 4)
+    histogram.fill(np.array([0.5, 1.5]), 0)
+    # The first particle spends 1 of the 4 time units in the first bin and the rest in the last
+    histogram.update(0, 3.5, 1)
+    histogram.update(1, 1.2, 2)
+    assert np.allclose(histogram.time_averaged(4), [0.25, 1, 0, 0.75]) \
+           and list(histogram.distribution()) == [0, 1, 0, 1]
+    histogram.reset_average(4)
+    assert np.allclose(histogram.time_averaged(6), [0, 1, 0, 1])
@@ -0,0 +1,59 @@
+import pytest
+import numpy as np
+from kernels import *
+
+@pytest.mark.parametrize("test_input,expected", 
+[(([2,2,2],[1,1,1],2,[[8,8,8]],[[0,0,0]],[1]), 4.268),
+(([1,0,2],[-1,0,0],6,[[9,0,2]],[[2,0,0]],[0.4]), np.infty),
+(([5,0,0],[-4,0,0],2,[[8,0,0]],[[4,0,0]],[1]), 0),
+(([2,2,0],[1,1,0],1,[[5,5,0]],[[1,1,0]],[1]), np.infty)])
+
+def test_pair_collision_times(test_input, expected):
+    arrays = [np.array(value, dtype=float) for value in test_input]
+    assert round(pair_collision_times(*arrays)[0],3) == expected
+
+def test_pair_collision_times_roots():
+    np.random.seed(2)
+    positions = np.random.rand(200,3)*10
+    velocities = np.random.normal(0,1,(200,3))
+    times = pair_collision_times(positions[0], velocities[0], 0.5, positions[1:], velocities[1:], np.full(199,0.5))
+    for index, time in enumerate(times, start=1):
+        dr = positions[index] - positions[0]
+        dv = velocities[index] - velocities[0]
+        roots = np.roots([dv@dv, 2*dv@dr, dr@dr - 1])
+        real = roots[np.isreal(roots)].real
+        expected = real[real > 0].min() if len(real) == 2 and (real > 0).any() else np.infty
+        assert time == pytest.approx(expected)
+
+@pytest.mark.parametrize("test_input,expected", 
+[(([2,5],[1,-2],1,[10,10]), [np.infty,7,2,np.infty]),
+(([1,5],[0,1],1,[10,10]), [0,np.infty,np.infty,4])])
+
+def test_wall_collision_times(test_input, expected):
+    arrays = [np.array(value, dtype=float) for value in test_input]
+    assert wall_collision_times(*arrays).tolist() == expected
+
+def test_loop_kernels():
+    np.random.seed(3)
+    positions = np.random.rand(100,3)*10
+    velocities = np.random.normal(0,1,(100,3))
+    radii = np.full(100,0.5)
+    box = np.array([10.,10.,10.])
+    assert np.allclose(pair_collision_times_loop(positions[0], velocities[0], 0.5, positions[1:], velocities[1:], radii[1:]),
+                       pair_collision_times(positions[0], velocities[0], 0.5, positions[1:], velocities[1:], radii[1:])) \
+           and wall_collision_times_loop(positions[0], velocities[0], 0.5, box).tolist() == \
+               wall_collision_times(positions[0], velocities[0], 0.5, box).tolist()
+
+def test_collide_pair_loop():
+    positions = np.array([[0,0,0],[1.5,1,0]], dtype=float)
+    velocities_1 = np.array([[1,0.5,0],[-1,0,0.2]], dtype=float)
+    velocities_2 = velocities_1.copy()
+    masses = np.array([1,3], dtype=float)
+    collide_pair(positions, velocities_1, masses, 0, 1)
+    collide_pair_loop(positions, velocities_2, masses, 0, 1)
+    assert np.allclose(velocities_1, velocities_2)
+
+def test_numba_backend():
+    pytest.importorskip('numba')
+    assert get_backend('numba').name == 'numba'
+
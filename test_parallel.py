@@ -0,0 +1,52 @@
+import pytest
+import numpy as np
+from System import *
+from Parallel import *
+
+@pytest.mark.parametrize("test_input", [(1, 1), (2, 8), (2, 32)])
+
+def test_parallel_engine(test_input):
+    box_1 = System(60, 1, 0.5, [12,12,12], 1, cell_length=1, lazy=True, placement='lattice', rng=3)
+    box_2 = System(60, 1, 0.5, [12,12,12], 1, cell_length=1, lazy=True, placement='lattice', rng=3)
+    while box_1.no_collisions < 300:
+        box_1.simulate_event()
+    with ParallelEngine(box_2, 2, domains=test_input[0], batch_size=test_input[1]) as engine:
+        engine.simulate(300)
+    box_1.synchronise()
+    box_2.synchronise()
+    assert np.array_equal(box_1.positions, box_2.positions) and np.array_equal(box_1.velocities, box_2.velocities) \
+           and box_1.global_time == box_2.global_time and box_1.net_impulse == box_2.net_impulse \
+           and box_2.no_collisions == 300 \
+           and np.shares_memory(box_2.particles[5].position.components, box_2.positions)
+
+@pytest.mark.parametrize("test_input", [(1, 1), (2, 32)])
+
+def test_catch_up(test_input):
+    box = System(60, 1, 0.5, [12,12,12], 1, cell_length=1, lazy=True, placement='lattice', rng=3)
+    with ParallelEngine(box, 2, domains=test_input[0], batch_size=test_input[1]) as engine:
+        engine.simulate(300)
+        catch_up(engine.worker)
+        assert engine.worker['grid'].cells == box.grid.cells \
+               and np.array_equal(engine.worker['grid'].particle_cells, box.grid.particle_cells)
+
+def test_two_engines():
+    box_1 = System(60, 1, 0.5, [12,12,12], 1, cell_length=1, lazy=True, placement='lattice', rng=3)
+    box_2 = System(60, 1, 0.5, [12,12,12], 1, cell_length=1, lazy=True, placement='lattice', rng=3)
+    box_3 = System(60, 1, 0.5, [12,12,12], 1, cell_length=1, lazy=True, placement='lattice', rng=5)
+    while box_1.no_collisions < 300:
+        box_1.simulate_event()
+    # Each engine keeps its own state in this process, so taking turns leaves the other's results unchanged
+    with ParallelEngine(box_2, 1, batch_size=4) as engine_2, ParallelEngine(box_3, 1, batch_size=4) as engine_3:
+        for total in range(20, 320, 20):
+            engine_2.simulate(total)
+            engine_3.simulate(total)
+    box_1.synchronise()
+    box_2.synchronise()
+    assert np.array_equal(box_1.positions, box_2.positions) and box_3.no_collisions == 300 \
+           and engine_2.batch_limit <= engine_2.batch_size
+
+@pytest.mark.parametrize("test_input", [{}, {'cell_length': 1}, {'lazy': True}])
+
+def test_parallel_ValueError(test_input):
+    with pytest.raises(ValueError):
+        ParallelEngine(System(10, 1, 0.5, [12,12,12], 1, **test_input))
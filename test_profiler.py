@@ -0,0 +1,18 @@
+import pytest
+from Profiler import *
+
+@pytest.mark.parametrize("test_input,expected", 
+[([0, 1, '1.Min', 'Cell', '2.Max'], {'wall': 2, 'pair': 2, 'cell': 1}),
+([], {'wall': 0, 'pair': 0, 'cell': 0})])
+
+def test_count_event(test_input, expected):
+    stats = EventStats()
+    for object_2 in test_input:
+        stats.count_event(object_2)
+    assert stats.events == expected
+
+def test_timed():
+    stats = EventStats()
+    square = stats.timed('predict', lambda x: x*x)
+    assert square(3) == 9 and square(4) == 16 and stats.calls['predict'] == 2 and stats.times['predict'] > 0 \
+           and 'predict' in stats.report()
@@ -0,0 +1,48 @@
+import pytest
+import numpy as np
+from Recorder import *
+from Writer import BackgroundWriter
+
+@pytest.mark.parametrize("test_input,expected", 
+[((4,2,30), 24),
+((4,100,30), 0),
+((50,2,30), 0)])
+
+def test_spill(test_input, expected, tmp_path):
+    recorder = TrajectoryRecorder([1,2], 3, str(tmp_path / 'Trajectory.bin'), test_input[0], test_input[1])
+    for frame in range(test_input[2]):
+        recorder.record(frame, np.arange(9.).reshape(3,3) + frame)
+    spilled_frames = recorder.spilled_frames
+    times, positions = recorder.trajectory()
+    assert spilled_frames == expected and times.tolist() == list(range(30)) \
+           and positions[7].tolist() == [[10,11,12],[13,14,15]]
+
+def test_temporary_spill():
+    recorder = TrajectoryRecorder([0], 2, chunk_size=4, max_chunks=2)
+    for frame in range(30):
+        recorder.record(frame, np.array([[frame, -frame]], dtype=float))
+    spilled_frames = recorder.spilled_frames
+    times, positions = recorder.trajectory()
+    assert spilled_frames == 24 and recorder.temporary and times.tolist() == list(range(30)) \
+           and positions[29,0].tolist() == [29,-29]
+    file_name = recorder.file_name
+    del times, positions
+    recorder.remove_temporary()
+    assert not os.path.exists(file_name) and recorder.file_name is None
+
+def test_load_trajectory(tmp_path):
+    recorder = TrajectoryRecorder([0], 2, str(tmp_path / 'Trajectory.bin'), chunk_size=8)
+    for frame in range(20):
+        recorder.record(frame/10, np.array([[frame, -frame]], dtype=float))
+    recorder.save()
+    times, positions = load_trajectory(str(tmp_path / 'Trajectory.bin'))
+    assert isinstance(positions, np.memmap) and positions.shape == (20,1,2) and positions[19,0].tolist() == [19,-19]
+
+def test_background_spill(tmp_path):
+    with BackgroundWriter(1) as writer:
+        recorder = TrajectoryRecorder([0], 2, str(tmp_path / 'Trajectory.bin'), chunk_size=4, max_chunks=1, 
+                                      writer=writer)
+        for frame in range(30):
+            recorder.record(frame, np.array([[frame, -frame]], dtype=float))
+        times, positions = recorder.save()
+    assert times.tolist() == list(range(30)) and positions[29,0].tolist() == [29,-29] and writer.no_written > 1
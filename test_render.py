@@ -0,0 +1,25 @@
+import pytest
+import os
+import numpy as np
+from Recorder import TrajectoryRecorder
+from render import *
+
+@pytest.mark.parametrize("test_input,expected", 
+[((10,3,1), [range(0,3), range(3,6), range(6,10)]),
+((10,4,3), [range(0,3,3), range(3,6,3), range(6,9,3), range(9,12,3)]),
+((2,4,1), [range(0,1), range(1,2)])])
+
+def test_frame_ranges(test_input, expected):
+    assert frame_ranges(*test_input) == expected
+
+@pytest.mark.parametrize("test_input", [1, 2])
+
+def test_render_trajectory(test_input, tmp_path):
+    recorder = TrajectoryRecorder([0,1,2], 2, str(tmp_path / 'Trajectory.bin'))
+    for frame in range(7):
+        recorder.record(frame, np.array([[1,1],[2,2],[frame,3]], dtype=float))
+    recorder.save()
+    no_frames = render_trajectory(str(tmp_path / 'Trajectory.bin'), [10,10], 0.5, str(tmp_path / 'Frames'), 
+                                  test_input, step=2)
+    assert no_frames == 4 and sorted(os.listdir(str(tmp_path / 'Frames'))) == [os.path.basename(frame_name('', i)) 
+                                                                                for i in range(4)]
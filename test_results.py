@@ -0,0 +1,28 @@
+import pytest
+import os
+import pandas as pd
+from Results import *
+
+@pytest.mark.parametrize("test_input,expected", 
+[({'Temperature': 300}, 2),
+({'Temperature': 300, 'Number_of_particles': 20}, 1),
+({'Volume': 2.0}, 0),
+({'columns': {'Wall_pressure': 1.0}}, 1),
+({'columns': {'Number of particles': 10}, 'Temperature': 300}, 1)])
+
+def test_runs(test_input, expected, tmp_path):
+    with ResultsStore(str(tmp_path / 'Results.db')) as store:
+        store.add_run({'Temperature': 300, 'Volume': 1.0, 'Number of particles': 10, 'Pressure': 5.0}, 'Test 1')
+        store.add_run({'Temperature': 300, 'Volume': 1.0, 'Number of particles': 20, 'Pressure': 10.0}, 'Test 2')
+        store.add_run({'Temperature': 600, 'Volume': 1.0, 'Number of particles': 10, 'Pressure': 10.0, 'Seed': 4, 
+                       'Wall_pressure': 1.0})
+    with ResultsStore(str(tmp_path / 'Results.db')) as store:
+        assert len(store.runs(**test_input)) == expected and len(store) == 3
+
+def test_import_csv(tmp_path):
+    for index, temperature in enumerate([100, 200]):
+        pd.Series({'Pressure': 1.0, 'Temperature': temperature}).to_csv(
+            str(tmp_path / ('Test ' + str(index) + ' Quantities.csv')))
+    with ResultsStore(str(tmp_path / 'Results.db')) as store:
+        assert store.import_csv(str(tmp_path)) == 2 \
+               and list(store.runs()['Temperature']) == [100, 200] and list(store.runs()['Name']) == ['Test 0', 'Test 1']
@@ -0,0 +1,24 @@
+import pytest
+import numpy as np
+import pandas as pd
+from states import *
+
+@pytest.mark.parametrize("test_input", [(5, 3), (1, 2), (10, 4)])
+
+def test_save_state(test_input, tmp_path):
+    positions = np.random.rand(*test_input)
+    velocities = np.random.rand(*test_input)
+    masses = np.random.rand(test_input[0])
+    radii = np.random.rand(test_input[0])
+    save_state(str(tmp_path / 'State.npy'), positions, velocities, masses, radii)
+    loaded = load_state(str(tmp_path / 'State.npy'))
+    assert all(np.array_equal(array, expected) for array, expected in zip(loaded, [positions, velocities, masses, radii]))
+
+def test_convert_folder(tmp_path):
+    positions = np.random.rand(4, 3)
+    state = pd.DataFrame({'Position': list(positions), 'Velocity': list(-positions), 'Mass': [1.0]*4, 
+                          'Radius': [0.1]*4})
+    state.to_pickle(str(tmp_path / 'Test State.pkl'))
+    assert convert_folder(str(tmp_path)) == 1
+    loaded = load_state(str(tmp_path / 'Test State.npy'))
+    assert np.array_equal(loaded[0], positions) and np.array_equal(loaded[1], -positions) and loaded[3][0] == 0.1
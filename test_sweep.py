@@ -0,0 +1,18 @@
+import pytest
+import os
+from sweep import *
+
+@pytest.mark.parametrize("test_input,expected", 
+[((10,1,[100,200,300],0.01,1,[50,100]), 6),
+((10,[1,2],300,0.01,1,50), 2)])
+
+def test_sweep_points(test_input, expected):
+    assert len(sweep_points(*test_input)) == expected
+
+def test_run_sweep(tmp_path):
+    points = sweep_points(10, 1e-8, [100, 300], 1e-10, 3.3e-27, 50)
+    quantities_1 = run_sweep(points, str(tmp_path), master_seed=1, processes=2)
+    quantities_2 = run_sweep(points, str(tmp_path), master_seed=1, processes=2)
+    assert quantities_1 == quantities_2 and quantities_1[0]['Temperature'] < quantities_1[1]['Temperature'] \
+           and os.path.exists(os.path.join(tmp_path, 'Test 2 State.npy')) \
+           and os.path.exists(os.path.join(tmp_path, 'Test 2 Quantities.csv'))
@@ -72,8 +72,212 @@ def test_update_event_series():
            round(box.event_series[(0,'2.Max')],10) == 93 and \
            round(box.event_series[(1,'1.Max')],10) == 91 and \
            round(box.event_series[(0,1)],10) == np.infty
-           
 
+def test_particle_views():
+    box = System(0, 1, 1, [100,100,100], 1)
+    box.particles = [Particle([2,2,5],[1,1,0],1,1), Particle([8,6,5],[0,0,0],2,1)]
+    box.particles[0].update(2)
+    box.velocities[1] += [1,0,0]
+    assert box.positions[0].tolist() == [4,4,5] and box.particles[1].velocity == Velocity([1,0,0]) \
+           and box.masses.tolist() == [1,2]
+
+def test_cell_grid_events():
+    np.random.seed(4)
+    box_1 = System(30, 1, 0.02, [1,1,1], 1)
+    np.random.seed(4)
+    box_2 = System(30, 1, 0.02, [1,1,1], 1, cell_length=0.2)
+    events_1 = []
+    events_2 = []
+    while box_1.no_collisions < 100:
+        events_1.append(box_1.event_series.first_valid_index())
+        box_1.simulate_event()
+    while box_2.no_collisions < 100:
+        event = box_2.event_series.first_valid_index()
+        if event[1] != 'Cell':
+            events_2.append(event)
+        box_2.simulate_event()
+    assert events_1 == events_2 and round(box_1.global_time,8) == round(box_2.global_time,8)
+
+def test_lazy_propagation():
+    box = System(0, 1, 1, [100,100,100], 1, cell_length=10, lazy=True)
+    box.particles = [Particle([2,2,5],[1,1,0],1,1), Particle([8,6,5],[0,0,0],1,1), Particle([50,50,50],[0,0,1],1,1)]
+    box.initialise_event_series()
+    box.simulate_event()
+    stale = box.positions[2].tolist()
+    box.synchronise()
+    assert round(box.global_time,10) == 4 and stale == [50,50,50] and box.positions[2].tolist() == [50,50,54] \
+           and [round(r_i,10) for r_i in box.particles[0].position] == [6,6,5]
+
+@pytest.mark.parametrize("test_input,expected", 
+[((200,'grid',[1,1,1]), True),
+((200,'lattice',[1,1,1]), True),
+((50,'lattice',[2,1]), True)])
+
+def test_placement(test_input, expected):
+    box = System(test_input[0], 1, 0.05, test_input[2], 1, placement=test_input[1])
+    separations = box.positions[:, np.newaxis] - box.positions[np.newaxis]
+    distances = np.sqrt(np.sum(separations**2, axis=2)) + np.eye(test_input[0])
+    assert box.check_N() == expected and bool(np.all(distances >= 0.1)) == expected
+
+@pytest.mark.parametrize("test_input,expected", 
+[('grid', PlacementError),
+('lattice', PlacementError)])
+
+def test_PlacementError(test_input, expected):
+    with pytest.raises(expected):
+        box = System(2000, 1, 0.05, [1,1,1], 1, placement=test_input, max_attempts=100)
+
+def test_numba_backend():
+    pytest.importorskip('numba')
+    np.random.seed(6)
+    box_1 = System(40, 1, 0.02, [1,1,1], 1, backend='numpy')
+    np.random.seed(6)
+    box_2 = System(40, 1, 0.02, [1,1,1], 1, backend='numba')
+    while box_1.no_collisions < 200:
+        box_1.simulate_event()
+        box_2.simulate_event()
+    assert np.allclose(box_1.positions, box_2.positions) and np.isclose(box_1.net_impulse, box_2.net_impulse)
+
+@pytest.mark.parametrize("test_input", [{}, {'cell_length': 0.1, 'lazy': True}])
+
+def test_checkpoint(test_input, tmp_path):
+    np.random.seed(2)
+    box_1 = System(30, 1, 0.02, [1,1,1], 1, **test_input)
+    while box_1.no_collisions < 50:
+        box_1.simulate_event()
+    box_1.save_checkpoint(str(tmp_path / 'Checkpoint.npz'))
+    box_2 = System.load_checkpoint(str(tmp_path / 'Checkpoint.npz'))
+    while box_1.no_collisions < 150:
+        box_1.simulate_event()
+        box_2.simulate_event()
+    assert np.array_equal(box_1.particles[0].position.components, box_2.particles[0].position.components) \
+           and box_1.net_impulse == box_2.net_impulse and box_1.global_time == box_2.global_time
+
+@pytest.mark.parametrize("test_input", [{}, {'cell_length': 0.1, 'lazy': True}])
+
+def test_track_speeds(test_input, tmp_path):
+    box_1 = System(30, 1, 0.02, [1,1,1], 1, rng=7, **test_input)
+    box_1.track_speeds(3, 30)
+    while box_1.no_collisions < 100:
+        box_1.simulate_event()
+    box_1.save_checkpoint(str(tmp_path / 'Checkpoint.npz'))
+    box_2 = System.load_checkpoint(str(tmp_path / 'Checkpoint.npz'))
+    histogram = box_1.speed_histogram
+    expected = np.histogram(np.minimum(box_1.speeds(), 3), histogram.edges)[0]
+    assert np.array_equal(histogram.distribution(), expected) \
+           and np.isclose(histogram.time_averaged(box_1.global_time).sum(), 30) \
+           and np.array_equal(box_2.speed_histogram.time_averaged(box_1.global_time), 
+                              histogram.time_averaged(box_1.global_time))
+
+def test_legacy_seed():
+    # Positions and directions of a System without rng are drawn in turn from np.random, as in earlier versions
+    np.random.seed(1)
+    box = System(5, 1, 0.01, [1,1,1], 1)
+    assert np.allclose(box.positions[1], [0.5380403993232898, 0.4208106241152289, 0.6815151103888243]) \
+           and np.allclose(box.velocities[4], [0.6283705118794415, -0.6215761970706978, -0.4677537076662221])
+
+def test_lazy_warning():
+    with pytest.warns(UserWarning):
+        System(5, 1, 0.02, [1,1,1], 1, lazy=True)
+
+def test_lazy_particle_view():
+    box = System(30, 1, 0.02, [1,1,1], 1, cell_length=0.1, lazy=True, rng=6)
+    while box.no_collisions < 50:
+        box.simulate_event()
+    positions = [particle.position.components.copy() for particle in box.particles[3:5]]
+    # Only the particles read are brought up to the global_time
+    assert np.allclose(positions, box.positions_at([3, 4])) and np.all(box.update_times[3:5] == box.global_time) \
+           and np.count_nonzero(box.update_times == box.global_time) < box.no_particles \
+           and len(box.particles) == 30 and len(list(box.particles)) == 30
+
+def test_reset_measurement(tmp_path):
+    box_1 = System(30, 1, 0.02, [1,1,1], 1, rng=6)
+    while box_1.no_collisions < 50:
+        box_1.simulate_event()
+    box_1.reset_measurement()
+    box_1.save_checkpoint(str(tmp_path / 'Checkpoint.npz'))
+    box_2 = System.load_checkpoint(str(tmp_path / 'Checkpoint.npz'))
+    assert box_1.net_impulse == 0 and not np.any(box_1.wall_impulse) \
+           and box_1.measurement_start == box_1.global_time == box_2.measurement_start
+
+@pytest.mark.parametrize("test_input", [None, 50])
+
+def test_running_observables(test_input):
+    np.random.seed(8)
+    box = System(30, 1, 0.02, [1,1,1], 1, recompute_interval=test_input)
+    while box.no_collisions < 200:
+        box.simulate_event()
+    kinetic_energy = box.system_KE()
+    momentum = box.momentum.copy()
+    box.recompute_observables()
+    assert np.isclose(kinetic_energy, box.kinetic_energy) and np.allclose(momentum, box.momentum) \
+           and np.isclose(box.wall_impulse.sum(), box.net_impulse)
+
+
+@pytest.mark.parametrize("test_input", [{}, {'cell_length': 0.1, 'lazy': True}])
+
+def test_profile(test_input):
+    np.random.seed(4)
+    box_1 = System(30, 1, 0.02, [1,1,1], 1, profile=True, **test_input)
+    np.random.seed(4)
+    box_2 = System(30, 1, 0.02, [1,1,1], 1, **test_input)
+    for i in range(300):
+        box_1.simulate_event()
+        box_2.simulate_event()
+    assert np.array_equal(box_1.positions, box_2.positions) and box_1.stats.no_events() == 300 \
+           and box_1.stats.events['pair'] + box_1.stats.events['wall'] == box_1.no_collisions \
+           and box_1.stats.calls['propagate'] == 300 and box_2.stats is None
+
+@pytest.mark.parametrize("test_input", [{}, {'cell_length': 0.1, 'lazy': True}])
+
+def test_simulate_until(test_input):
+    np.random.seed(6)
+    box = System(30, 1, 0.02, [1,1,1], 1, **test_input)
+    time = box.event_queue.peek()[1]/2
+    positions = box.positions_at(time=time)
+    box.simulate_until(time)
+    assert np.allclose(box.positions_at(), positions) and box.global_time == time and box.no_collisions == 0
+    box.simulate_until(0.5)
+    assert box.global_time == 0.5 and box.event_queue.peek()[1] > 0.5 \
+           and np.allclose(box.positions_at([3, 7]), [box.particles[3].position.components, 
+                                                      box.particles[7].position.components])
+
+def test_eager_sampling():
+    box_1 = System(30, 1, 0.02, [1,1,1], 1, rng=6)
+    box_2 = System(30, 1, 0.02, [1,1,1], 1, rng=6)
+    for time in np.linspace(0, 0.2, 201):
+        positions = box_1.positions.copy()
+        box_1.simulate_until(time)
+        if box_1.no_collisions == box_2.no_collisions:
+            # Sampling between events leaves the particles where the last event left them
+            assert np.array_equal(box_1.positions, positions)
+        while box_2.no_collisions < box_1.no_collisions or box_2.event_queue.peek()[1] <= time:
+            box_2.simulate_event()
+    box_1.synchronise()
+    box_2.synchronise()
+    assert np.allclose(box_1.positions, box_2.positions_at(time=0.2)) and box_1.no_collisions == box_2.no_collisions
+
+@pytest.mark.parametrize("test_input", ['random', 'grid', 'lattice'])
 
+def test_rng(test_input, tmp_path):
+    box_1 = System(30, 1, 0.02, [1,1,1], 1, placement=test_input, rng=11)
+    np.random.seed(0)
+    box_2 = System(30, 1, 0.02, [1,1,1], 1, placement=test_input, rng=np.random.default_rng(11))
+    for i in range(100):
+        box_1.simulate_event()
+    box_1.save_checkpoint(str(tmp_path / 'Checkpoint.npz'))
+    box_3 = System.load_checkpoint(str(tmp_path / 'Checkpoint.npz'))
+    assert np.array_equal(box_1.particles[0].position.components, box_3.particles[0].position.components) \
+           and np.array_equal(box_2.velocities[0], System(30, 1, 0.02, [1,1,1], 1, placement=test_input, 
+                                                          rng=11).velocities[0]) \
+           and box_3.seed == 11 and box_1.rng.random() == box_3.rng.random()
 
+@pytest.mark.parametrize("test_input", [[3, 5], np.array([4, 9]), np.random.SeedSequence(8).spawn(3)[2], np.random.SeedSequence()])
 
+def test_seed_sequence(test_input, tmp_path):
+    box_1 = System(30, 1, 0.02, [1,1,1], 1, rng=test_input)
+    box_1.save_checkpoint(str(tmp_path / 'Checkpoint.npz'))
+    box_2 = System.load_checkpoint(str(tmp_path / 'Checkpoint.npz'))
+    # The restored seed creates the same generator as the original one
+    assert np.array_equal(System(30, 1, 0.02, [1,1,1], 1, rng=box_2.seed).positions, box_1.positions) \
+           and box_1.rng.random() == box_2.rng.random()
@@ -31,4 +31,144 @@ def test_pressure(test_input, expected):
 def test_volume(test_input, expected):
     tester = Tracker(System(10, 1, 1, test_input, 1))
     volume = tester.volume()
-    assert (volume-expected) <= 0.01 * volume
\ No newline at end of file
+    assert (volume-expected) <= 0.01 * volume
+
+@pytest.mark.parametrize("test_input,expected", 
+[(([10,20],[10,20,0,0]), [0.005,0.01,0,0]),
+(([10,10,10],[0,0,0,0,50,50]), [0,0,0,0,5e-3,5e-3])])
+
+def test_wall_pressures(test_input, expected):
+    tester = Tracker(System(0, 1, 1, test_input[0], 1))
+    tester.system.global_time = 100
+    tester.system.wall_impulse = np.array(test_input[1], dtype=float)
+    assert np.allclose(tester.wall_pressures(), expected)
+
+def test_simulate_converged(tmp_path):
+    np.random.seed(3)
+    tester = Tracker(System(30, 1, 0.01, [1,1,1], 1))
+    tester.simulate(100000, str(tmp_path / 'Test'), target_error=0.05)
+    quantities = pd.read_csv(str(tmp_path / 'Test Quantities.csv'), index_col=0)['0']
+    assert tester.system.no_collisions < 100000 and quantities['Relative pressure error'] < 0.05 \
+           and quantities['Number of blocks'] >= 10
+
+
+def test_simulate_sampled(tmp_path):
+    np.random.seed(3)
+    tester = Tracker(System(30, 1, 0.02, [1,1,1], 1, lazy=True))
+    samples = tester.simulate_sampled(np.linspace(0, 0.2, 5), {'Energy': lambda tracker: tracker.system.system_KE(),
+                                      'x': lambda tracker: tracker.system.positions_at([0])[0, 0]}, 
+                                      str(tmp_path / 'Test'))
+    assert list(samples.index) == list(np.linspace(0, 0.2, 5)) and np.allclose(samples['Energy'], 15) \
+           and samples['x'].iloc[-1] == tester.system.particles[0].position.components[0] \
+           and os.path.exists(str(tmp_path / 'Test Samples.csv'))
+
+def test_store_run(tmp_path):
+    tester = Tracker(System(20, 1, 0.02, [1,1,1], 1, rng=5))
+    tester.simulate(100, str(tmp_path / 'Test'), store=str(tmp_path / 'Results.db'))
+    runs = ResultsStore(str(tmp_path / 'Results.db')).runs(Seed=5)
+    assert len(runs) == 1 and runs['Number of collisions'].iloc[0] == 100 and runs['Radius'].iloc[0] == 0.02 \
+           and np.isclose(runs['Pressure'].iloc[0], tester.pressure()) and runs['Name'].iloc[0] == str(tmp_path / 'Test')
+
+@pytest.mark.parametrize("test_input", ['npy', 'pkl'])
+
+def test_import_state(test_input, tmp_path):
+    tester = Tracker(System(20, 1, 0.02, [1,1,1], 1, rng=2))
+    tester.simulate(50, str(tmp_path / 'Test'), state_format=test_input)
+    imported = Tracker(System(0, 1, 1, [1,1,1], 1))
+    imported.import_state(str(tmp_path / ('Test State.' + test_input)))
+    assert np.array_equal(imported.system.positions, tester.system.positions) \
+           and np.array_equal(imported.system.velocities, tester.system.velocities) \
+           and np.array_equal(imported.system.particles[3].position.components, tester.system.positions[3]) \
+           and np.isclose(imported.system.system_KE(), tester.system.system_KE())
+
+def test_simulate_parallel(tmp_path):
+    tester_1 = Tracker(System(60, 1, 0.5, [12,12,12], 1, cell_length=1, lazy=True, rng=4))
+    tester_2 = Tracker(System(60, 1, 0.5, [12,12,12], 1, cell_length=1, lazy=True, rng=4))
+    tester_1.simulate(200, str(tmp_path / 'Serial'))
+    tester_2.simulate(200, str(tmp_path / 'Parallel'), processes=2)
+    assert tester_1.pressure() == tester_2.pressure() and tester_2.system.no_collisions == 200
+
+@pytest.mark.parametrize("test_input", [{}, {'cell_length': 0.1, 'lazy': True}])
+
+def test_equilibrate(test_input, tmp_path):
+    tester = Tracker(System(50, 1, 0.02, [1,1,1], 1, rng=2, **test_input))
+    # Every particle starts with the same speed, far from the Maxwell-Boltzmann distribution
+    assert tester.equilibrium_test()[1] < 1e-6
+    tester.simulate(5000, str(tmp_path / 'Test'), max_equilibration=4000)
+    quantities = pd.read_csv(str(tmp_path / 'Test Quantities.csv'), index_col=0)['0']
+    assert 0 < quantities['Equilibration collisions'] < 4000 and quantities['Measurement start'] > 0 \
+           and tester.measured_time() < tester.system.global_time and tester.system.no_collisions == 5000
+
+def test_equilibrate_fails():
+    tester = Tracker(System(50, 1, 0.02, [1,1,1], 1, rng=2))
+    with pytest.raises(SimulationError):
+        tester.equilibrate(20)
+
+@pytest.mark.parametrize("test_input", [7, 1000])
+
+def test_simulate_conservation(test_input, tmp_path):
+    tester = Tracker(System(20, 1, 0.02, [1,1,1], 1, cell_length=0.1, rng=3))
+    tester.simulate_conservation(100, str(tmp_path / 'Test'), chunk_size=test_input)
+    energies = pd.read_pickle(str(tmp_path / 'Test Conservation.pkl'))
+    assert list(energies.index) == list(range(101)) and np.allclose(energies['Energy'], 10) \
+           and energies.equals(pd.read_csv(str(tmp_path / 'Test Conservation.csv'), index_col=0))
+
+def test_shared_writer(tmp_path):
+    with BackgroundWriter() as writer:
+        for run in range(3):
+            tester = Tracker(System(20, 1, 0.02, [1,1,1], 1, rng=run))
+            tester.simulate(50, str(tmp_path / ('Test ' + str(run))), checkpoint_interval=20, writer=writer)
+    resumed = System.load_checkpoint(str(tmp_path / 'Test 2 Checkpoint.npz'))
+    # Two checkpoints, the state and the quantities of each run
+    assert writer.no_written == 12 and resumed.no_collisions == 40 \
+           and all(os.path.exists(str(tmp_path / ('Test ' + str(run) + ' Quantities.csv'))) for run in range(3))
+
+def test_track_particles_animation(tmp_path):
+    tester = Tracker(System(10, 1, 0.05, [1,1], 1, rng=4))
+    recorder = tester.simulate_track_particles(20, [0,1], plot=False, animation_folder=str(tmp_path / 'Frames'), 
+                                               processes=1)
+    assert len(os.listdir(str(tmp_path / 'Frames'))) == recorder.no_frames()
+
+def test_simulate_cached(tmp_path):
+    results = []
+    for run in range(2):
+        np.random.seed(1)
+        system = System(20, 1, 0.02, [1,1,1], 1)
+        tester = Tracker(system)
+        tester.simulate(300, str(tmp_path / ('Test ' + str(run))), checkpoint_interval=200, 
+                        cache=str(tmp_path / 'Cache'))
+        results.append((system, np.random.random(), 
+                        pd.read_csv(str(tmp_path / ('Test ' + str(run) + ' Quantities.csv')), index_col=0)))
+    (system_1, random_1, quantities_1), (system_2, random_2, quantities_2) = results
+    checkpoint = System.load_checkpoint(str(tmp_path / 'Test 1 Checkpoint.npz'))
+    # The second run is loaded from the cache into the same System without changing the global random state
+    assert len(ResultCache(str(tmp_path / 'Cache'))) == 1 and random_1 == random_2 and tester.system is system_2 \
+           and np.array_equal(system_1.positions, system_2.positions) and quantities_1.equals(quantities_2) \
+           and system_2.global_time == system_1.global_time and checkpoint.no_collisions == 300
+
+def test_resume_blocks(tmp_path):
+    tester_1 = Tracker(System(20, 1, 0.02, [1,1,1], 1, rng=6))
+    tester_1.simulate(2000, str(tmp_path / 'Full'), target_error=1e-9)
+    tester_2 = Tracker(System(20, 1, 0.02, [1,1,1], 1, rng=6))
+    tester_2.simulate(1000, str(tmp_path / 'Part'), checkpoint_interval=1000, target_error=1e-9)
+    tester_3 = Tracker()
+    tester_3.resume(str(tmp_path / 'Part Checkpoint.npz'))
+    tester_3.simulate(2000, str(tmp_path / 'Resumed'), target_error=1e-9)
+    assert len(tester_2.block_pressures) > 5 and tester_3.block_pressures == tester_1.block_pressures \
+           and tester_3.pressure_error() == tester_1.pressure_error()
+
+def test_resume_equilibrated(tmp_path):
+    tester_1 = Tracker(System(50, 1, 0.02, [1,1,1], 1, rng=2))
+    tester_1.simulate(3000, str(tmp_path / 'Full'), max_equilibration=2000)
+    tester_2 = Tracker(System(50, 1, 0.02, [1,1,1], 1, rng=2))
+    # The checkpoint is saved 100 collisions after equilibrating
+    tester_2.simulate(tester_1.equilibration_collisions + 100, str(tmp_path / 'Part'), checkpoint_interval=100, 
+                      max_equilibration=2000)
+    tester_3 = Tracker()
+    tester_3.resume(str(tmp_path / 'Part Checkpoint.npz'))
+    tester_3.simulate(3000, str(tmp_path / 'Resumed'), max_equilibration=2000)
+    quantities_1 = pd.read_csv(str(tmp_path / 'Full Quantities.csv'), index_col=0)['0']
+    quantities_3 = pd.read_csv(str(tmp_path / 'Resumed Quantities.csv'), index_col=0)['0']
+    assert tester_3.equilibrated and tester_3.pressure() == tester_1.pressure() \
+           and quantities_3['Equilibration collisions'] == quantities_1['Equilibration collisions'] \
+           and quantities_3['Measurement start'] == quantities_1['Measurement start']
@@ -85,4 +85,37 @@ def test_polar_angle(test_input,expected):
 
 def test_DimensionError(test_input,expected):
     with pytest.raises(expected):
-        y = test_input[0] + test_input[1]
\ No newline at end of file
+        y = test_input[0] + test_input[1]
+
+@pytest.mark.parametrize("test_input,expected", 
+[((Vector([1,2]),Vector([-3,2]),2), Vector([-10,12])),
+((Vector([5,2]),Vector([0,-1]),0.5), Vector([2.5,0]))])
+
+def test_in_place(test_input,expected):
+    vector = test_input[0]
+    components = vector.components
+    vector += test_input[1]
+    vector -= -test_input[1]
+    vector *= test_input[2]
+    assert vector is test_input[0] and vector.components is components and vector == expected
+
+@pytest.mark.parametrize("test_input,expected", 
+[((Vector([1,2.0]),Vector([2,1,2,4])), DimensionError),
+((Vector([1,2.0]), Vector([2,1,3])), DimensionError)])
+
+def test_in_place_DimensionError(test_input,expected):
+    with pytest.raises(expected):
+        test_input[0] -= test_input[1]
+
+def test_wrap():
+    components = np.array([1.0, 2.0])
+    vector = Vector.wrap(components)
+    vector += Vector([1,1])
+    assert vector.components is components and components[1] == 3 and not hasattr(vector, '__dict__')
+
+@pytest.mark.parametrize("test_input", [(1000, 2), (10, 5), (0, 3)])
+
+def test_random_unit_vectors(test_input):
+    vectors = random_unit_vectors(*test_input, np.random.default_rng(1))
+    assert vectors.shape == test_input and np.allclose(np.linalg.norm(vectors, axis=1), 1) \
+           and np.array_equal(vectors, random_unit_vectors(*test_input, np.random.default_rng(1)))
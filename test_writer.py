@@ -0,0 +1,29 @@
+import pytest
+import numpy as np
+from Writer import *
+
+@pytest.mark.parametrize("test_input", [1, 4])
+
+def test_order(test_input):
+    written = []
+    with BackgroundWriter(test_input) as writer:
+        for value in range(50):
+            writer.submit(written.append, value)
+    assert written == list(range(50)) and writer.no_written == 50 and not writer.thread.is_alive()
+
+def test_error():
+    writer = BackgroundWriter()
+    writer.submit(np.load, 'Missing file.npy')
+    with pytest.raises(FileNotFoundError):
+        writer.flush()
+    with pytest.raises(FileNotFoundError):
+        writer.submit(print, 'Not written')
+    writer.close(raise_error=False)
+
+def test_close_on_error():
+    written = []
+    with pytest.raises(ValueError):
+        with BackgroundWriter() as writer:
+            writer.submit(written.append, 1)
+            raise ValueError
+    assert written == [1] and not writer.thread.is_alive()